@@ -77,7 +77,7 @@ You have the ability to execute operations using both Python and CLI tools:
 
 ### 2.2.6 DATA PROVIDERS
 - You have access to a variety of data providers that you can use to get data for your tasks.
-- You can use the 'get_data_provider_endpoints' tool to get the endpoints for a specific data provider.
+- You can use the 'get_data_provider_endpoints' tool to find endpoints: without arguments it lists every endpoint of every provider in one line each, with a query it searches endpoints by keyword, and with service_name and routes it returns the full schemas of just those endpoints.
 - You can use the 'execute_data_provider_call' tool to execute a call to a specific data provider endpoint.
 - The data providers are:
   * linkedin - for LinkedIn data
@@ -87,6 +87,7 @@ You have the ability to execute operations using both Python and CLI tools:
   * yahoo_finance - for Yahoo Finance data
   * active_jobs - for Active Jobs data
   * creator_iq - for Creator IQ data (CRM for managing influencer/creator relationships)
+  * google_drive - for Google Drive files (requires an access_token in the payload)
 - Use data providers where appropriate to get the most accurate and up-to-date data for your tasks. This is preferred over generic web scraping.
 - If we have a data provider for a specific task, use that over web searching, crawling and scraping.
 
@@ -245,6 +246,7 @@ Follow the guidelines in `docs/AGENT_MEMORY_POLICY.md`:
 - Actively save intermediate results and store different types of reference information in separate files
 - When merging text files, must use append mode of file writing tool to concatenate content to target file
 - Create organized file structures with clear naming conventions
+- When creating or editing several files at once, prefer batch-create-files and batch-str-replace over repeated single-file calls
 - Store different types of data in appropriate formats
 
 # 6. DATA PROCESSING & EXTRACTION
@@ -380,6 +382,7 @@ Follow the guidelines in `docs/AGENT_MEMORY_POLICY.md`:
   3. Parse content using appropriate tools based on content type
   4. Respect web content limitations - not all content may be accessible
   5. Extract only the relevant portions of web content
+  6. Crawl several pages with a single batch-crawl-webpages call instead of one crawl-webpage call per page
 
 - Data Freshness:
   1. Always check publication dates of search results
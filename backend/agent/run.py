@@ -60,7 +60,7 @@ async def run_agent(
     # This ensures each tool independently verifies it's operating on the correct project
     thread_manager.add_tool(SandboxShellTool, project_id=project_id, thread_manager=thread_manager)
     thread_manager.add_tool(SandboxFilesTool, project_id=project_id, thread_manager=thread_manager)
-    thread_manager.add_tool(SandboxBrowserTool, project_id=project_id, thread_id=thread_id, thread_manager=thread_manager)
+    thread_manager.add_tool(SandboxBrowserTool, project_id=project_id, thread_id=thread_id, thread_manager=thread_manager, model_name=model_name)
     thread_manager.add_tool(SandboxDeployTool, project_id=project_id, thread_manager=thread_manager)
     thread_manager.add_tool(SandboxExposeTool, project_id=project_id, thread_manager=thread_manager)
     thread_manager.add_tool(MessageTool) # we are just doing this via prompt as there is no need to call it as a tool
@@ -71,7 +71,7 @@ async def run_agent(
         logger.warning("TAVILY_API_KEY not found, WebSearchTool will not be available.")
     
     if os.getenv("RAPID_API_KEY"):
-        thread_manager.add_tool(DataProvidersTool)
+        thread_manager.add_tool(DataProvidersTool, project_id=project_id, thread_manager=thread_manager)
 
     system_message = { "role": "system", "content": get_system_prompt() }
 
@@ -108,7 +108,9 @@ async def run_agent(
         if latest_browser_state.data and len(latest_browser_state.data) > 0:
             try:
                 content = json.loads(latest_browser_state.data[0]["content"])
-                screenshot_base64 = content["screenshot_base64"]
+                screenshot_base64 = content.get("screenshot_base64")
+                # Newer states reference a screenshot served from the sandbox instead of embedding it
+                screenshot_url = content.get("screenshot_url")
                 # Create a copy of the browser state without screenshot
                 browser_state = content.copy()
                 browser_state.pop('screenshot_base64', None)
@@ -120,11 +122,18 @@ async def run_agent(
                         "type": "text",
                         "text": f"The following is the current state of the browser:\n{browser_state}"
                     })
-                if screenshot_base64:
+                if screenshot_url:
                     temporary_message["content"].append({
                         "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{screenshot_base64}",
+                                "url": screenshot_url,
+                            }
+                    })
+                elif screenshot_base64:
+                    temporary_message["content"].append({
+                        "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/{content.get('screenshot_format') or 'jpeg'};base64,{screenshot_base64}",
                             }
                     })
                 else:
@@ -9,6 +9,7 @@ class ActiveJobsProvider(RapidDataProviderBase):
             "active_jobs": {
                 "route": "/active-ats-7d",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Active Jobs Search",
                 "description": "Get active job listings with various filter options.",
                 "payload": {
@@ -39,19 +40,24 @@ class ActiveJobsProvider(RapidDataProviderBase):
 
 
 if __name__ == "__main__":
+    import asyncio
     from dotenv import load_dotenv
     load_dotenv()
-    tool = ActiveJobsProvider()
-
-    # Example for searching active jobs
-    jobs = tool.call_endpoint(
-        route="active_jobs",
-        payload={
-            "limit": "10",
-            "offset": "0",
-            "title_filter": "\"Data Engineer\"",
-            "location_filter": "\"United States\" OR \"United Kingdom\"",
-            "description_type": "text"
-        }
-    )
-    print("Active Jobs:", jobs)
\ No newline at end of file
+
+    async def main():
+        tool = ActiveJobsProvider()
+
+        # Example for searching active jobs
+        jobs = await tool.call_endpoint(
+            route="active_jobs",
+            payload={
+                "limit": "10",
+                "offset": "0",
+                "title_filter": "\"Data Engineer\"",
+                "location_filter": "\"United States\" OR \"United Kingdom\"",
+                "description_type": "text"
+            }
+        )
+        print("Active Jobs:", jobs)
+
+    asyncio.run(main())
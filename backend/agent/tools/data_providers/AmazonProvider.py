@@ -9,6 +9,7 @@ class AmazonProvider(RapidDataProviderBase):
             "search": {
                 "route": "/search",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Amazon Product Search",
                 "description": "Search for products on Amazon with various filters and parameters.",
                 "payload": {
@@ -32,6 +33,7 @@ class AmazonProvider(RapidDataProviderBase):
             "product-details": {
                 "route": "/product-details",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Amazon Product Details",
                 "description": "Get detailed information about specific Amazon products by ASIN.",
                 "payload": {
@@ -44,6 +46,7 @@ class AmazonProvider(RapidDataProviderBase):
             "products-by-category": {
                 "route": "/products-by-category",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Amazon Products by Category",
                 "description": "Get products from a specific Amazon category.",
                 "payload": {
@@ -64,6 +67,7 @@ class AmazonProvider(RapidDataProviderBase):
             "product-reviews": {
                 "route": "/product-reviews",
                 "method": "GET",
+                "cache_ttl": 21600,
                 "name": "Amazon Product Reviews",
                 "description": "Get customer reviews for a specific Amazon product by ASIN.",
                 "payload": {
@@ -80,6 +84,7 @@ class AmazonProvider(RapidDataProviderBase):
             "seller-profile": {
                 "route": "/seller-profile",
                 "method": "GET",
+                "cache_ttl": 21600,
                 "name": "Amazon Seller Profile",
                 "description": "Get detailed information about a specific Amazon seller by Seller ID.",
                 "payload": {
@@ -91,6 +96,7 @@ class AmazonProvider(RapidDataProviderBase):
             "seller-reviews": {
                 "route": "/seller-reviews",
                 "method": "GET",
+                "cache_ttl": 21600,
                 "name": "Amazon Seller Reviews",
                 "description": "Get customer reviews for a specific Amazon seller by Seller ID.",
                 "payload": {
@@ -107,85 +113,89 @@ class AmazonProvider(RapidDataProviderBase):
 
 
 if __name__ == "__main__":
+    import asyncio
     from dotenv import load_dotenv
     load_dotenv()
-    tool = AmazonProvider()
 
-    # Example for product search
-    search_result = tool.call_endpoint(
-        route="search",
-        payload={
-            "query": "Phone",
-            "page": 1,
-            "country": "US",
-            "sort_by": "RELEVANCE",
-            "product_condition": "ALL",
-            "is_prime": False,
-            "deals_and_discounts": "NONE"
-        }
-    )
-    print("Search Result:", search_result)
+    async def main():
+        tool = AmazonProvider()
+
+        # Example for product search
+        search_result = await tool.call_endpoint(
+            route="search",
+            payload={
+                "query": "Phone",
+                "page": 1,
+                "country": "US",
+                "sort_by": "RELEVANCE",
+                "product_condition": "ALL",
+                "is_prime": False,
+                "deals_and_discounts": "NONE"
+            }
+        )
+        print("Search Result:", search_result)
     
-    # Example for product details
-    details_result = tool.call_endpoint(
-        route="product-details",
-        payload={
-            "asin": "B07ZPKBL9V",
-            "country": "US"
-        }
-    )
-    print("Product Details:", details_result)
+        # Example for product details
+        details_result = await tool.call_endpoint(
+            route="product-details",
+            payload={
+                "asin": "B07ZPKBL9V",
+                "country": "US"
+            }
+        )
+        print("Product Details:", details_result)
     
-    # Example for products by category
-    category_result = tool.call_endpoint(
-        route="products-by-category",
-        payload={
-            "category_id": "2478868012",
-            "page": 1,
-            "country": "US",
-            "sort_by": "RELEVANCE",
-            "product_condition": "ALL",
-            "is_prime": False,
-            "deals_and_discounts": "NONE"
-        }
-    )
-    print("Category Products:", category_result)
+        # Example for products by category
+        category_result = await tool.call_endpoint(
+            route="products-by-category",
+            payload={
+                "category_id": "2478868012",
+                "page": 1,
+                "country": "US",
+                "sort_by": "RELEVANCE",
+                "product_condition": "ALL",
+                "is_prime": False,
+                "deals_and_discounts": "NONE"
+            }
+        )
+        print("Category Products:", category_result)
     
-    # Example for product reviews
-    reviews_result = tool.call_endpoint(
-        route="product-reviews",
-        payload={
-            "asin": "B07ZPKN6YR",
-            "country": "US",
-            "page": 1,
-            "sort_by": "TOP_REVIEWS",
-            "star_rating": "ALL",
-            "verified_purchases_only": False,
-            "images_or_videos_only": False,
-            "current_format_only": False
-        }
-    )
-    print("Product Reviews:", reviews_result)
+        # Example for product reviews
+        reviews_result = await tool.call_endpoint(
+            route="product-reviews",
+            payload={
+                "asin": "B07ZPKN6YR",
+                "country": "US",
+                "page": 1,
+                "sort_by": "TOP_REVIEWS",
+                "star_rating": "ALL",
+                "verified_purchases_only": False,
+                "images_or_videos_only": False,
+                "current_format_only": False
+            }
+        )
+        print("Product Reviews:", reviews_result)
     
-    # Example for seller profile
-    seller_result = tool.call_endpoint(
-        route="seller-profile",
-        payload={
-            "seller_id": "A02211013Q5HP3OMSZC7W",
-            "country": "US"
-        }
-    )
-    print("Seller Profile:", seller_result)
+        # Example for seller profile
+        seller_result = await tool.call_endpoint(
+            route="seller-profile",
+            payload={
+                "seller_id": "A02211013Q5HP3OMSZC7W",
+                "country": "US"
+            }
+        )
+        print("Seller Profile:", seller_result)
     
-    # Example for seller reviews
-    seller_reviews_result = tool.call_endpoint(
-        route="seller-reviews",
-        payload={
-            "seller_id": "A02211013Q5HP3OMSZC7W",
-            "country": "US",
-            "star_rating": "ALL",
-            "page": 1
-        }
-    )
-    print("Seller Reviews:", seller_reviews_result)
+        # Example for seller reviews
+        seller_reviews_result = await tool.call_endpoint(
+            route="seller-reviews",
+            payload={
+                "seller_id": "A02211013Q5HP3OMSZC7W",
+                "country": "US",
+                "star_rating": "ALL",
+                "page": 1
+            }
+        )
+        print("Seller Reviews:", seller_reviews_result)
 
+    asyncio.run(main())
@@ -1,7 +1,81 @@
 import os
-import requests
-from typing import Dict, Any, Optional, List
+import re
+import time
+import asyncio
+import httpx
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator, Tuple
 from agent.tools.data_providers.RapidDataProviderBase import RapidDataProviderBase, EndpointSchema
+from agent.tools.data_providers.creator_iq_index import (
+    CREATOR_IQ_INDEX_ENABLED, ENTITY_TYPE_BY_ROUTE, INDEXED_ENTITIES, get_creator_iq_index
+)
+
+# The API caps list, publisher and campaign pages at 20 items
+CREATOR_IQ_PAGE_SIZE = 20
+# Default cap on pages fetched for the publishers of one campaign or list
+DEFAULT_MAX_MEMBER_PAGES = 10
+# Pages of one paginated call fetched at the same time
+CREATOR_IQ_MAX_CONCURRENT_PAGES = int(os.getenv("CREATOR_IQ_MAX_CONCURRENT_PAGES", "5"))
+# Requests per second sent to the Creator IQ API by this process
+CREATOR_IQ_REQUESTS_PER_SECOND = float(os.getenv("CREATOR_IQ_REQUESTS_PER_SECOND", "10"))
+# Payload keys consumed by the paginator rather than sent to the API
+PAGINATOR_PARAMS = {"all_pages", "max_pages", "search", "max_results", "page", "offset", "include_publisher_counts"}
+
+# Publisher counts of campaigns and lists, cached per id to avoid one lookup per item per call
+PUBLISHER_COUNT_TTL = int(os.getenv("CREATOR_IQ_PUBLISHER_COUNT_TTL", "300"))
+MAX_CACHED_PUBLISHER_COUNTS = 2048
+# Publisher count lookups sent at the same time
+CREATOR_IQ_MAX_CONCURRENT_COUNTS = 5
+# Kind ("campaigns" or "lists") -> (item wrapper key, id key, key the count is stored under)
+PUBLISHER_COUNT_FIELDS = {
+    "campaigns": ("Campaign", "CampaignId", "PublishersCount"),
+    "lists": ("List", "Id", "Publishers"),
+}
+MEMBERSHIP_ROUTE_PATTERN = re.compile(r"^/(campaigns|lists)/([^/]+)/publishers$")
+
+
+class RateLimiter:
+    """Spaces out request starts to stay under a requests-per-second budget."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait for the next free request slot."""
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_rate_limiter = RateLimiter(CREATOR_IQ_REQUESTS_PER_SECOND)
+
+# (kind, id) -> (publisher count, expiry time), oldest first
+_publisher_counts: "OrderedDict[Tuple[str, str], Tuple[int, float]]" = OrderedDict()
+
+
+def _flag(value: Any) -> bool:
+    """Interpret a payload flag sent as a bool or a string"""
+    return str(value).lower() == "true"
+
+
+def _list_name(item: Dict[str, Any]) -> str:
+    return item.get("List", {}).get("Name") or ""
+
+
+def _campaign_name(item: Dict[str, Any]) -> str:
+    return item.get("Campaign", {}).get("CampaignName") or ""
+
+
+def _publisher_name(item: Dict[str, Any]) -> str:
+    publisher = item.get("Publisher", {})
+    return publisher.get("PublisherName") or publisher.get("Username") or ""
+
 
 class CreatorIQProvider(RapidDataProviderBase):
     """
@@ -21,9 +95,10 @@ class CreatorIQProvider(RapidDataProviderBase):
                     "limit": "Number of results to return (default: 10)",
                     "offset": "Starting position for pagination",
                     "status": "Filter by publisher status (e.g., active, inactive)",
-                    "search": "Search term to filter publishers by name or other details",
+                    "search": "Search publishers by name (prefix, substring or similar names) in a synced local index; the result includes index_synced_at",
                     "page": "Page number for pagination (starts at 1)",
-                    "all_pages": "Set to 'true' to fetch all available pages"
+                    "all_pages": "Set to 'true' to fetch all available pages",
+                    "max_results": "With all_pages, stop fetching pages once this many matching items are found"
                 }
             },
             "publisher_details": {
@@ -57,9 +132,11 @@ class CreatorIQProvider(RapidDataProviderBase):
                     "offset": "Starting position for pagination",
                     "status": "Filter by campaign status",
                     "brand_id": "Filter by brand ID",
-                    "search": "Search term to filter campaigns by name",
+                    "search": "Search campaigns by name (prefix, substring or similar names) in a synced local index; the result includes index_synced_at",
+                    "include_publisher_counts": "Set to 'false' to skip looking up each campaign's publisher count (default: true, or false with all_pages)",
                     "page": "Page number for pagination (starts at 1)",
-                    "all_pages": "Set to 'true' to fetch all available pages"
+                    "all_pages": "Set to 'true' to fetch all available pages",
+                    "max_results": "With all_pages, stop fetching pages once this many matching items are found"
                 }
             },
             "campaign_details": {
@@ -81,7 +158,8 @@ class CreatorIQProvider(RapidDataProviderBase):
                     "limit": "Number of results to return (default: 10)",
                     "offset": "Starting position for pagination",
                     "page": "Page number for pagination (starts at 1)",
-                    "all_pages": "Set to 'true' to fetch all available pages"
+                    "all_pages": "Set to 'true' to fetch all available pages",
+                    "max_results": "With all_pages, stop fetching pages once this many matching items are found"
                 }
             },
             "content": {
@@ -106,10 +184,12 @@ class CreatorIQProvider(RapidDataProviderBase):
                 "payload": {
                     "limit": "Number of results to return (default: 50)",
                     "offset": "Starting position for pagination",
-                    "search": "Search term to filter lists by name or other details",
+                    "search": "Search lists by name (prefix, substring or similar names) in a synced local index; the result includes index_synced_at",
+                    "include_publisher_counts": "Set to 'false' to skip looking up each list's publisher count (default: true, or false with all_pages)",
                     "status": "Filter by list status",
                     "page": "Page number for pagination (starts at 1)",
-                    "all_pages": "Set to 'true' to fetch all available pages"
+                    "all_pages": "Set to 'true' to fetch all available pages",
+                    "max_results": "With all_pages, stop fetching pages once this many matching items are found"
                 }
             },
             "list_details": {
@@ -131,7 +211,8 @@ class CreatorIQProvider(RapidDataProviderBase):
                     "limit": "Number of results to return (default: 10)",
                     "offset": "Starting position for pagination",
                     "page": "Page number for pagination (starts at 1)",
-                    "all_pages": "Set to 'true' to fetch all available pages"
+                    "all_pages": "Set to 'true' to fetch all available pages",
+                    "max_results": "With all_pages, stop fetching pages once this many matching items are found"
                 }
             },
             
@@ -218,7 +299,7 @@ class CreatorIQProvider(RapidDataProviderBase):
             endpoints=endpoints
         )
     
-    def call_endpoint(self, route: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def call_endpoint(self, route: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Override the call_endpoint method to handle Creator IQ specific authentication and parameters.
         
@@ -258,16 +339,8 @@ class CreatorIQProvider(RapidDataProviderBase):
             # Build the complete URL
             url = f"{self.base_url}{formatted_route}"
             
-            # Get API key from environment variables
-            api_key = os.getenv("CREATOR_IQ_API_KEY")
-            if not api_key:
-                raise ValueError("CREATOR_IQ_API_KEY environment variable not set")
-            
             # Set up headers for Creator IQ API
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
+            headers = self._auth_headers()
             
             # Log the request details
             print(f"Making Creator IQ API request to: {url}")
@@ -278,17 +351,30 @@ class CreatorIQProvider(RapidDataProviderBase):
             # If we need to fetch all pages, use specific methods
             if fetch_all_pages:
                 if route == "lists":
-                    return self.get_all_lists(payload)
+                    return await self.get_all_lists(payload)
                 elif route == "publishers":
-                    return self.get_all_publishers(payload)
+                    return await self.get_all_publishers(payload)
                 elif route == "campaigns":
-                    return self.get_all_campaigns(payload) 
+                    return await self.get_all_campaigns(payload) 
                 elif "campaign_publishers" in route:
                     campaign_id = formatted_route.split("/")[-2]
-                    return self.get_all_campaign_publishers(campaign_id, payload)
+                    return await self.get_all_campaign_publishers(campaign_id, payload)
                 elif "list_publishers" in route:
                     list_id = formatted_route.split("/")[-2]
-                    return self.get_all_list_publishers(list_id, payload)
+                    return await self.get_all_list_publishers(list_id, payload)
+
+            # Publisher counts of campaigns and lists are looked up unless disabled
+            include_publisher_counts = True
+            if payload and "include_publisher_counts" in payload:
+                include_publisher_counts = _flag(payload["include_publisher_counts"])
+                payload = {k: v for k, v in payload.items() if k != "include_publisher_counts"}
+            
+            # Name searches are answered from the local index when it is available
+            entity_type = ENTITY_TYPE_BY_ROUTE.get(route)
+            if method == "GET" and entity_type and payload and payload.get("search") and CREATOR_IQ_INDEX_ENABLED:
+                indexed_response = await self.search_index(entity_type, payload, include_publisher_counts)
+                if indexed_response is not None:
+                    return indexed_response
 
             # Special handling for pagination in requests
             if method == "GET" and payload and "page" in payload:
@@ -320,10 +406,7 @@ class CreatorIQProvider(RapidDataProviderBase):
                     if "limit" not in search_payload:
                         search_payload["limit"] = 50
                     
-                    if method == "GET":
-                        response = requests.get(url, params=search_payload, headers=headers)
-                    else:
-                        response = requests.post(url, json=search_payload, headers=headers)
+                    response = await self.request(method, url, search_payload, headers)
                     
                     # Check for errors
                     response.raise_for_status()
@@ -379,10 +462,7 @@ class CreatorIQProvider(RapidDataProviderBase):
                     if "limit" not in search_payload:
                         search_payload["limit"] = 50
                     
-                    if method == "GET":
-                        response = requests.get(url, params=search_payload, headers=headers)
-                    else:
-                        response = requests.post(url, json=search_payload, headers=headers)
+                    response = await self.request(method, url, search_payload, headers)
                     
                     # Check for errors
                     response.raise_for_status()
@@ -426,25 +506,8 @@ class CreatorIQProvider(RapidDataProviderBase):
                     print(f"Found {len(filtered_campaigns)} campaigns matching '{search_term}'")
                     
                     # Get campaign details including publisher counts
-                    for campaign in filtered_campaigns:
-                        if "Campaign" in campaign and "CampaignId" in campaign["Campaign"]:
-                            campaign_id = campaign["Campaign"]["CampaignId"]
-                            try:
-                                # Get the count of publishers for this campaign
-                                publishers_url = f"{self.base_url}/campaigns/{campaign_id}/publishers"
-                                publishers_response = requests.get(publishers_url, headers=headers)
-                                
-                                if publishers_response.ok:
-                                    publishers_data = publishers_response.json()
-                                    publisher_count = publishers_data.get("count", 0)
-                                    # Add this information to the campaign object
-                                    campaign["Campaign"]["PublishersCount"] = publisher_count
-                                    print(f"Campaign {campaign_id} has {publisher_count} publishers")
-                                else:
-                                    print(f"Failed to get publishers for campaign {campaign_id}: {publishers_response.status_code}")
-                                    
-                            except Exception as e:
-                                print(f"Error getting publishers for campaign {campaign_id}: {str(e)}")
+                    if include_publisher_counts:
+                        await self.add_publisher_counts("campaigns", filtered_campaigns)
                     
                     return full_response
                     
@@ -460,7 +523,7 @@ class CreatorIQProvider(RapidDataProviderBase):
                     if "limit" not in search_payload:
                         search_payload["limit"] = 50
                     
-                    response = requests.get(url, params=search_payload, headers=headers)
+                    response = await self.request(method, url, search_payload, headers)
                     
                     # Check for errors
                     response.raise_for_status()
@@ -497,17 +560,11 @@ class CreatorIQProvider(RapidDataProviderBase):
                     
                     return full_response
             
-            # Make the request based on the HTTP method
-            if method == "GET":
-                response = requests.get(url, params=payload, headers=headers)
-            elif method == "POST":
-                # For POST requests, send the payload in the request body
-                response = requests.post(url, json=payload, headers=headers)
-            elif method == "PUT":
-                # For PUT requests, send the payload in the request body
-                response = requests.put(url, json=payload, headers=headers)
-            else:
+            # Make the request based on the HTTP method; GET sends the payload as
+            # query parameters, POST and PUT in the request body
+            if method not in ("GET", "POST", "PUT"):
                 raise ValueError(f"Unsupported HTTP method: {method}")
+            response = await self.request(method, url, payload, headers)
             
             # Check for errors
             response.raise_for_status()
@@ -518,6 +575,11 @@ class CreatorIQProvider(RapidDataProviderBase):
             # Parse and return the response data
             response_data = response.json()
             
+            # Publishers added to a campaign or list change its cached count
+            membership_route = MEMBERSHIP_ROUTE_PATTERN.match(formatted_route)
+            if method == "POST" and membership_route:
+                _publisher_counts.pop(membership_route.groups(), None)
+            
             # Additional handling for specific response types
             if method in ["POST", "PUT"]:
                 # For write operations, add metadata about what was done
@@ -625,25 +687,8 @@ class CreatorIQProvider(RapidDataProviderBase):
                     print(f"... and {len(campaigns) - 5} more")
                     
                 # Get campaign details including publisher counts for all campaigns
-                for campaign in campaigns:
-                    if "Campaign" in campaign and "CampaignId" in campaign["Campaign"]:
-                        campaign_id = campaign["Campaign"]["CampaignId"]
-                        try:
-                            # Get the count of publishers for this campaign
-                            publishers_url = f"{self.base_url}/campaigns/{campaign_id}/publishers"
-                            publishers_response = requests.get(publishers_url, headers=headers)
-                            
-                            if publishers_response.ok:
-                                publishers_data = publishers_response.json()
-                                publisher_count = publishers_data.get("count", 0)
-                                # Add this information to the campaign object
-                                campaign["Campaign"]["PublishersCount"] = publisher_count
-                                print(f"Campaign {campaign_id} has {publisher_count} publishers")
-                            else:
-                                print(f"Failed to get publishers for campaign {campaign_id}: {publishers_response.status_code}")
-                                
-                        except Exception as e:
-                            print(f"Error getting publishers for campaign {campaign_id}: {str(e)}")
+                if include_publisher_counts:
+                    await self.add_publisher_counts("campaigns", campaigns)
                             
             # Handle list response data similarly to campaigns
             if route == "lists" and "ListsCollection" in response_data:
@@ -683,25 +728,8 @@ class CreatorIQProvider(RapidDataProviderBase):
                 print(f"List pagination: page {page} of {total_pages}, {total_items} total items")
                     
                 # Get list details including publisher counts for all lists
-                for list_item in lists:
-                    if "List" in list_item and "Id" in list_item["List"]:
-                        list_id = list_item["List"]["Id"]
-                        try:
-                            # Get the count of publishers for this list
-                            publishers_url = f"{self.base_url}/lists/{list_id}/publishers"
-                            publishers_response = requests.get(publishers_url, headers=headers)
-                            
-                            if publishers_response.ok:
-                                publishers_data = publishers_response.json()
-                                publisher_count = publishers_data.get("count", 0)
-                                # Add this information to the list object
-                                list_item["List"]["Publishers"] = publisher_count
-                                print(f"List {list_id} has {publisher_count} publishers")
-                            else:
-                                print(f"Failed to get publishers for list {list_id}: {publishers_response.status_code}")
-                                
-                        except Exception as e:
-                            print(f"Error getting publishers for list {list_id}: {str(e)}")
+                if include_publisher_counts:
+                    await self.add_publisher_counts("lists", lists)
             
             # Add similar handling for publishers endpoint
             if route == "publishers" and "PublisherCollection" in response_data:
@@ -724,10 +752,10 @@ class CreatorIQProvider(RapidDataProviderBase):
             
             return response_data
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             # Handle API errors with more detailed information
             error_message = str(e)
-            if hasattr(e, "response") and e.response is not None:
+            if isinstance(e, httpx.HTTPStatusError):
                 try:
                     error_data = e.response.json()
                     if isinstance(error_data, dict) and "message" in error_data:
@@ -735,394 +763,378 @@ class CreatorIQProvider(RapidDataProviderBase):
                     error_message += f" (Status code: {e.response.status_code})"
                     print(f"Creator IQ API error response: {error_data}")
                 except:
-                    error_message = f"API error: {e.response.status_code} {e.response.reason}"
+                    error_message = f"API error: {e.response.status_code} {e.response.reason_phrase}"
             
             print(f"Creator IQ API error: {error_message}")
             raise ValueError(f"Creator IQ API error: {error_message}")
 
-    # Add a new method to get all lists with pagination support
-    def get_all_lists(self, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _auth_headers(self) -> Dict[str, str]:
+        """Headers authenticating a request with the Creator IQ API key"""
+        api_key = os.getenv("CREATOR_IQ_API_KEY")
+        if not api_key:
+            raise ValueError("CREATOR_IQ_API_KEY environment variable not set")
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    async def request(self, method: str, url: str, payload: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """Send a request through the shared client, within the Creator IQ rate limit."""
+        await _rate_limiter.wait()
+        return await super().request(method, url, payload, headers)
+
+    async def search_index(self, entity_type: str, payload: Dict[str, Any],
+                           include_publisher_counts: bool = True) -> Optional[Dict[str, Any]]:
         """
-        Get all lists with pagination support
+        Answer a name search from the local Creator IQ index
         
         Args:
-            payload: Dictionary containing parameters for the request
+            entity_type: "list", "campaign" or "publisher"
+            payload: Request payload with the "search" term and an optional "limit"
+            include_publisher_counts: Add publisher counts to campaigns and lists
             
         Returns:
-            Combined response with all lists and metadata
+            Response shaped like the API's, with the index freshness, or None if
+            the index is unavailable or not built yet and the API should be searched instead
         """
+        route, collection_key, _, _ = INDEXED_ENTITIES[entity_type]
+        search_term = str(payload["search"])
         try:
-            all_lists = []
-            total_items = 0
-            total_pages = 1
-            current_page = 1
-            
-            # Set up parameters
-            if not payload:
-                payload = {}
-            
-            # CreatorIQ API always limits lists to 20 items per page
-            page_size = 20
-            
-            # Make first request to get total count
-            first_page_payload = {**payload, "limit": page_size, "page": 1}
-            # Remove any all_pages parameter
-            if "all_pages" in first_page_payload:
-                del first_page_payload["all_pages"]
-            
-            first_page = self.call_endpoint("lists", first_page_payload)
-            
-            # Get pagination info
-            if "total" in first_page:
-                total_items = first_page["total"]
-                total_pages = first_page["total_pages"]
-                
-                print(f"Found {total_items} total lists across {total_pages} pages")
-            
-            # Add first page of results
-            if "ListsCollection" in first_page:
-                all_lists.extend(first_page["ListsCollection"])
-                
-            # If we have more pages, fetch them
-            pages_to_fetch = total_pages - 1  # -1 because we already fetched page 1
-            
-            for page in range(2, 2 + pages_to_fetch):
-                print(f"Fetching lists page {page} of {total_pages}")
-                page_payload = {**payload, "limit": page_size, "page": page}
-                if "all_pages" in page_payload:
-                    del page_payload["all_pages"]
-                
-                page_result = self.call_endpoint("lists", page_payload)
-                
-                if "ListsCollection" in page_result:
-                    all_lists.extend(page_result["ListsCollection"])
-            
-            # Update the first page response with combined results
-            first_page["ListsCollection"] = all_lists
-            first_page["pages_searched"] = total_pages
-            first_page["searched_all_pages"] = True
-            first_page["items_found"] = len(all_lists)
+            result = await get_creator_iq_index().search(self, entity_type, search_term, int(payload.get("limit", 50)))
+        except Exception as e:
+            print(f"Creator IQ index search failed, searching the API instead: {str(e)}")
+            return None
+        if result is None:
+            print(f"Creator IQ {route} index is still being built, searching the API instead")
+            return None
+        
+        items = result["items"]
+        if include_publisher_counts and route in PUBLISHER_COUNT_FIELDS:
+            await self.add_publisher_counts(route, items)
+        
+        print(f"Found {len(items)} {route} matching '{search_term}' in the index")
+        return {
+            collection_key: items,
+            "count": len(items),
+            "total": len(items),
+            "filtered_by": search_term,
+            "source": "index",
+            "index_synced_at": result["synced_at"],
+            "index_refreshing": result["refreshing"],
+        }
+
+    async def get_publisher_count(self, kind: str, entity_id: str) -> Optional[int]:
+        """
+        Get the number of publishers in a campaign or list, cached for PUBLISHER_COUNT_TTL seconds
+        
+        Args:
+            kind: "campaigns" or "lists"
+            entity_id: ID of the campaign or list
             
-            print(f"Retrieved {len(all_lists)} lists from {total_pages} pages")
+        Returns:
+            The publisher count, or None if the lookup failed
+        """
+        key = (kind, str(entity_id))
+        cached = _publisher_counts.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        # Only the count is needed, so ask for the smallest page
+        publishers_url = f"{self.base_url}/{kind}/{entity_id}/publishers"
+        response = await self.request("GET", publishers_url, {"limit": 1}, self._auth_headers())
+        if not response.is_success:
+            print(f"Failed to get publishers for {kind} {entity_id}: {response.status_code}")
+            return None
+        
+        count = response.json().get("count", 0)
+        _publisher_counts[key] = (count, time.monotonic() + PUBLISHER_COUNT_TTL)
+        _publisher_counts.move_to_end(key)
+        while len(_publisher_counts) > MAX_CACHED_PUBLISHER_COUNTS:
+            _publisher_counts.popitem(last=False)
+        return count
+
+    async def add_publisher_counts(self, kind: str, items: List[Dict[str, Any]]) -> None:
+        """
+        Add the publisher count to each campaign or list item, looking them up concurrently
+        
+        Args:
+            kind: "campaigns" or "lists"
+            items: Items of a CampaignCollection or ListsCollection, updated in place
+        """
+        wrapper_key, id_key, count_key = PUBLISHER_COUNT_FIELDS[kind]
+        semaphore = asyncio.Semaphore(CREATOR_IQ_MAX_CONCURRENT_COUNTS)
+        
+        async def add_count(item: Dict[str, Any]) -> None:
+            details = item.get(wrapper_key)
+            if not details or id_key not in details:
+                return
+            try:
+                async with semaphore:
+                    count = await self.get_publisher_count(kind, details[id_key])
+            except Exception as e:
+                print(f"Error getting publishers for {kind} {details[id_key]}: {str(e)}")
+                return
+            if count is not None:
+                details[count_key] = count
+        
+        await asyncio.gather(*(add_count(item) for item in items))
+
+    async def iter_pages(
+            self,
+            route: str,
+            payload: Optional[Dict[str, Any]] = None,
+            page_size: int = CREATOR_IQ_PAGE_SIZE,
+            max_pages: Optional[int] = None,
+            first_page: int = 1
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Fetch the pages of a paginated endpoint, yielding (page number, response) in page order
+        
+        The first page is fetched first to learn total_pages; the remaining pages are then
+        fetched concurrently (at most CREATOR_IQ_MAX_CONCURRENT_PAGES at a time) and
+        yielded as soon as every page before them has arrived. Closing the iterator
+        early cancels the pages still in flight.
+        
+        Args:
+            route: The endpoint route key
+            payload: Dictionary containing parameters for every page request
+            page_size: Number of items per page
+            max_pages: Optional cap on the number of pages to fetch
+            first_page: Page to start from, e.g. to resume an earlier walk
+        """
+        base_payload = {k: v for k, v in (payload or {}).items() if k not in PAGINATOR_PARAMS}
+        
+        response = await self.call_endpoint(route, {**base_payload, "limit": page_size, "page": first_page,
+                                                   "include_publisher_counts": False})
+        yield first_page, response
+        
+        last_page = int(response.get("total_pages", 1))
+        if max_pages:
+            last_page = min(last_page, first_page + max_pages - 1)
+        if last_page <= first_page:
+            return
+        
+        semaphore = asyncio.Semaphore(CREATOR_IQ_MAX_CONCURRENT_PAGES)
+        
+        async def fetch_page(page: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.call_endpoint(route, {**base_payload, "limit": page_size, "page": page,
+                                                        "include_publisher_counts": False})
+        
+        tasks = {page: asyncio.create_task(fetch_page(page)) for page in range(first_page + 1, last_page + 1)}
+        try:
+            for page in range(first_page + 1, last_page + 1):
+                yield page, await tasks[page]
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def collect_pages(
+            self,
+            route: str,
+            collection_key: str,
+            payload: Optional[Dict[str, Any]] = None,
+            page_size: int = CREATOR_IQ_PAGE_SIZE,
+            max_pages: Optional[int] = None,
+            match: Optional[Callable[[Dict[str, Any]], bool]] = None,
+            stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Merge the items of all pages of an endpoint into the first page's response
+        
+        Args:
+            route: The endpoint route key
+            collection_key: Response key holding the items (e.g. "ListsCollection")
+            payload: Dictionary containing parameters for every page request
+            page_size: Number of items per page
+            max_pages: Optional cap on the number of pages to fetch
+            match: Optional filter; only items it accepts are kept
+            stop_when: Optional predicate on the items kept so far; once it returns
+                True no further pages are fetched
             
-            return first_page
+        Returns:
+            The first page's response with the merged items and paging metadata
+        """
+        items: List[Dict[str, Any]] = []
+        first_page: Dict[str, Any] = {}
+        pages_searched = 0
+        total_pages = 1
+        
+        async with aclosing(self.iter_pages(route, payload, page_size, max_pages)) as pages:
+            async for page, response in pages:
+                if page == 1:
+                    first_page = response
+                    total_pages = int(response.get("total_pages", 1))
+                    print(f"Found {response.get('total', 0)} total items for {route} across {total_pages} pages")
+                page_items = response.get(collection_key, [])
+                items.extend(item for item in page_items if match is None or match(item))
+                pages_searched = page
+                if stop_when and stop_when(items):
+                    print(f"Stopping {route} pagination early after page {page}")
+                    break
+        
+        first_page[collection_key] = items
+        first_page["pages_searched"] = pages_searched
+        first_page["searched_all_pages"] = pages_searched >= total_pages
+        first_page["items_found"] = len(items)
+        
+        print(f"Retrieved {len(items)} items for {route} from {pages_searched} pages")
+        return first_page
+
+    def _search_filters(self, payload: Dict[str, Any], name_of: Callable[[Dict[str, Any]], str]):
+        """Build the match and stop_when arguments of collect_pages from search and max_results"""
+        match = None
+        stop_when = None
+        search_term = str(payload.get("search") or "").lower()
+        if search_term:
+            match = lambda item: search_term in name_of(item).lower()
+        max_results = payload.get("max_results")
+        if max_results:
+            max_results = int(max_results)
+            stop_when = lambda items: len(items) >= max_results
+        return match, stop_when
+
+    async def get_all_lists(self, payload: Dict[str, Any] = None,
+                            stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> Dict[str, Any]:
+        """
+        Get all lists with pagination support
+        
+        Args:
+            payload: Dictionary containing parameters for the request; "search" keeps
+                only lists whose name contains it, "max_results" stops once that many are found
+            stop_when: Optional predicate on the lists found so far to stop fetching pages
             
+        Returns:
+            Combined response with all lists and metadata
+        """
+        try:
+            payload = payload or {}
+            match, max_results_reached = self._search_filters(payload, _list_name)
+            result = await self.collect_pages(
+                "lists", "ListsCollection", payload,
+                match=match, stop_when=stop_when or max_results_reached
+            )
+            if _flag(payload.get("include_publisher_counts")):
+                await self.add_publisher_counts("lists", result["ListsCollection"])
+            return result
         except Exception as e:
             print(f"Error fetching all lists: {str(e)}")
             return {"ListsCollection": [], "error": str(e)}
     
-    # Add a new method to get all publishers with pagination support
-    def get_all_publishers(self, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def get_all_publishers(self, payload: Dict[str, Any] = None,
+                                 stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> Dict[str, Any]:
         """
         Get all publishers with pagination support
         
         Args:
-            payload: Dictionary containing parameters for the request
+            payload: Dictionary containing parameters for the request; "search" keeps
+                only publishers whose name contains it, "max_results" stops once that many are found
+            stop_when: Optional predicate on the publishers found so far to stop fetching pages
             
         Returns:
             Combined response with all publishers and metadata
         """
         try:
-            all_publishers = []
-            total_items = 0
-            total_pages = 1
-            
-            # Set up parameters
-            if not payload:
-                payload = {}
-            
-            # CreatorIQ API always limits publishers to 20 items per page
-            page_size = 20
-            
-            # Make first request to get total count
-            first_page_payload = {**payload, "limit": page_size, "page": 1}
-            # Remove any all_pages parameter
-            if "all_pages" in first_page_payload:
-                del first_page_payload["all_pages"]
-            
-            first_page = self.call_endpoint("publishers", first_page_payload)
-            
-            # Get pagination info
-            if "total" in first_page:
-                total_items = first_page["total"]
-                total_pages = first_page["total_pages"]
-                
-                print(f"Found {total_items} total publishers across {total_pages} pages")
-            
-            # Add first page of results
-            if "PublisherCollection" in first_page:
-                all_publishers.extend(first_page["PublisherCollection"])
-                
-            # If we have more pages, fetch them
-            pages_to_fetch = total_pages - 1  # -1 because we already fetched page 1
-            
-            for page in range(2, 2 + pages_to_fetch):
-                print(f"Fetching publishers page {page} of {total_pages}")
-                page_payload = {**payload, "limit": page_size, "page": page}
-                if "all_pages" in page_payload:
-                    del page_payload["all_pages"]
-                
-                page_result = self.call_endpoint("publishers", page_payload)
-                
-                if "PublisherCollection" in page_result:
-                    all_publishers.extend(page_result["PublisherCollection"])
-            
-            # Update the first page response with combined results
-            first_page["PublisherCollection"] = all_publishers
-            first_page["pages_searched"] = total_pages
-            first_page["searched_all_pages"] = True
-            first_page["items_found"] = len(all_publishers)
-            
-            print(f"Retrieved {len(all_publishers)} publishers from {total_pages} pages")
-            
-            return first_page
-            
+            payload = payload or {}
+            match, max_results_reached = self._search_filters(payload, _publisher_name)
+            return await self.collect_pages(
+                "publishers", "PublisherCollection", payload,
+                match=match, stop_when=stop_when or max_results_reached
+            )
         except Exception as e:
             print(f"Error fetching all publishers: {str(e)}")
             return {"PublisherCollection": [], "error": str(e)}
     
-    # Add a method to get all campaigns with pagination support
-    def get_all_campaigns(self, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def get_all_campaigns(self, payload: Dict[str, Any] = None,
+                                stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> Dict[str, Any]:
         """
         Get all campaigns with pagination support
         
         Args:
-            payload: Dictionary containing parameters for the request
+            payload: Dictionary containing parameters for the request; "search" keeps
+                only campaigns whose name contains it, "max_results" stops once that many are found
+            stop_when: Optional predicate on the campaigns found so far to stop fetching pages
             
         Returns:
             Combined response with all campaigns and metadata
         """
         try:
-            all_campaigns = []
-            total_items = 0
-            total_pages = 1
-            
-            # Set up parameters
-            if not payload:
-                payload = {}
-            
-            # CreatorIQ API always limits campaigns to 20 items per page
-            page_size = 20
-            
-            # Make first request to get total count
-            first_page_payload = {**payload, "limit": page_size, "page": 1}
-            # Remove any all_pages parameter
-            if "all_pages" in first_page_payload:
-                del first_page_payload["all_pages"]
-            
-            first_page = self.call_endpoint("campaigns", first_page_payload)
-            
-            # Get pagination info
-            if "total" in first_page:
-                total_items = first_page["total"]
-                total_pages = first_page["total_pages"]
-                
-                print(f"Found {total_items} total campaigns across {total_pages} pages")
-            
-            # Add first page of results
-            if "CampaignCollection" in first_page:
-                all_campaigns.extend(first_page["CampaignCollection"])
-                
-            # If we have more pages, fetch them
-            pages_to_fetch = total_pages - 1  # -1 because we already fetched page 1
-            
-            for page in range(2, 2 + pages_to_fetch):
-                print(f"Fetching campaigns page {page} of {total_pages}")
-                page_payload = {**payload, "limit": page_size, "page": page}
-                if "all_pages" in page_payload:
-                    del page_payload["all_pages"]
-                
-                page_result = self.call_endpoint("campaigns", page_payload)
-                
-                if "CampaignCollection" in page_result:
-                    all_campaigns.extend(page_result["CampaignCollection"])
-            
-            # Update the first page response with combined results
-            first_page["CampaignCollection"] = all_campaigns
-            first_page["pages_searched"] = total_pages
-            first_page["searched_all_pages"] = True
-            first_page["items_found"] = len(all_campaigns)
-            
-            print(f"Retrieved {len(all_campaigns)} campaigns from {total_pages} pages")
-            
-            return first_page
-            
+            payload = payload or {}
+            match, max_results_reached = self._search_filters(payload, _campaign_name)
+            result = await self.collect_pages(
+                "campaigns", "CampaignCollection", payload,
+                match=match, stop_when=stop_when or max_results_reached
+            )
+            if _flag(payload.get("include_publisher_counts")):
+                await self.add_publisher_counts("campaigns", result["CampaignCollection"])
+            return result
         except Exception as e:
             print(f"Error fetching all campaigns: {str(e)}")
             return {"CampaignCollection": [], "error": str(e)}
     
-    # Add a method to get all publishers for a specific campaign
-    def get_all_campaign_publishers(self, campaign_id: str, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def get_all_campaign_publishers(self, campaign_id: str, payload: Dict[str, Any] = None,
+                                          stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> Dict[str, Any]:
         """
         Get all publishers for a specific campaign with pagination support
         
         Args:
             campaign_id: ID of the campaign to get publishers for
-            payload: Dictionary containing parameters for the request
+            payload: Dictionary containing parameters for the request; "max_pages" caps
+                the pages fetched (default: 10)
+            stop_when: Optional predicate on the publishers found so far to stop fetching pages
             
         Returns:
             Combined response with all campaign publishers and metadata
         """
         try:
-            all_publishers = []
-            total_items = 0
-            total_pages = 1
-            max_pages = 10  # Default max pages to fetch
-            
-            # Set up parameters
-            if not payload:
-                payload = {}
-            
-            # Use provided limit or default to 50
+            payload = payload or {}
             page_size = int(payload.get("limit", 50))
-            if "max_pages" in payload:
-                max_pages = int(payload.get("max_pages"))
-            
-            # Make first request to get total count
-            first_page_payload = {
-                **payload, 
-                "limit": page_size, 
-                "page": 1,
-                "campaign_id": campaign_id
-            }
-            # Remove any all_pages parameter
-            if "all_pages" in first_page_payload:
-                del first_page_payload["all_pages"]
-            
-            first_page = self.call_endpoint("campaign_publishers", first_page_payload)
-            
-            # Get pagination info
-            if "total" in first_page:
-                total_items = first_page["total"]
-                total_pages = first_page["total_pages"]
-                
-                print(f"Found {total_items} total publishers for campaign {campaign_id} across {total_pages} pages")
-            
-            # Add first page of results
-            if "PublisherCollection" in first_page:
-                all_publishers.extend(first_page["PublisherCollection"])
-                
-            # If we have more pages, fetch them
-            pages_to_fetch = min(max_pages, total_pages) - 1  # -1 because we already fetched page 1
-            
-            for page in range(2, 2 + pages_to_fetch):
-                print(f"Fetching campaign publishers page {page} of {total_pages}")
-                page_payload = {
-                    **payload, 
-                    "limit": page_size, 
-                    "page": page,
-                    "campaign_id": campaign_id
-                }
-                if "all_pages" in page_payload:
-                    del page_payload["all_pages"]
-                
-                page_result = self.call_endpoint("campaign_publishers", page_payload)
-                
-                if "PublisherCollection" in page_result:
-                    all_publishers.extend(page_result["PublisherCollection"])
-            
-            # Update the first page response with combined results
-            first_page["PublisherCollection"] = all_publishers
-            first_page["pages_searched"] = min(max_pages, total_pages)
-            first_page["searched_all_pages"] = (min(max_pages, total_pages) == total_pages)
-            first_page["items_found"] = len(all_publishers)
-            first_page["campaignId"] = campaign_id
-            
-            print(f"Retrieved {len(all_publishers)} publishers for campaign {campaign_id} from {min(max_pages, total_pages)} pages")
-            
-            return first_page
-            
+            max_pages = int(payload.get("max_pages", DEFAULT_MAX_MEMBER_PAGES))
+            match, max_results_reached = self._search_filters(payload, _publisher_name)
+            result = await self.collect_pages(
+                "campaign_publishers", "PublisherCollection", {**payload, "campaign_id": campaign_id},
+                page_size=page_size, max_pages=max_pages,
+                match=match, stop_when=stop_when or max_results_reached
+            )
+            result["campaignId"] = campaign_id
+            return result
         except Exception as e:
             print(f"Error fetching all campaign publishers: {str(e)}")
             return {"PublisherCollection": [], "campaignId": campaign_id, "error": str(e)}
     
-    # Add a method to get all publishers for a specific list
-    def get_all_list_publishers(self, list_id: str, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def get_all_list_publishers(self, list_id: str, payload: Dict[str, Any] = None,
+                                      stop_when: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> Dict[str, Any]:
         """
         Get all publishers for a specific list with pagination support
         
         Args:
             list_id: ID of the list to get publishers for
-            payload: Dictionary containing parameters for the request
+            payload: Dictionary containing parameters for the request; "max_pages" caps
+                the pages fetched (default: 10)
+            stop_when: Optional predicate on the publishers found so far to stop fetching pages
             
         Returns:
             Combined response with all list publishers and metadata
         """
         try:
-            all_publishers = []
-            total_items = 0
-            total_pages = 1
-            max_pages = 10  # Default max pages to fetch
-            
-            # Set up parameters
-            if not payload:
-                payload = {}
-            
-            # Use provided limit or default to 50
+            payload = payload or {}
             page_size = int(payload.get("limit", 50))
-            if "max_pages" in payload:
-                max_pages = int(payload.get("max_pages"))
-            
-            # Make first request to get total count
-            first_page_payload = {
-                **payload, 
-                "limit": page_size, 
-                "page": 1,
-                "list_id": list_id
-            }
-            # Remove any all_pages parameter
-            if "all_pages" in first_page_payload:
-                del first_page_payload["all_pages"]
-            
-            first_page = self.call_endpoint("list_publishers", first_page_payload)
-            
-            # Get pagination info
-            if "total" in first_page:
-                total_items = first_page["total"]
-                total_pages = first_page["total_pages"]
-                
-                print(f"Found {total_items} total publishers for list {list_id} across {total_pages} pages")
-            
-            # Add first page of results
-            if "PublisherCollection" in first_page:
-                all_publishers.extend(first_page["PublisherCollection"])
-                
-            # If we have more pages, fetch them
-            pages_to_fetch = min(max_pages, total_pages) - 1  # -1 because we already fetched page 1
-            
-            for page in range(2, 2 + pages_to_fetch):
-                print(f"Fetching list publishers page {page} of {total_pages}")
-                page_payload = {
-                    **payload, 
-                    "limit": page_size, 
-                    "page": page,
-                    "list_id": list_id
-                }
-                if "all_pages" in page_payload:
-                    del page_payload["all_pages"]
-                
-                page_result = self.call_endpoint("list_publishers", page_payload)
-                
-                if "PublisherCollection" in page_result:
-                    all_publishers.extend(page_result["PublisherCollection"])
-            
-            # Update the first page response with combined results
-            first_page["PublisherCollection"] = all_publishers
-            first_page["pages_searched"] = min(max_pages, total_pages)
-            first_page["searched_all_pages"] = (min(max_pages, total_pages) == total_pages)
-            first_page["items_found"] = len(all_publishers)
-            first_page["listId"] = list_id
-            
-            print(f"Retrieved {len(all_publishers)} publishers for list {list_id} from {min(max_pages, total_pages)} pages")
-            
-            return first_page
-            
+            max_pages = int(payload.get("max_pages", DEFAULT_MAX_MEMBER_PAGES))
+            match, max_results_reached = self._search_filters(payload, _publisher_name)
+            result = await self.collect_pages(
+                "list_publishers", "PublisherCollection", {**payload, "list_id": list_id},
+                page_size=page_size, max_pages=max_pages,
+                match=match, stop_when=stop_when or max_results_reached
+            )
+            result["listId"] = list_id
+            return result
         except Exception as e:
             print(f"Error fetching all list publishers: {str(e)}")
             return {"PublisherCollection": [], "listId": list_id, "error": str(e)}
     
     # Helper functions for specific operations
-    def search_campaigns_by_name(self, search_term: str) -> List[Dict[str, Any]]:
+    async def search_campaigns_by_name(self, search_term: str) -> List[Dict[str, Any]]:
         """
         Helper method to specifically search for campaigns by name
         
@@ -1136,7 +1148,7 @@ class CreatorIQProvider(RapidDataProviderBase):
         
         try:
             # Add a higher limit to get more campaigns
-            response = self.call_endpoint("campaigns", {"limit": 50, "search": search_term})
+            response = await self.call_endpoint("campaigns", {"limit": 50, "search": search_term})
             
             if "CampaignCollection" in response:
                 return response["CampaignCollection"]
@@ -1145,7 +1157,7 @@ class CreatorIQProvider(RapidDataProviderBase):
             print(f"Error in search_campaigns_by_name: {e}")
             return []
             
-    def search_lists_by_name(self, search_term: str) -> List[Dict[str, Any]]:
+    async def search_lists_by_name(self, search_term: str) -> List[Dict[str, Any]]:
         """
         Helper method to specifically search for lists by name
         
@@ -1159,7 +1171,7 @@ class CreatorIQProvider(RapidDataProviderBase):
         
         try:
             # Add a higher limit to get more lists
-            response = self.call_endpoint("lists", {"limit": 50, "search": search_term})
+            response = await self.call_endpoint("lists", {"limit": 50, "search": search_term})
             
             if "ListsCollection" in response:
                 return response["ListsCollection"]
@@ -1168,7 +1180,7 @@ class CreatorIQProvider(RapidDataProviderBase):
             print(f"Error in search_lists_by_name: {e}")
             return []
     
-    def search_publishers_by_name(self, search_term: str) -> List[Dict[str, Any]]:
+    async def search_publishers_by_name(self, search_term: str) -> List[Dict[str, Any]]:
         """
         Helper method to specifically search for publishers by name
         
@@ -1182,7 +1194,7 @@ class CreatorIQProvider(RapidDataProviderBase):
         
         try:
             # Add a higher limit to get more publishers
-            response = self.call_endpoint("publishers", {"limit": 50, "search": search_term})
+            response = await self.call_endpoint("publishers", {"limit": 50, "search": search_term})
             
             if "PublisherCollection" in response:
                 return response["PublisherCollection"]
@@ -1191,7 +1203,7 @@ class CreatorIQProvider(RapidDataProviderBase):
             print(f"Error in search_publishers_by_name: {e}")
             return []
 
-    def create_list(self, name: str, description: str = None) -> Dict[str, Any]:
+    async def create_list(self, name: str, description: str = None) -> Dict[str, Any]:
         """
         Helper method to create a new publisher list
         
@@ -1210,9 +1222,9 @@ class CreatorIQProvider(RapidDataProviderBase):
             payload["Description"] = description
             
         print(f"Creating new list: {name}")
-        return self.call_endpoint("create_list", payload)
+        return await self.call_endpoint("create_list", payload)
     
-    def add_publishers_to_list(self, list_id: str, publisher_ids: List[str]) -> Dict[str, Any]:
+    async def add_publishers_to_list(self, list_id: str, publisher_ids: List[str]) -> Dict[str, Any]:
         """
         Helper method to add publishers to a list
         
@@ -1229,9 +1241,9 @@ class CreatorIQProvider(RapidDataProviderBase):
         }
         
         print(f"Adding {len(publisher_ids)} publishers to list {list_id}")
-        return self.call_endpoint("add_publisher_to_list", payload)
+        return await self.call_endpoint("add_publisher_to_list", payload)
     
-    def update_publisher_status(self, publisher_id: str, status: str) -> Dict[str, Any]:
+    async def update_publisher_status(self, publisher_id: str, status: str) -> Dict[str, Any]:
         """
         Helper method to update a publisher's status
         
@@ -1248,9 +1260,9 @@ class CreatorIQProvider(RapidDataProviderBase):
         }
         
         print(f"Updating publisher {publisher_id} status to {status}")
-        return self.call_endpoint("update_publisher", payload)
+        return await self.call_endpoint("update_publisher", payload)
     
-    def send_message_to_publisher(self, publisher_id: str, content: str, subject: str = None) -> Dict[str, Any]:
+    async def send_message_to_publisher(self, publisher_id: str, content: str, subject: str = None) -> Dict[str, Any]:
         """
         Helper method to send a message to a publisher
         
@@ -1271,7 +1283,7 @@ class CreatorIQProvider(RapidDataProviderBase):
             payload["Subject"] = subject
             
         print(f"Sending message to publisher {publisher_id}")
-        return self.call_endpoint("send_message", payload)
+        return await self.call_endpoint("send_message", payload)
 
 # Helper to get ISO formatted time without importing time module at the top level
 def import_time_module_and_get_iso_time():
@@ -1,38 +1,118 @@
 
-import os
-import requests
-from typing import Dict, Any, Optional
-from agent.tools.data_providers.RapidDataProviderBase import RapidDataProviderBase, EndpointSchema
+import httpx
+from contextlib import aclosing
+from typing import Dict, Any, Optional, AsyncIterator
+from agent.tools.data_providers.RapidDataProviderBase import RapidDataProviderBase, EndpointSchema, get_provider_client
+
+# Largest page the files.list API returns
+DRIVE_PAGE_SIZE = 1000
+# Files returned by a "files" call with all_pages unless max_files is given
+DEFAULT_MAX_FILES = 1000
+# File fields returned unless the payload asks for others. Drive returns far
+# more per file without a fields mask, which makes listing large drives slow
+DEFAULT_FILE_FIELDS = "id,name,mimeType,modifiedTime,size,parents"
+# Bytes read from the response at a time when streaming an export
+DRIVE_EXPORT_CHUNK_BYTES = 1024 * 1024
+
+
+def _flag(value: Any) -> bool:
+    """Interpret a payload flag sent as a bool or a string"""
+    return str(value).lower() == "true"
+
+
+def _list_fields_mask(fields: Optional[str]) -> str:
+    """Fields mask for files.list from a list of file fields or a full mask.
+
+    "id,name" becomes "nextPageToken,files(id,name)"; a mask that already
+    selects files(...) only gets nextPageToken added so paging keeps working.
+    """
+    fields = fields or DEFAULT_FILE_FIELDS
+    if "files(" not in fields:
+        fields = f"files({fields})"
+    if "nextPageToken" not in fields:
+        fields = f"nextPageToken,{fields}"
+    return fields
+
+
+def _range_header(range_start: Any, range_end: Any) -> Optional[str]:
+    """HTTP Range header value for an inclusive byte range, or None for the whole file."""
+    if range_start in (None, "") and range_end in (None, ""):
+        return None
+    start = int(range_start or 0)
+    if start < 0:
+        raise ValueError("range_start must not be negative")
+    if range_end in (None, ""):
+        return f"bytes={start}-"
+    end = int(range_end)
+    if end < start:
+        raise ValueError("range_end must not be before range_start")
+    return f"bytes={start}-{end}"
+
+
+def _drive_error(e: httpx.HTTPError) -> ValueError:
+    """Turn an HTTP error into a ValueError carrying Drive's error message."""
+    error_message = str(e)
+    if isinstance(e, httpx.HTTPStatusError):
+        try:
+            error_data = e.response.json()
+            if isinstance(error_data, dict) and "error" in error_data:
+                if isinstance(error_data["error"], dict) and "message" in error_data["error"]:
+                    error_message = error_data["error"]["message"]
+                else:
+                    error_message = str(error_data["error"])
+            error_message += f" (Status code: {e.response.status_code})"
+        except:
+            error_message = f"API error: {e.response.status_code} {e.response.reason_phrase}"
+    return ValueError(f"Google Drive API error: {error_message}")
+
 
 class GoogleDriveProvider(RapidDataProviderBase):
     """
     Provider for Google Drive API access.
     """
-    
+
     def __init__(self):
         # Define available endpoints
-        endpoints = {
+        endpoints: Dict[str, EndpointSchema] = {
             "files": {
                 "route": "/files",
                 "method": "GET",
                 "name": "List Files",
                 "description": "Get a list of files from Google Drive",
                 "payload": {
-                    "query": "Search query to filter files",
-                    "pageSize": "Number of files to return (default: 100)",
+                    "access_token": "Google OAuth access token",
+                    "query": "Search query to filter files (Drive query syntax, e.g. \"name contains 'report'\")",
+                    "pageSize": f"Number of files to return (default: 100, max: {DRIVE_PAGE_SIZE})",
                     "pageToken": "Token for pagination",
-                    "fields": "Fields to include in the response"
+                    "fields": f"Comma-separated file fields to include (default: {DEFAULT_FILE_FIELDS})",
+                    "all_pages": "Set to 'true' to follow nextPageToken and return the files of all pages",
+                    "max_files": f"With all_pages, stop after this many files (default: {DEFAULT_MAX_FILES})"
                 }
             },
             "file_content": {
                 "route": "/files/{file_id}/export",
                 "method": "GET",
                 "name": "Get File Content",
-                "description": "Get content of a specific Google Drive file",
+                "description": "Export a Google Docs, Sheets or Slides file in the given format. The content is streamed to a file in the workspace",
                 "payload": {
+                    "access_token": "Google OAuth access token",
                     "file_id": "ID of the file to retrieve",
-                    "mimeType": "MIME type for export (for Google Docs)"
-                }
+                    "mimeType": "MIME type for export (e.g. text/plain, text/csv, application/pdf)"
+                },
+                "stream": True
+            },
+            "file_download": {
+                "route": "/files/{file_id}",
+                "method": "GET",
+                "name": "Download File",
+                "description": "Download a stored file (not a Google Docs, Sheets or Slides file; export those with file_content), optionally only a byte range. The content is streamed to a file in the workspace",
+                "payload": {
+                    "access_token": "Google OAuth access token",
+                    "file_id": "ID of the file to download",
+                    "range_start": "First byte to download (optional, default: 0)",
+                    "range_end": "Last byte to download, inclusive (optional, default: end of file)"
+                },
+                "stream": True
             },
             "file_metadata": {
                 "route": "/files/{file_id}",
@@ -40,91 +120,220 @@ class GoogleDriveProvider(RapidDataProviderBase):
                 "name": "Get File Metadata",
                 "description": "Get metadata about a specific file",
                 "payload": {
+                    "access_token": "Google OAuth access token",
                     "file_id": "ID of the file to retrieve",
-                    "fields": "Comma-separated list of fields to include"
+                    "fields": f"Comma-separated list of fields to include (default: {DEFAULT_FILE_FIELDS})"
                 }
             }
         }
-        
+
         # Initialize with base URL and endpoints
         super().__init__(
             base_url="https://www.googleapis.com/drive/v3",
             endpoints=endpoints
         )
-    
-    def call_endpoint(self, route: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+
+    @staticmethod
+    def _headers(access_token: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {access_token}"}
+
+    async def _get_json(self, url: str, params: Dict[str, Any], access_token: str) -> Dict[str, Any]:
+        try:
+            response = await self.request("GET", url, params, self._headers(access_token))
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise _drive_error(e)
+
+    async def iter_files(
+            self,
+            access_token: str,
+            query: Optional[str] = None,
+            fields: Optional[str] = None,
+            page_size: int = DRIVE_PAGE_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over all files matching a query, fetching pages as they are consumed.
+
+        Args:
+            access_token: Google OAuth access token
+            query: Drive search query, or None for all files
+            fields: File fields or a full files.list fields mask
+            page_size: Files requested per page
+
+        Yields:
+            File resources with the requested fields
+        """
+        params = {"pageSize": min(int(page_size), DRIVE_PAGE_SIZE), "fields": _list_fields_mask(fields)}
+        if query:
+            params["q"] = query
+        while True:
+            page = await self._get_json(f"{self.base_url}/files", params, access_token)
+            for file in page.get("files", []):
+                yield file
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+            params = {**params, "pageToken": page_token}
+
+    async def iter_export(
+            self,
+            access_token: str,
+            file_id: str,
+            mime_type: str,
+            chunk_size: int = DRIVE_EXPORT_CHUNK_BYTES
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the export of a Google Workspace file without loading it into memory.
+
+        Args:
+            access_token: Google OAuth access token
+            file_id: ID of the file to export
+            mime_type: MIME type to export to
+            chunk_size: Maximum bytes per yielded chunk
+
+        Yields:
+            Chunks of the exported file
+        """
+        url = f"{self.base_url}/files/{file_id}/export"
+        async with aclosing(self._iter_response(url, {"mimeType": mime_type}, self._headers(access_token), chunk_size)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def iter_download(
+            self,
+            access_token: str,
+            file_id: str,
+            range_start: Optional[int] = None,
+            range_end: Optional[int] = None,
+            chunk_size: int = DRIVE_EXPORT_CHUNK_BYTES
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the content of a stored file, or an inclusive byte range of it.
+
+        Exports do not support ranges, so only files.get?alt=media downloads
+        can be fetched in parts.
+
+        Args:
+            access_token: Google OAuth access token
+            file_id: ID of the file to download
+            range_start: First byte to download
+            range_end: Last byte to download, inclusive
+            chunk_size: Maximum bytes per yielded chunk
+
+        Yields:
+            Chunks of the file
+        """
+        headers = self._headers(access_token)
+        range_header = _range_header(range_start, range_end)
+        if range_header:
+            headers["Range"] = range_header
+        url = f"{self.base_url}/files/{file_id}"
+        async with aclosing(self._iter_response(url, {"alt": "media"}, headers, chunk_size)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def _iter_response(self, url: str, params: Dict[str, Any], headers: Dict[str, str],
+                             chunk_size: int) -> AsyncIterator[bytes]:
+        """Stream the body of a GET request in chunks."""
+        try:
+            async with get_provider_client().stream("GET", url, params=params, headers=headers) as response:
+                if response.is_error:
+                    # Read the error body so its message can be reported
+                    await response.aread()
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+        except httpx.HTTPError as e:
+            raise _drive_error(e)
+
+    @staticmethod
+    def _take_access_token(payload: Optional[Dict[str, Any]]) -> str:
+        access_token = payload.pop("access_token", None) if payload else None
+        if not access_token:
+            raise ValueError("No Google Drive access token provided in payload")
+        return access_token
+
+    async def stream_endpoint(self, route: str, payload: Optional[Dict[str, Any]] = None) -> AsyncIterator[bytes]:
+        """
+        Stream the content of a file_content export or a file_download in chunks.
+
+        Args:
+            route: The endpoint route key
+            payload: Dictionary containing access_token and file_id, plus mimeType
+                for an export or an optional range_start and range_end for a download
+
+        Yields:
+            Chunks of the file
+        """
+        payload = dict(payload or {})
+        access_token = self._take_access_token(payload)
+        route = route.lstrip("/")
+        if route == "file_content":
+            if not payload.get("file_id") or not payload.get("mimeType"):
+                raise ValueError("file_id and mimeType are required to export a file")
+            chunks = self.iter_export(access_token, payload["file_id"], payload["mimeType"])
+        elif route == "file_download":
+            if not payload.get("file_id"):
+                raise ValueError("file_id is required to download a file")
+            chunks = self.iter_download(access_token, payload["file_id"],
+                                        payload.get("range_start"), payload.get("range_end"))
+        else:
+            raise ValueError(f"Endpoint {route} does not stream content")
+        async with aclosing(chunks) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def call_endpoint(self, route: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Override the call_endpoint method to handle Google Drive specific authentication and parameters.
-        
+
+        Listing and metadata calls request only DEFAULT_FILE_FIELDS unless the
+        payload sets fields. A "files" call with all_pages follows
+        nextPageToken until max_files files are collected.
+
         Args:
             route: The endpoint route key
             payload: Dictionary containing parameters for the request
-            
+
         Returns:
             The API response as a dictionary
         """
-        try:
-            # Extract access token from payload
-            access_token = None
-            if payload and "access_token" in payload:
-                access_token = payload.pop("access_token")
-            
-            if not access_token:
-                raise ValueError("No Google Drive access token provided in payload")
-                
-            # Get the endpoint configuration
-            endpoint = self.endpoints.get(route)
-            if not endpoint:
-                raise ValueError(f"Endpoint {route} not found in Google Drive provider")
-            
-            # Format route if it contains path parameters
-            formatted_route = endpoint["route"]
-            method = endpoint.get("method", "GET").upper()
-            
-            # Handle path parameters (e.g., {file_id} in the route)
-            if payload and "{" in formatted_route:
-                for key, value in payload.items():
-                    if "{" + key + "}" in formatted_route:
-                        formatted_route = formatted_route.replace("{" + key + "}", str(value))
-                        # Remove used path parameters from payload
-                        payload = {k: v for k, v in payload.items() if k != key}
-            
-            # Build the complete URL
-            url = f"{self.base_url}{formatted_route}"
-            
-            # Set up headers for Google Drive API
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Make the request
-            if method == "GET":
-                response = requests.get(url, params=payload, headers=headers)
-            elif method == "POST":
-                response = requests.post(url, json=payload, headers=headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            # Check for errors
-            response.raise_for_status()
-            
-            # Return the response data
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            # Handle API errors
-            error_message = str(e)
-            if hasattr(e, "response") and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    if isinstance(error_data, dict) and "error" in error_data:
-                        if isinstance(error_data["error"], dict) and "message" in error_data["error"]:
-                            error_message = error_data["error"]["message"]
-                        else:
-                            error_message = str(error_data["error"])
-                    error_message += f" (Status code: {e.response.status_code})"
-                except:
-                    error_message = f"API error: {e.response.status_code} {e.response.reason}"
-            
-            raise ValueError(f"Google Drive API error: {error_message}")
+        payload = dict(payload or {})
+        access_token = self._take_access_token(payload)
+        route = route.lstrip("/")
+
+        # Get the endpoint configuration
+        endpoint = self.endpoints.get(route)
+        if not endpoint:
+            raise ValueError(f"Endpoint {route} not found in Google Drive provider")
+
+        if route == "files":
+            if _flag(payload.get("all_pages")):
+                max_files = int(payload.get("max_files") or DEFAULT_MAX_FILES)
+                files = []
+                truncated = False
+                async with aclosing(self.iter_files(access_token, payload.get("query"), payload.get("fields"))) as all_files:
+                    async for file in all_files:
+                        if len(files) >= max_files:
+                            truncated = True
+                            break
+                        files.append(file)
+                return {"files": files, "truncated": truncated}
+
+            params = {"fields": _list_fields_mask(payload.get("fields"))}
+            if payload.get("query"):
+                params["q"] = payload["query"]
+            for key in ("pageSize", "pageToken"):
+                if payload.get(key):
+                    params[key] = payload[key]
+            return await self._get_json(f"{self.base_url}/files", params, access_token)
+
+        if endpoint.get("stream"):
+            raise ValueError(f"Endpoint {route} returns file content; read it with stream_endpoint")
+
+        if not payload.get("file_id"):
+            raise ValueError("file_id is required")
+
+        params = {"fields": payload.get("fields") or DEFAULT_FILE_FIELDS}
+        return await self._get_json(f"{self.base_url}/files/{payload['file_id']}", params, access_token)
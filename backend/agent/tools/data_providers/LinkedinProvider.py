@@ -9,6 +9,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "person": {
                 "route": "/person",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Person Data",
                 "description": "Fetches any Linkedin profiles data including skills, certificates, experiences, qualifications and much more.",
                 "payload": {
@@ -18,6 +19,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "person_urn": {
                 "route": "/person_urn",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Person Data (Using Urn)",
                 "description": "It takes profile urn instead of profile public identifier in input",
                 "payload": {
@@ -27,6 +29,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "person_deep": {
                 "route": "/person_deep",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Person Data (Deep)",
                 "description": "Fetches all experiences, educations, skills, languages, publications... related to a profile.",
                 "payload": {
@@ -36,6 +39,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "profile_updates": {
                 "route": "/profile_updates",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Person Posts (WITH PAGINATION)",
                 "description": "Fetches posts of a linkedin profile alongwith reactions, comments, postLink and reposts data.",
                 "payload": {
@@ -48,6 +52,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "profile_recent_comments": {
                 "route": "/profile_recent_comments",
                 "method": "POST",
+                "cache_ttl": 3600,
                 "name": "Person Recent Activity (Comments on Posts)",
                 "description": "Fetches 20 most recent comments posted by a linkedin user (per page).",
                 "payload": {
@@ -59,6 +64,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "comments_from_recent_activity": {
                 "route": "/comments_from_recent_activity",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Comments from recent activity",
                 "description": "Fetches recent comments posted by a person as per his recent activity tab.",
                 "payload": {
@@ -69,6 +75,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "person_skills": {
                 "route": "/person_skills",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Person Skills",
                 "description": "Scraper all skills of a linkedin user",
                 "payload": {
@@ -78,6 +85,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "email_to_linkedin_profile": {
                 "route": "/email_to_linkedin_profile",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Email to LinkedIn Profile",
                 "description": "Finds LinkedIn profile associated with an email address",
                 "payload": {
@@ -87,6 +95,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "company": {
                 "route": "/company",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Company Data",
                 "description": "Fetches LinkedIn company profile data",
                 "payload": {
@@ -96,6 +105,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "web_domain": {
                 "route": "/web-domain",
                 "method": "POST",
+                "cache_ttl": 86400,
                 "name": "Web Domain to Company",
                 "description": "Fetches LinkedIn company profile data from a web domain",
                 "payload": {
@@ -105,6 +115,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "similar_profiles": {
                 "route": "/similar_profiles",
                 "method": "GET",
+                "cache_ttl": 86400,
                 "name": "Similar Profiles",
                 "description": "Fetches profiles similar to a given LinkedIn profile",
                 "payload": {
@@ -114,6 +125,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "company_jobs": {
                 "route": "/company_jobs",
                 "method": "POST",
+                "cache_ttl": 3600,
                 "name": "Company Jobs",
                 "description": "Fetches job listings from a LinkedIn company page",
                 "payload": {
@@ -124,6 +136,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "company_updates": {
                 "route": "/company_updates",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Company Posts",
                 "description": "Fetches posts from a LinkedIn company page",
                 "payload": {
@@ -136,6 +149,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "company_employee": {
                 "route": "/company_employee",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Company Employees",
                 "description": "Fetches employees of a LinkedIn company using company ID",
                 "payload": {
@@ -146,6 +160,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "company_updates_post": {
                 "route": "/company_updates",
                 "method": "POST",
+                "cache_ttl": 3600,
                 "name": "Company Posts (POST)",
                 "description": "Fetches posts from a LinkedIn company page with specific count parameters",
                 "payload": {
@@ -158,6 +173,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "search_posts_with_filters": {
                 "route": "/search_posts_with_filters",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Search Posts With Filters",
                 "description": "Searches LinkedIn posts with various filtering options",
                 "payload": {
@@ -177,6 +193,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "search_jobs": {
                 "route": "/search_jobs",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Search Jobs",
                 "description": "Searches LinkedIn jobs with various filtering options",
                 "payload": {
@@ -199,6 +216,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "search_people_with_filters": {
                 "route": "/search_people_with_filters",
                 "method": "POST",
+                "cache_ttl": 3600,
                 "name": "Search People With Filters",
                 "description": "Searches LinkedIn profiles with detailed filtering options",
                 "payload": {
@@ -221,6 +239,7 @@ class LinkedinProvider(RapidDataProviderBase):
             "search_company_with_filters": {
                 "route": "/search_company_with_filters",
                 "method": "POST",
+                "cache_ttl": 3600,
                 "name": "Search Company With Filters",
                 "description": "Searches LinkedIn companies with detailed filtering options",
                 "payload": {
@@ -238,13 +257,17 @@ class LinkedinProvider(RapidDataProviderBase):
 
 
 if __name__ == "__main__":
+    import asyncio
     from dotenv import load_dotenv
     load_dotenv()
-    tool = LinkedinProvider()
 
-    result = tool.call_endpoint(
-        route="comments_from_recent_activity",
-        payload={"profile_url": "https://www.linkedin.com/in/adamcohenhillel/", "page": 1}
-    )
-    print(result)
+    async def main():
+        tool = LinkedinProvider()
 
+        result = await tool.call_endpoint(
+            route="comments_from_recent_activity",
+            payload={"profile_url": "https://www.linkedin.com/in/adamcohenhillel/", "page": 1}
+        )
+        print(result)
+
+    asyncio.run(main())
@@ -1,6 +1,13 @@
 import os
-import requests
-from typing import Dict, Any, Optional, TypedDict, Literal
+import copy
+import random
+import asyncio
+import httpx
+from urllib.parse import urlsplit
+from typing import Dict, Any, Optional, TypedDict, Literal, NotRequired
+
+from agent.tools.data_providers.response_cache import get_response_cache
+from utils.logger import logger
 
 
 class EndpointSchema(TypedDict):
@@ -9,29 +16,184 @@ class EndpointSchema(TypedDict):
     name: str
     description: str
     payload: Dict[str, Any]
+    # Seconds a response stays fresh in the response cache; omitted means never cached
+    cache_ttl: NotRequired[int]
+    # The response is file content, read with the provider's stream_endpoint(route, payload)
+    # async generator instead of call_endpoint
+    stream: NotRequired[bool]
+
+
+# Shared HTTP client settings for all data providers
+PROVIDER_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+PROVIDER_MAX_CONNECTIONS = 100
+PROVIDER_MAX_KEEPALIVE_CONNECTIONS = 20
+# Concurrent requests allowed to a single upstream host
+PROVIDER_MAX_CONNECTIONS_PER_HOST = 10
+
+# Retry configuration
+PROVIDER_MAX_RETRIES = 3
+BASE_RETRY_DELAY = 0.5  # Start with 500ms delay
+MAX_RETRY_DELAY = 8.0  # Maximum delay of 8 seconds
+RETRY_JITTER = 0.1  # Add 10% random jitter to retry delay
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these methods are retried after the request may have reached the server
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+_client: Optional[httpx.AsyncClient] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_provider_client() -> httpx.AsyncClient:
+    """Get the keep-alive client shared by all data providers, creating it if needed."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=PROVIDER_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=PROVIDER_MAX_CONNECTIONS,
+                max_keepalive_connections=PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+def _host_semaphore(host: str) -> asyncio.Semaphore:
+    """Semaphore limiting the concurrent requests to one host."""
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(PROVIDER_MAX_CONNECTIONS_PER_HOST)
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Backoff before the next attempt, honouring a numeric Retry-After header."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY)
+    delay = min(BASE_RETRY_DELAY * (2 ** (attempt - 1)), MAX_RETRY_DELAY)
+    return delay + delay * RETRY_JITTER * random.uniform(-1, 1)
+
+
+async def request_with_retry(
+        method: str,
+        url: str,
+        payload: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """
+    Send a request over the shared client with exponential backoff retry.
+
+    GET requests send the payload as query parameters, other methods as a JSON
+    body. Throttling and server errors are retried for idempotent methods only;
+    connection failures, where nothing reached the server, are retried for all.
+
+    Returns:
+        httpx.Response: The last response received
+    """
+    method = method.upper()
+    client = get_provider_client()
+    request_kwargs = {"params": payload} if method == "GET" else {"json": payload}
+
+    # Held per attempt only, so a request backing off does not keep a slot
+    # other requests to the host could use
+    semaphore = _host_semaphore(urlsplit(url).netloc)
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            async with semaphore:
+                response = await client.request(method, url, headers=headers, **request_kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            if attempt > PROVIDER_MAX_RETRIES:
+                raise
+            wait_time = _retry_delay(attempt)
+            logger.warning(f"Data provider request to {url} failed (attempt {attempt}/{PROVIDER_MAX_RETRIES + 1}): {str(e)}. Retrying in {wait_time:.2f}s")
+        except httpx.TransportError as e:
+            if method not in IDEMPOTENT_METHODS or attempt > PROVIDER_MAX_RETRIES:
+                raise
+            wait_time = _retry_delay(attempt)
+            logger.warning(f"Data provider request to {url} failed (attempt {attempt}/{PROVIDER_MAX_RETRIES + 1}): {str(e)}. Retrying in {wait_time:.2f}s")
+        else:
+            if (response.status_code not in RETRY_STATUS_CODES
+                    or method not in IDEMPOTENT_METHODS
+                    or attempt > PROVIDER_MAX_RETRIES):
+                return response
+            wait_time = _retry_delay(attempt, response)
+            logger.warning(f"Data provider request to {url} returned {response.status_code} (attempt {attempt}/{PROVIDER_MAX_RETRIES + 1}). Retrying in {wait_time:.2f}s")
+        await asyncio.sleep(wait_time)
 
 
 class RapidDataProviderBase:
     def __init__(self, base_url: str, endpoints: Dict[str, EndpointSchema]):
         self.base_url = base_url
         self.endpoints = endpoints
-    
+
     def get_endpoints(self):
         return self.endpoints
-    
-    def call_endpoint(
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        """
+        Send a request to the provider through the shared pooled client.
+
+        Args:
+            method (str): HTTP method
+            url (str): Full request URL
+            payload (dict, optional): Query parameters for GET, JSON body otherwise
+            headers (dict, optional): Request headers
+
+        Returns:
+            httpx.Response: The response from the API
+        """
+        return await request_with_retry(method, url, payload, headers)
+
+    async def call_endpoint_cached(
+            self,
+            route: str,
+            payload: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Call an API endpoint through the response cache.
+
+        Only endpoints that declare a cache_ttl are cached; others are called directly.
+
+        Args:
+            route (str): The key of the endpoint to call
+            payload (dict, optional): The payload to send with the call
+
+        Returns:
+            dict: The (possibly cached) JSON response from the API
+        """
+        endpoint = self.endpoints.get(route.lstrip("/")) or {}
+        # Providers may modify the payload they are given, so each call gets its own copy
+        return await get_response_cache().get_or_fetch(
+            type(self).__name__,
+            route.lstrip("/"),
+            payload,
+            endpoint.get("cache_ttl"),
+            lambda: self.call_endpoint(route, copy.deepcopy(payload))
+        )
+
+    async def call_endpoint(
             self,
             route: str,
             payload: Optional[Dict[str, Any]] = None
     ):
         """
         Call an API endpoint with the given parameters and data.
-        
+
         Args:
-            endpoint (EndpointSchema): The endpoint configuration dictionary
-            params (dict, optional): Query parameters for GET requests
-            payload (dict, optional): JSON payload for POST requests
-            
+            route (str): The key of the endpoint to call
+            payload (dict, optional): Query parameters for GET requests, JSON body for POST requests
+
         Returns:
             dict: The JSON response from the API
         """
@@ -41,9 +203,9 @@ class RapidDataProviderBase:
         endpoint = self.endpoints.get(route)
         if not endpoint:
             raise ValueError(f"Endpoint {route} not found")
-        
+
         url = f"{self.base_url}{endpoint['route']}"
-        
+
         headers = {
             "x-rapidapi-key": os.getenv("RAPID_API_KEY"),
             "x-rapidapi-host": url.split("//")[1].split("/")[0],
@@ -51,11 +213,8 @@ class RapidDataProviderBase:
         }
 
         method = endpoint.get('method', 'GET').upper()
-        
-        if method == 'GET':
-            response = requests.get(url, params=payload, headers=headers)
-        elif method == 'POST':
-            response = requests.post(url, json=payload, headers=headers)
-        else:
+        if method not in ('GET', 'POST'):
             raise ValueError(f"Unsupported HTTP method: {method}")
+
+        response = await self.request(method, url, payload, headers)
         return response.json()
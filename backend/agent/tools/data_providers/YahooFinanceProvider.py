@@ -9,6 +9,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_tickers": {
                 "route": "/v2/markets/tickers",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Yahoo Finance Tickers",
                 "description": "Get financial tickers from Yahoo Finance with various filters and parameters.",
                 "payload": {
@@ -19,6 +20,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "search": {
                 "route": "/v1/markets/search",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Yahoo Finance Search",
                 "description": "Search for financial instruments on Yahoo Finance",
                 "payload": {
@@ -28,6 +30,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_news": {
                 "route": "/v2/markets/news",
                 "method": "GET",
+                "cache_ttl": 300,
                 "name": "Yahoo Finance News",
                 "description": "Get news related to specific tickers from Yahoo Finance",
                 "payload": {
@@ -38,6 +41,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_stock_module": {
                 "route": "/v1/markets/stock/modules",
                 "method": "GET",
+                "cache_ttl": 60,
                 "name": "Yahoo Finance Stock Module",
                 "description": "Get detailed information about a specific stock module",
                 "payload": {
@@ -48,6 +52,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_sma": {
                 "route": "/v1/markets/indicators/sma",
                 "method": "GET",
+                "cache_ttl": 300,
                 "name": "Yahoo Finance SMA Indicator",
                 "description": "Get Simple Moving Average (SMA) indicator data for a stock",
                 "payload": {
@@ -61,6 +66,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_rsi": {
                 "route": "/v1/markets/indicators/rsi",
                 "method": "GET",
+                "cache_ttl": 300,
                 "name": "Yahoo Finance RSI Indicator",
                 "description": "Get Relative Strength Index (RSI) indicator data for a stock",
                 "payload": {
@@ -74,6 +80,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_earnings_calendar": {
                 "route": "/v1/markets/calendar/earnings",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Yahoo Finance Earnings Calendar",
                 "description": "Get earnings calendar data for a specific date",
                 "payload": {
@@ -83,6 +90,7 @@ class YahooFinanceProvider(RapidDataProviderBase):
             "get_insider_trades": {
                 "route": "/v1/markets/insider-trades",
                 "method": "GET",
+                "cache_ttl": 3600,
                 "name": "Yahoo Finance Insider Trades",
                 "description": "Get recent insider trading activity",
                 "payload": {}
@@ -93,98 +101,102 @@ class YahooFinanceProvider(RapidDataProviderBase):
 
 
 if __name__ == "__main__":
+    import asyncio
     from dotenv import load_dotenv
     load_dotenv()
-    tool = YahooFinanceProvider()
 
-    # Example for getting stock tickers
-    tickers_result = tool.call_endpoint(
-        route="get_tickers",
-        payload={
-            "page": 1,
-            "type": "STOCKS"
-        }
-    )
-    print("Tickers Result:", tickers_result)
+    async def main():
+        tool = YahooFinanceProvider()
+
+        # Example for getting stock tickers
+        tickers_result = await tool.call_endpoint(
+            route="get_tickers",
+            payload={
+                "page": 1,
+                "type": "STOCKS"
+            }
+        )
+        print("Tickers Result:", tickers_result)
     
-    # Example for searching financial instruments
-    search_result = tool.call_endpoint(
-        route="search",
-        payload={
-            "search": "AA"
-        }
-    )
-    print("Search Result:", search_result)
+        # Example for searching financial instruments
+        search_result = await tool.call_endpoint(
+            route="search",
+            payload={
+                "search": "AA"
+            }
+        )
+        print("Search Result:", search_result)
     
-    # Example for getting financial news
-    news_result = tool.call_endpoint(
-        route="get_news",
-        payload={
-            "tickers": "AAPL",
-            "type": "ALL"
-        }
-    )
-    print("News Result:", news_result)
+        # Example for getting financial news
+        news_result = await tool.call_endpoint(
+            route="get_news",
+            payload={
+                "tickers": "AAPL",
+                "type": "ALL"
+            }
+        )
+        print("News Result:", news_result)
     
-    # Example for getting stock asset profile module
-    stock_module_result = tool.call_endpoint(
-        route="get_stock_module",
-        payload={
-            "ticker": "AAPL",
-            "module": "asset-profile"
-        }
-    )
-    print("Asset Profile Result:", stock_module_result)
+        # Example for getting stock asset profile module
+        stock_module_result = await tool.call_endpoint(
+            route="get_stock_module",
+            payload={
+                "ticker": "AAPL",
+                "module": "asset-profile"
+            }
+        )
+        print("Asset Profile Result:", stock_module_result)
     
-    # Example for getting financial data module
-    financial_data_result = tool.call_endpoint(
-        route="get_stock_module",
-        payload={
-            "ticker": "AAPL",
-            "module": "financial-data"
-        }
-    )
-    print("Financial Data Result:", financial_data_result)
+        # Example for getting financial data module
+        financial_data_result = await tool.call_endpoint(
+            route="get_stock_module",
+            payload={
+                "ticker": "AAPL",
+                "module": "financial-data"
+            }
+        )
+        print("Financial Data Result:", financial_data_result)
     
-    # Example for getting SMA indicator data
-    sma_result = tool.call_endpoint(
-        route="get_sma",
-        payload={
-            "symbol": "AAPL",
-            "interval": "5m",
-            "series_type": "close",
-            "time_period": "50",
-            "limit": "50"
-        }
-    )
-    print("SMA Result:", sma_result)
+        # Example for getting SMA indicator data
+        sma_result = await tool.call_endpoint(
+            route="get_sma",
+            payload={
+                "symbol": "AAPL",
+                "interval": "5m",
+                "series_type": "close",
+                "time_period": "50",
+                "limit": "50"
+            }
+        )
+        print("SMA Result:", sma_result)
     
-    # Example for getting RSI indicator data
-    rsi_result = tool.call_endpoint(
-        route="get_rsi",
-        payload={
-            "symbol": "AAPL",
-            "interval": "5m",
-            "series_type": "close",
-            "time_period": "50",
-            "limit": "50"
-        }
-    )
-    print("RSI Result:", rsi_result)
+        # Example for getting RSI indicator data
+        rsi_result = await tool.call_endpoint(
+            route="get_rsi",
+            payload={
+                "symbol": "AAPL",
+                "interval": "5m",
+                "series_type": "close",
+                "time_period": "50",
+                "limit": "50"
+            }
+        )
+        print("RSI Result:", rsi_result)
     
-    # Example for getting earnings calendar data
-    earnings_calendar_result = tool.call_endpoint(
-        route="get_earnings_calendar",
-        payload={
-            "date": "2023-11-30"
-        }
-    )
-    print("Earnings Calendar Result:", earnings_calendar_result)
+        # Example for getting earnings calendar data
+        earnings_calendar_result = await tool.call_endpoint(
+            route="get_earnings_calendar",
+            payload={
+                "date": "2023-11-30"
+            }
+        )
+        print("Earnings Calendar Result:", earnings_calendar_result)
     
-    # Example for getting insider trades
-    insider_trades_result = tool.call_endpoint(
-        route="get_insider_trades",
-        payload={}
-    )
-    print("Insider Trades Result:", insider_trades_result)
+        # Example for getting insider trades
+        insider_trades_result = await tool.call_endpoint(
+            route="get_insider_trades",
+            payload={}
+        )
+        print("Insider Trades Result:", insider_trades_result)
 
+    asyncio.run(main())
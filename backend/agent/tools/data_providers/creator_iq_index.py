@@ -0,0 +1,247 @@
+"""
+Local searchable index of Creator IQ lists, campaigns and publishers.
+
+Searching by name through the API means fetching a page and filtering it,
+which misses everything on other pages. The index keeps every entity in the
+creator_iq_index table and searches it with the search_creator_iq_index
+function (prefix, substring and trigram matches).
+
+The API has no modified-since filter, so the index cannot fetch only what
+changed. Instead each entity type is synced in passes over its pages, done in
+chunks of SYNC_PAGES_PER_CHUNK pages. The cursor of the pass in progress and
+the time of the last complete pass are kept in creator_iq_index_sync, and a
+worker must claim a lease there before syncing a chunk, so one worker syncs
+each type at a time and the pass resumes where it stopped. A new pass starts
+once the last complete one is older than CREATOR_IQ_INDEX_MAX_AGE; at the end
+of a pass, entities it did not see are removed.
+
+Searches never wait for a sync: until the first pass of a type completes,
+they return None and the caller searches the API instead.
+"""
+
+import os
+import asyncio
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+from services.supabase import DBConnection
+from utils.logger import logger
+
+CREATOR_IQ_INDEX_ENABLED = os.getenv("CREATOR_IQ_INDEX_ENABLED", "true").lower() == "true"
+# Seconds after the last complete pass at which a new sync pass starts
+CREATOR_IQ_INDEX_MAX_AGE = int(os.getenv("CREATOR_IQ_INDEX_MAX_AGE", "900"))
+# Pages fetched per sync chunk, and items per page
+SYNC_PAGES_PER_CHUNK = 20
+SYNC_PAGE_SIZE = 50
+# Seconds a worker holds the sync of an entity type for one chunk
+SYNC_LEASE_SECONDS = 300
+# Rows written per upsert request during a sync
+SYNC_BATCH_SIZE = 500
+
+INDEX_TABLE = "creator_iq_index"
+SYNC_TABLE = "creator_iq_index_sync"
+
+
+def _item_id(wrapper_key: str, id_key: str) -> Callable[[Dict[str, Any]], Optional[str]]:
+    def get_id(item: Dict[str, Any]) -> Optional[str]:
+        value = (item.get(wrapper_key) or {}).get(id_key)
+        return str(value) if value is not None else None
+    return get_id
+
+
+def _item_name(wrapper_key: str, *name_keys: str) -> Callable[[Dict[str, Any]], str]:
+    def get_name(item: Dict[str, Any]) -> str:
+        details = item.get(wrapper_key) or {}
+        for key in name_keys:
+            if details.get(key):
+                return str(details[key])
+        return ""
+    return get_name
+
+
+# Entity type -> (provider route, response collection key, id getter, name getter)
+INDEXED_ENTITIES: Dict[str, Tuple[str, str, Callable, Callable]] = {
+    "list": ("lists", "ListsCollection", _item_id("List", "Id"), _item_name("List", "Name")),
+    "campaign": ("campaigns", "CampaignCollection", _item_id("Campaign", "CampaignId"),
+                 _item_name("Campaign", "CampaignName")),
+    "publisher": ("publishers", "PublisherCollection", _item_id("Publisher", "Id"),
+                  _item_name("Publisher", "PublisherName", "Username")),
+}
+
+# Provider route -> entity type
+ENTITY_TYPE_BY_ROUTE = {route: entity_type for entity_type, (route, *_) in INDEXED_ENTITIES.items()}
+
+
+class CreatorIQIndex:
+    """Synced copy of the Creator IQ entities, searchable by name."""
+
+    def __init__(self):
+        self.db = DBConnection()
+        # Entity type -> sync running in this process, so concurrent searches share one
+        self._refreshes: Dict[str, asyncio.Task] = {}
+
+    async def _sync_state(self, entity_type: str) -> Optional[Dict[str, Any]]:
+        """Shared sync state of an entity type, if it was ever synced."""
+        client = await self.db.client
+        result = await client.table(SYNC_TABLE).select("*").eq("entity_type", entity_type).execute()
+        return result.data[0] if result.data else None
+
+    async def _claim_chunk(self, entity_type: str) -> Optional[Dict[str, Any]]:
+        """Claim the next sync chunk of an entity type, if one is due and no other worker holds it."""
+        client = await self.db.client
+        result = await client.rpc("claim_creator_iq_index_sync", {
+            "p_entity_type": entity_type,
+            "lease_seconds": SYNC_LEASE_SECONDS,
+            "max_age_seconds": CREATOR_IQ_INDEX_MAX_AGE,
+        }).execute()
+        return result.data[0] if result.data else None
+
+    async def _sync_chunk(self, provider, entity_type: str, state: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Sync the next SYNC_PAGES_PER_CHUNK pages of a pass and move its cursor.
+
+        Returns:
+            Number of entities written, and whether the pass is now complete
+        """
+        route, collection_key, get_id, get_name = INDEXED_ENTITIES[entity_type]
+        now = datetime.now(timezone.utc).isoformat()
+        next_page = state["next_page"]
+        pass_started_at = state["pass_started_at"] if next_page > 1 else now
+
+        rows = {}
+        last_page = next_page
+        total_pages = 1
+        async with aclosing(provider.iter_pages(route, {}, SYNC_PAGE_SIZE, SYNC_PAGES_PER_CHUNK, next_page)) as pages:
+            async for page, response in pages:
+                if response.get("error"):
+                    raise RuntimeError(f"Fetching Creator IQ {route} page {page} failed: {response['error']}")
+                total_pages = int(response.get("total_pages", 1))
+                last_page = page
+                for item in response.get(collection_key, []):
+                    entity_id = get_id(item)
+                    if entity_id:
+                        rows[entity_id] = {
+                            "entity_type": entity_type,
+                            "entity_id": entity_id,
+                            "name": get_name(item),
+                            "data": item,
+                            "synced_at": now,
+                        }
+
+        client = await self.db.client
+        batch = list(rows.values())
+        for start in range(0, len(batch), SYNC_BATCH_SIZE):
+            await client.table(INDEX_TABLE).upsert(batch[start:start + SYNC_BATCH_SIZE]).execute()
+
+        complete = last_page >= total_pages
+        update = {"refreshed_at": now, "lease_until": None}
+        if complete:
+            # Entities not seen during a complete pass were deleted upstream
+            await client.table(INDEX_TABLE).delete() \
+                .eq("entity_type", entity_type) \
+                .lt("synced_at", pass_started_at) \
+                .execute()
+            update.update(next_page=1, pass_started_at=None, last_complete_at=now)
+        else:
+            update.update(next_page=last_page + 1, pass_started_at=pass_started_at)
+        await client.table(SYNC_TABLE).update(update).eq("entity_type", entity_type).execute()
+
+        logger.info(f"Synced {len(rows)} Creator IQ {route} from pages {next_page}-{last_page} of {total_pages} into the search index")
+        return len(rows), complete
+
+    async def sync(self, provider, entity_type: str) -> int:
+        """
+        Sync the due chunks of an entity type while this worker can claim them.
+
+        Args:
+            provider: The CreatorIQProvider used to page through the API
+            entity_type: "list", "campaign" or "publisher"
+
+        Returns:
+            Number of entities written
+        """
+        written = 0
+        while True:
+            state = await self._claim_chunk(entity_type)
+            if state is None:
+                return written
+            try:
+                count, complete = await self._sync_chunk(provider, entity_type, state)
+            except BaseException:
+                # Let another attempt resume from the same cursor right away
+                client = await self.db.client
+                await client.table(SYNC_TABLE).update({"lease_until": None}).eq("entity_type", entity_type).execute()
+                raise
+            written += count
+            if complete:
+                return written
+
+    def refresh_in_background(self, provider, entity_type: str) -> asyncio.Task:
+        """Start syncing an entity type unless this process is already syncing it."""
+        task = self._refreshes.get(entity_type)
+        if task is None or task.done():
+            task = asyncio.create_task(self.sync(provider, entity_type))
+            task.add_done_callback(lambda t: self._log_refresh_failure(entity_type, t))
+            self._refreshes[entity_type] = task
+        return task
+
+    @staticmethod
+    def _log_refresh_failure(entity_type: str, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Refreshing the Creator IQ {entity_type} index failed: {task.exception()}")
+
+    async def search(self, provider, entity_type: str, query: str, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """
+        Search one entity type by name.
+
+        A sync is started in the background when one is due; the search does
+        not wait for it.
+
+        Args:
+            provider: The CreatorIQProvider used when a sync is needed
+            entity_type: "list", "campaign" or "publisher"
+            query: Name or part of a name
+            limit: Maximum number of results
+
+        Returns:
+            Dict with 'items' (API-shaped entities with their 'match_type' and
+            'score'), 'synced_at' (ISO timestamp of the last complete pass) and
+            'refreshing', or None if no pass has completed yet
+        """
+        state = await self._sync_state(entity_type)
+        last_complete_at = state and state.get("last_complete_at")
+        refreshing = True
+        if last_complete_at:
+            age = (datetime.now(timezone.utc) - datetime.fromisoformat(last_complete_at)).total_seconds()
+            refreshing = age > CREATOR_IQ_INDEX_MAX_AGE or state["next_page"] > 1
+        if refreshing:
+            self.refresh_in_background(provider, entity_type)
+        if not last_complete_at:
+            return None
+
+        client = await self.db.client
+        result = await client.rpc("search_creator_iq_index", {
+            "p_entity_type": entity_type,
+            "query": query,
+            "limit_count": limit,
+        }).execute()
+
+        items: List[Dict[str, Any]] = []
+        for row in result.data or []:
+            item = row["data"]
+            item["match_type"] = row["match_type"]
+            item["score"] = row["score"]
+            items.append(item)
+        return {"items": items, "synced_at": last_complete_at, "refreshing": refreshing}
+
+
+_index: Optional[CreatorIQIndex] = None
+
+
+def get_creator_iq_index() -> CreatorIQIndex:
+    """Get the process-wide Creator IQ index, creating it if needed."""
+    global _index
+    if _index is None:
+        _index = CreatorIQIndex()
+    return _index
@@ -0,0 +1,157 @@
+"""
+Catalog of the endpoints of all data providers.
+
+Returning every provider's full endpoint dict costs thousands of tokens per
+provider, so the catalog offers three cheaper views, all built once per
+process from the (static) endpoint definitions:
+
+- a compact summary with one line per endpoint
+- keyword search across all providers
+- the full schemas of only the endpoints asked for
+"""
+
+import re
+from typing import Dict, Any, Optional, List, Iterable
+
+# Characters of an endpoint description kept in its summary line
+MAX_SUMMARY_DESCRIPTION_CHARS = 100
+DEFAULT_SEARCH_LIMIT = 8
+
+# Weight of a query word found in each field of an endpoint
+SEARCH_FIELD_WEIGHTS = {
+    "route": 3,
+    "name": 3,
+    "service": 2,
+    "params": 2,
+    "description": 1,
+}
+# Endpoint schema keys used by the providers themselves, left out of returned schemas
+INTERNAL_SCHEMA_KEYS = {"cache_ttl", "stream"}
+STOP_WORDS = {"a", "an", "and", "by", "for", "from", "get", "in", "of", "on", "or", "the", "to", "with"}
+
+
+def _words(text: str) -> List[str]:
+    """Lowercase words of a text, splitting snake_case and camelCase too."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return [word for word in re.split(r"[^a-z0-9]+", text.lower()) if word]
+
+
+def _short_description(description: str) -> str:
+    """First sentence of a description, capped at MAX_SUMMARY_DESCRIPTION_CHARS."""
+    description = " ".join(description.split())
+    first_sentence = re.split(r"(?<=[.!?])\s", description, maxsplit=1)[0]
+    if len(first_sentence) > MAX_SUMMARY_DESCRIPTION_CHARS:
+        first_sentence = first_sentence[:MAX_SUMMARY_DESCRIPTION_CHARS - 3].rstrip() + "..."
+    return first_sentence
+
+
+class EndpointCatalog:
+    """Summaries, search index and schemas of every data provider endpoint."""
+
+    def __init__(self, providers: Dict[str, Any]):
+        # service -> route -> full endpoint schema
+        self.schemas: Dict[str, Dict[str, Dict[str, Any]]] = {
+            service: dict(provider.get_endpoints()) for service, provider in providers.items()
+        }
+        # service -> summary lines
+        self._summaries: Dict[str, List[str]] = {}
+        # (service, route, field -> words)
+        self._index: List[tuple] = []
+        for service, endpoints in self.schemas.items():
+            lines = []
+            for route, endpoint in endpoints.items():
+                params = ", ".join(endpoint.get("payload") or {})
+                line = f"{route} [{endpoint.get('method', 'GET')}]: {_short_description(endpoint.get('description') or endpoint.get('name', ''))}"
+                if params:
+                    line += f" (params: {params})"
+                lines.append(line)
+                self._index.append((service, route, {
+                    "route": set(_words(route)),
+                    "name": set(_words(endpoint.get("name", ""))),
+                    "service": set(_words(service)),
+                    "params": set(_words(" ".join(endpoint.get("payload") or {}))),
+                    "description": set(_words(endpoint.get("description", ""))),
+                }))
+            self._summaries[service] = lines
+
+    @property
+    def services(self) -> List[str]:
+        return list(self.schemas)
+
+    def summary(self, service: Optional[str] = None) -> str:
+        """One line per endpoint, grouped by provider.
+
+        Args:
+            service: Only summarize this provider; all providers when omitted
+        """
+        services = [service] if service else self.services
+        sections = []
+        for name in services:
+            sections.append(f"## {name}\n" + "\n".join(self._summaries[name]))
+        return "\n\n".join(sections)
+
+    def search(self, query: str, service: Optional[str] = None, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Find endpoints matching the words of a query, across providers.
+
+        A query word matches an endpoint word it is a prefix of ("tweet"
+        matches "tweets"); matches in the route and name count more than
+        matches in the description.
+
+        Args:
+            query: Keywords describing the data needed
+            service: Only search this provider
+            limit: Maximum number of endpoints returned
+
+        Returns:
+            The full schemas of the best matches, each with its service_name and route
+        """
+        terms = [word for word in _words(query) if word not in STOP_WORDS] or _words(query)
+        scored = []
+        for service_name, route, fields in self._index:
+            if service and service_name != service:
+                continue
+            score = 0
+            for term in terms:
+                score += max(
+                    (weight for field, weight in SEARCH_FIELD_WEIGHTS.items()
+                     if any(word.startswith(term) for word in fields[field])),
+                    default=0
+                )
+            if score:
+                scored.append((score, service_name, route))
+        scored.sort(key=lambda match: -match[0])
+        return [self.schema(service_name, route) for _, service_name, route in scored[:limit]]
+
+    def schema(self, service: str, route: str) -> Dict[str, Any]:
+        """Full schema of one endpoint, with its service_name and route key.
+
+        The route key replaces the endpoint's URL path, which callers never need.
+        """
+        endpoint = {key: value for key, value in self.schemas[service][route].items()
+                    if key not in INTERNAL_SCHEMA_KEYS}
+        return {"service_name": service, **endpoint, "route": route}
+
+    def get_schemas(self, service: str, routes: Iterable[str]) -> List[Dict[str, Any]]:
+        """Full schemas of the given endpoints of one provider.
+
+        Raises:
+            KeyError: If a route is not an endpoint of the provider
+        """
+        schemas = []
+        for route in routes:
+            if route not in self.schemas[service]:
+                raise KeyError(route)
+            schemas.append(self.schema(service, route))
+        return schemas
+
+
+_catalog: Optional[EndpointCatalog] = None
+
+
+def get_endpoint_catalog(providers: Dict[str, Any]) -> EndpointCatalog:
+    """Get the process-wide endpoint catalog, building it from the providers on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = EndpointCatalog(providers)
+    return _catalog
@@ -0,0 +1,194 @@
+"""
+Response cache for data provider calls.
+
+Endpoints opt in by declaring 'cache_ttl' (seconds) in their schema. Entries
+are keyed by provider, route and normalized payload and kept in an in-memory
+LRU and in Redis, so they are shared across processes and runs. Redis is used
+by default; set DATA_PROVIDER_CACHE_REDIS=false to keep entries in memory only.
+
+An entry is fresh for cache_ttl seconds. For a further stale window
+(DATA_PROVIDER_STALE_FACTOR times cache_ttl) it is still returned while one
+background call refreshes it (stale-while-revalidate).
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from services import redis
+from utils.logger import logger
+
+DATA_PROVIDER_CACHE_ENABLED = os.getenv("DATA_PROVIDER_CACHE_ENABLED", "true").lower() == "true"
+DATA_PROVIDER_CACHE_REDIS = os.getenv("DATA_PROVIDER_CACHE_REDIS", "true").lower() == "true"
+# Stale window as a multiple of an endpoint's cache_ttl
+DATA_PROVIDER_STALE_FACTOR = float(os.getenv("DATA_PROVIDER_STALE_FACTOR", "1"))
+MAX_MEMORY_CACHE_ENTRIES = 512
+# Responses larger than this (serialized) are not cached
+MAX_CACHED_RESPONSE_BYTES = 2 * 1024 * 1024
+
+REDIS_KEY_PREFIX = "data_provider_cache"
+
+
+def normalize_payload(payload: Optional[Dict[str, Any]]) -> str:
+    """Serialize a payload so equivalent payloads produce the same string.
+
+    Keys are sorted, empty values dropped and scalars compared as strings, so
+    {"page": 1} and {"page": "1", "cursor": None} are the same request.
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items() if v not in (None, "")}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        if isinstance(value, str):
+            return value.strip()
+        return str(value).lower() if isinstance(value, bool) else str(value)
+    return json.dumps(normalize(payload or {}), sort_keys=True, separators=(",", ":"))
+
+
+def cache_key(provider: str, route: str, payload: Optional[Dict[str, Any]]) -> str:
+    digest = hashlib.sha256(normalize_payload(payload).encode()).hexdigest()[:32]
+    return f"{REDIS_KEY_PREFIX}:{provider}:{route}:{digest}"
+
+
+def is_cacheable(result: Any) -> bool:
+    """Whether a response looks like data rather than an upstream error."""
+    if isinstance(result, dict):
+        if result.get("error") or result.get("errors"):
+            return False
+        return bool(set(result) - {"message", "messages", "status", "success"})
+    return isinstance(result, list)
+
+
+class ResponseCache:
+    """Two-level (memory, then Redis) cache of provider responses."""
+
+    def __init__(self, use_redis: bool = DATA_PROVIDER_CACHE_REDIS):
+        self.use_redis = use_redis
+        # key -> {"value": response, "stored_at": float, "ttl": int, "stale_ttl": int}
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # key -> background refresh of a stale entry
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        # provider -> outcome ("hit", "stale", "miss", "bypass", "error") -> count
+        self.metrics: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > MAX_MEMORY_CACHE_ENTRIES:
+            self._memory.popitem(last=False)
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if not self.use_redis:
+            return None
+        try:
+            stored = await redis.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read data provider cache entry {key}: {str(e)}")
+            return None
+        if not stored:
+            return None
+        entry = json.loads(stored)
+        self._remember(key, entry)
+        return entry
+
+    async def _store(self, key: str, value: Any, ttl: int, stale_ttl: int) -> None:
+        entry = {"value": value, "stored_at": time.time(), "ttl": ttl, "stale_ttl": stale_ttl}
+        serialized = json.dumps(entry)
+        if len(serialized) > MAX_CACHED_RESPONSE_BYTES:
+            return
+        self._remember(key, entry)
+        if self.use_redis:
+            try:
+                await redis.set(key, serialized, ex=ttl + stale_ttl)
+            except Exception as e:
+                logger.warning(f"Failed to write data provider cache entry {key}: {str(e)}")
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: int, stale_ttl: int) -> Any:
+        result = await fetch()
+        if is_cacheable(result):
+            await self._store(key, result, ttl, stale_ttl)
+        return result
+
+    def _revalidate(self, provider: str, key: str, fetch: Callable[[], Awaitable[Any]], ttl: int, stale_ttl: int) -> None:
+        """Refresh a stale entry in the background, once per key."""
+        if key in self._revalidating:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch_and_store(key, fetch, ttl, stale_ttl)
+            except Exception as e:
+                self.metrics[provider]["error"] += 1
+                logger.warning(f"Revalidating data provider cache entry {key} failed: {str(e)}")
+            finally:
+                self._revalidating.pop(key, None)
+
+        self._revalidating[key] = asyncio.create_task(refresh())
+
+    async def get_or_fetch(
+            self,
+            provider: str,
+            route: str,
+            payload: Optional[Dict[str, Any]],
+            ttl: Optional[int],
+            fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return a cached response for the call, or make it and cache the result.
+
+        Args:
+            provider: Provider name used in the key
+            route: Endpoint route key
+            payload: Request payload, normalized into the key
+            ttl: Seconds the response stays fresh; falsy disables caching
+            fetch: Makes the upstream call
+
+        Returns:
+            The (possibly cached) response
+        """
+        if not DATA_PROVIDER_CACHE_ENABLED or not ttl:
+            self.metrics[provider]["bypass"] += 1
+            return await fetch()
+
+        key = cache_key(provider, route, payload)
+        stale_ttl = int(ttl * DATA_PROVIDER_STALE_FACTOR)
+        entry = await self._load(key)
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if age < entry["ttl"]:
+                self.metrics[provider]["hit"] += 1
+                logger.debug(f"Data provider cache hit for {provider}/{route} (age {age:.0f}s)")
+                return entry["value"]
+            if age < entry["ttl"] + entry["stale_ttl"]:
+                self.metrics[provider]["stale"] += 1
+                logger.debug(f"Data provider cache stale hit for {provider}/{route} (age {age:.0f}s), revalidating")
+                self._revalidate(provider, key, fetch, ttl, stale_ttl)
+                return entry["value"]
+
+        self.metrics[provider]["miss"] += 1
+        logger.debug(f"Data provider cache miss for {provider}/{route}")
+        return await self._fetch_and_store(key, fetch, ttl, stale_ttl)
+
+    def get_metrics(self) -> Dict[str, Dict[str, int]]:
+        """Hit, stale hit, miss, bypass and error counts per provider."""
+        return {provider: dict(counts) for provider, counts in self.metrics.items()}
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide data provider response cache, creating it if needed."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -1,18 +1,117 @@
 import json
+import shlex
+import hashlib
+import mimetypes
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional, Tuple
 
-from agentpress.tool import Tool, ToolResult, openapi_schema, xml_schema
+from agentpress.tool import ToolResult, openapi_schema, xml_schema
+from agentpress.thread_manager import ThreadManager
+from sandbox.sandbox import SandboxToolsBase
 from agent.tools.data_providers.LinkedinProvider import LinkedinProvider
 from agent.tools.data_providers.YahooFinanceProvider import YahooFinanceProvider
 from agent.tools.data_providers.AmazonProvider import AmazonProvider
 from agent.tools.data_providers.ZillowProvider import ZillowProvider
 from agent.tools.data_providers.TwitterProvider import TwitterProvider
 from agent.tools.data_providers.CreatorIQProvider import CreatorIQProvider
+from agent.tools.data_providers.GoogleDriveProvider import GoogleDriveProvider
+from agent.tools.data_providers.endpoint_catalog import get_endpoint_catalog
+from utils.logger import logger
 
-class DataProvidersTool(Tool):
-    """Tool for making requests to various data providers."""
+# Results longer than this (as JSON) are saved to a workspace file instead of returned inline
+MAX_INLINE_RESULT_CHARS = 20000
+# Records of a saved result returned inline as a preview, and the characters they may use
+PREVIEW_RECORDS = 5
+MAX_PREVIEW_CHARS = MAX_INLINE_RESULT_CHARS // 2
+# Characters of a string kept in the fields and preview of a saved result
+MAX_SUMMARY_STRING_CHARS = 500
+# Directory (relative to /workspace) where large results are saved
+PROVIDER_RESULT_DIR = ".data_provider_results"
+# Keys summarized per object in the schema of a saved result
+MAX_SCHEMA_KEYS = 40
+# Bytes of streamed content (e.g. file exports) uploaded to the sandbox at a time
+STREAM_PART_BYTES = 8 * 1024 * 1024
 
-    def __init__(self):
-        super().__init__()
+
+def find_records(result: Any) -> Tuple[Optional[str], Optional[List[Any]]]:
+    """Locate the main list of records in a result.
+
+    Returns:
+        The jq path of the largest list at the top level or one level down
+        (e.g. ".PublisherCollection" or ".data.items"), and the list itself
+    """
+    if isinstance(result, list):
+        return ".", result
+    if not isinstance(result, dict):
+        return None, None
+    candidates = []
+    for key, value in result.items():
+        if isinstance(value, list):
+            candidates.append((f".{key}", value))
+        elif isinstance(value, dict):
+            candidates.extend((f".{key}.{sub_key}", sub_value)
+                              for sub_key, sub_value in value.items() if isinstance(sub_value, list))
+    if not candidates:
+        return None, None
+    return max(candidates, key=lambda candidate: len(candidate[1]))
+
+
+def summarize_schema(value: Any, depth: int = 0, max_depth: int = 4) -> Any:
+    """Describe the shape of a JSON value with type names instead of data.
+
+    Lists are described by their first element.
+    """
+    if isinstance(value, dict):
+        if depth >= max_depth:
+            return "object"
+        summary = {key: summarize_schema(item, depth + 1, max_depth)
+                   for key, item in list(value.items())[:MAX_SCHEMA_KEYS]}
+        if len(value) > MAX_SCHEMA_KEYS:
+            summary["..."] = f"{len(value) - MAX_SCHEMA_KEYS} more keys"
+        return summary
+    if isinstance(value, list):
+        if depth >= max_depth or not value:
+            return "array"
+        return [summarize_schema(value[0], depth + 1, max_depth)]
+    if value is None:
+        return "null"
+    return type(value).__name__
+
+
+def truncate_strings(value: Any, max_chars: int = MAX_SUMMARY_STRING_CHARS) -> Any:
+    """Copy of a JSON value with every string longer than max_chars cut short."""
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"{value[:max_chars]}... ({len(value) - max_chars} more chars)"
+    if isinstance(value, dict):
+        return {key: truncate_strings(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [truncate_strings(item, max_chars) for item in value]
+    return value
+
+
+def preview_records(records: List[Any], max_records: int = PREVIEW_RECORDS,
+                    max_chars: int = MAX_PREVIEW_CHARS) -> List[Any]:
+    """The first records, with long strings cut short, that fit in max_chars as JSON."""
+    preview = []
+    used = 0
+    for record in records[:max_records]:
+        record = truncate_strings(record)
+        size = len(json.dumps(record))
+        if used + size > max_chars:
+            break
+        preview.append(record)
+        used += size
+    return preview
+
+
+class DataProvidersTool(SandboxToolsBase):
+    """Tool for making requests to various data providers.
+    
+    Large results are saved to a JSON file in the workspace; the tool result
+    then carries a schema summary, the record count and the first records."""
+
+    def __init__(self, project_id: str, thread_manager: ThreadManager):
+        super().__init__(project_id, thread_manager)
 
         self.register_data_providers = {
             "linkedin": LinkedinProvider(),
@@ -20,61 +119,98 @@ class DataProvidersTool(Tool):
             "amazon": AmazonProvider(),
             "zillow": ZillowProvider(),
             "twitter": TwitterProvider(),
-            "creator_iq": CreatorIQProvider()
+            "creator_iq": CreatorIQProvider(),
+            "google_drive": GoogleDriveProvider()
         }
+        self.endpoint_catalog = get_endpoint_catalog(self.register_data_providers)
 
     @openapi_schema({
         "type": "function",
         "function": {
             "name": "get_data_provider_endpoints",
-            "description": "Get available endpoints for a specific data provider",
+            "description": "Discover data provider endpoints. Without arguments, returns a one-line summary of every endpoint of every provider. With service_name, summarizes that provider only. With query, searches endpoints of all providers by keyword and returns the full schemas of the best matches. With service_name and routes, returns the full schemas of just those endpoints.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "service_name": {
                         "type": "string",
                         "description": "The name of the data provider (e.g., 'linkedin', 'twitter', 'zillow', 'amazon', 'yahoo_finance')"
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "Keywords describing the data needed (e.g., 'company employees'), searched across all providers (or only service_name if given)"
+                    },
+                    "routes": {
+                        "type": "string",
+                        "description": "Comma-separated endpoint keys of service_name whose full schemas to return (e.g., 'person,company')"
                     }
-                },
-                "required": ["service_name"]
+                }
             }
         }
     })
     @xml_schema(
         tag_name="get-data-provider-endpoints",
         mappings=[
-            {"param_name": "service_name", "node_type": "attribute", "path": "."}
+            {"param_name": "service_name", "node_type": "attribute", "path": "."},
+            {"param_name": "query", "node_type": "attribute", "path": "."},
+            {"param_name": "routes", "node_type": "attribute", "path": "."}
         ],
         example='''
 <!-- 
-The get-data-provider-endpoints tool returns available endpoints for a specific data provider.
-Use this tool when you need to discover what endpoints are available.
+The get-data-provider-endpoints tool helps you find data provider endpoints.
+Without attributes it lists every endpoint of every provider, one line each.
+Use query to search endpoints by keyword, and routes to get the full schemas
+(parameters and descriptions) of specific endpoints before calling them.
 -->
 
-<!-- Example to get LinkedIn API endpoints -->
+<!-- Example to summarize the LinkedIn API endpoints -->
 <get-data-provider-endpoints service_name="linkedin">
+</get-data-provider-endpoints>
+
+<!-- Example to search endpoints of all providers -->
+<get-data-provider-endpoints query="company employees">
+</get-data-provider-endpoints>
+
+<!-- Example to get the full schemas of two LinkedIn endpoints -->
+<get-data-provider-endpoints service_name="linkedin" routes="person,company">
 </get-data-provider-endpoints>
         '''
     )
     async def get_data_provider_endpoints(
         self,
-        service_name: str
+        service_name: Optional[str] = None,
+        query: Optional[str] = None,
+        routes: Optional[str] = None
     ) -> ToolResult:
         """
-        Get available endpoints for a specific data provider.
+        Summarize, search or describe data provider endpoints.
         
         Parameters:
         - service_name: The name of the data provider (e.g., 'linkedin')
+        - query: Keywords to search endpoints by
+        - routes: Comma-separated endpoint keys whose full schemas to return
         """
         try:
-            if not service_name:
-                return self.fail_response("Data provider name is required.")
-                
-            if service_name not in self.register_data_providers:
+            if service_name and service_name not in self.register_data_providers:
                 return self.fail_response(f"Data provider '{service_name}' not found. Available data providers: {list(self.register_data_providers.keys())}")
-                
-            endpoints = self.register_data_providers[service_name].get_endpoints()
-            return self.success_response(endpoints)
+            
+            if query:
+                matches = self.endpoint_catalog.search(query, service_name)
+                if not matches:
+                    return self.fail_response(f"No endpoints match '{query}'. Call get_data_provider_endpoints without a query to list all endpoints.")
+                return self.success_response(matches)
+            
+            if routes:
+                if not service_name:
+                    return self.fail_response("service_name is required with routes.")
+                if isinstance(routes, str):
+                    routes = [route.strip() for route in routes.split(",") if route.strip()]
+                try:
+                    return self.success_response(self.endpoint_catalog.get_schemas(service_name, routes))
+                except KeyError as e:
+                    return self.fail_response(f"Endpoint {e} not found in {service_name} data provider.")
+            
+            return self.success_response(self.endpoint_catalog.summary(service_name))
             
         except Exception as e:
             error_message = str(e)
@@ -83,11 +219,115 @@ Use this tool when you need to discover what endpoints are available.
                 simplified_message += "..."
             return self.fail_response(simplified_message)
 
+    async def _save_result(self, service_name: str, route: str, result: Any, serialized: str) -> Dict[str, Any]:
+        """Save a large result to the workspace and describe it compactly.
+        
+        The summary itself stays within MAX_INLINE_RESULT_CHARS: long strings
+        are cut short, the preview has a character budget, and the preview,
+        fields and schema are dropped, in that order, if it is still too long.
+        
+        Returns:
+            Dict with the file path, a schema summary, the records path and
+            count, the first records and the top-level scalar fields
+        """
+        records_path, records = find_records(result)
+        digest = hashlib.sha256(serialized.encode()).hexdigest()[:12]
+        file_path = f"{PROVIDER_RESULT_DIR}/{service_name}_{route.replace('/', '_')}_{digest}.json"
+        
+        summary = {
+            "result_file": file_path,
+            "size_chars": len(serialized),
+            "schema": summarize_schema(result),
+        }
+        if isinstance(result, dict):
+            summary["fields"] = {key: truncate_strings(value) for key, value in result.items()
+                                 if not isinstance(value, (dict, list))}
+        if records is not None:
+            preview = preview_records(records)
+            summary["records_path"] = records_path
+            summary["record_count"] = len(records)
+            summary["preview"] = preview
+            summary["note"] = (
+                f"The full result is in /workspace/{file_path}. Read more records with e.g. "
+                f"jq '{records_path}[{len(preview)}:{len(preview) + PREVIEW_RECORDS * 3}]' {file_path}"
+            )
+        else:
+            summary["note"] = f"The full result is in /workspace/{file_path}; query it with jq."
+        
+        try:
+            await self._ensure_sandbox()
+            self.sandbox.fs.create_folder(f"{self.workspace_path}/{PROVIDER_RESULT_DIR}", "755")
+            self.sandbox.fs.upload_file(f"{self.workspace_path}/{file_path}", serialized.encode())
+        except Exception as e:
+            logger.warning(f"Failed to save data provider result to {file_path}: {str(e)}")
+            summary.pop("result_file")
+            summary["note"] = f"The result was too large to return in full and could not be saved: {str(e)}"
+        
+        for key in ("preview", "fields", "schema"):
+            if len(json.dumps(summary)) <= MAX_INLINE_RESULT_CHARS:
+                break
+            summary.pop(key, None)
+        return summary
+
+    async def _stream_result(self, service_name: str, route: str, data_provider, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Stream an endpoint's file content into the workspace.
+        
+        The content is uploaded in parts of STREAM_PART_BYTES and appended to
+        the file inside the sandbox, so it is never held in memory whole.
+        
+        Returns:
+            Dict with the file path, size in bytes and MIME type
+        """
+        # The access token must not end up in the file name
+        request_key = json.dumps({key: value for key, value in payload.items() if key != "access_token"}, sort_keys=True)
+        digest = hashlib.sha256(request_key.encode()).hexdigest()[:12]
+        mime_type = payload.get("mimeType")
+        extension = mimetypes.guess_extension(mime_type) if mime_type else None
+        file_path = f"{PROVIDER_RESULT_DIR}/{service_name}_{route.replace('/', '_')}_{digest}{extension or ''}"
+        full_path = f"{self.workspace_path}/{file_path}"
+        
+        await self._ensure_sandbox()
+        self.sandbox.fs.create_folder(f"{self.workspace_path}/{PROVIDER_RESULT_DIR}", "755")
+        
+        size = 0
+        parts = 0
+        buffer = bytearray()
+        
+        def write_part():
+            nonlocal parts
+            if parts == 0:
+                self.sandbox.fs.upload_file(full_path, bytes(buffer))
+            else:
+                part_path = f"{full_path}.part"
+                self.sandbox.fs.upload_file(part_path, bytes(buffer))
+                response = self.sandbox.process.exec(
+                    f"cat {shlex.quote(part_path)} >> {shlex.quote(full_path)} && rm {shlex.quote(part_path)}", timeout=60)
+                if response.exit_code != 0:
+                    raise RuntimeError(f"Failed to append to {file_path}: {response.result}")
+            parts += 1
+            buffer.clear()
+        
+        async with aclosing(data_provider.stream_endpoint(route, payload)) as chunks:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                size += len(chunk)
+                if len(buffer) >= STREAM_PART_BYTES:
+                    write_part()
+        if buffer or parts == 0:
+            write_part()
+        
+        return {
+            "result_file": file_path,
+            "size_bytes": size,
+            "mime_type": mime_type,
+            "note": f"The content was saved to /workspace/{file_path}.",
+        }
+
     @openapi_schema({
         "type": "function",
         "function": {
             "name": "execute_data_provider_call",
-            "description": "Execute a call to a specific data provider endpoint",
+            "description": "Execute a call to a specific data provider endpoint. Large results are saved as JSON to a file in /workspace/.data_provider_results; the response then contains the file path, a schema summary, the record count and the first records, and the file can be read with jq. Endpoints that return file content (e.g. google_drive file_content) always save it to a file in the same directory.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -120,6 +360,7 @@ Use this tool when you need to discover what endpoints are available.
         The execute-data-provider-call tool makes a request to a specific data provider endpoint.
         Use this tool when you need to call an data provider endpoint with specific parameters.
         The route must be a valid endpoint key obtained from get-data-provider-endpoints tool!!
+        Check the endpoint's parameters first with get-data-provider-endpoints and routes or query.
         -->
         
         <!-- Example to call linkedIn service with the specific route person -->
@@ -161,8 +402,15 @@ Use this tool when you need to discover what endpoints are available.
             if route not in data_provider.get_endpoints().keys():
                 return self.fail_response(f"Endpoint '{route}' not found in {service_name} data provider.")
             
+            if data_provider.get_endpoints()[route].get("stream"):
+                if not hasattr(data_provider, "stream_endpoint"):
+                    return self.fail_response(f"Endpoint '{route}' of {service_name} returns file content, which this data provider cannot stream.")
+                return self.success_response(await self._stream_result(service_name, route, data_provider, payload))
             
-            result = data_provider.call_endpoint(route, payload)
+            result = await data_provider.call_endpoint_cached(route, payload)
+            serialized = json.dumps(result)
+            if len(serialized) > MAX_INLINE_RESULT_CHARS:
+                return self.success_response(await self._save_result(service_name, route, result, serialized))
             return self.success_response(result)
             
         except Exception as e:
@@ -1,26 +1,137 @@
+import os
 import traceback
 import json
+import shlex
+from typing import Dict, Optional, Tuple
+
+import httpx
 
 from agentpress.tool import ToolResult, openapi_schema, xml_schema
 from agentpress.thread_manager import ThreadManager
 from sandbox.sandbox import SandboxToolsBase, Sandbox
 from utils.logger import logger
 
+# Port of the browser automation API inside the sandbox
+BROWSER_API_PORT = 8002
+BROWSER_API_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+# Screenshot encoding tier (see SCREENSHOT_TIERS in the browser API) by model
+# family. Image tokens grow with resolution: Anthropic models are billed by
+# pixel area and downscale anything over ~1568px, OpenAI and Gemini bill by
+# tiles, so smaller WebP frames carry the same information for fewer tokens.
+SCREENSHOT_TIERS_BY_MODEL = {
+    "anthropic": "medium",
+    "claude": "medium",
+    "openai": "low",
+    "gpt": "low",
+    "gemini": "low",
+}
+DEFAULT_SCREENSHOT_TIER = "standard"
+
+
+def screenshot_tier_for_model(model_name: Optional[str]) -> str:
+    """Pick the screenshot tier for a model, unless BROWSER_SCREENSHOT_TIER overrides it."""
+    override = os.getenv("BROWSER_SCREENSHOT_TIER")
+    if override:
+        return override
+    model_name = (model_name or "").lower()
+    for family, tier in SCREENSHOT_TIERS_BY_MODEL.items():
+        if family in model_name:
+            return tier
+    return DEFAULT_SCREENSHOT_TIER
+
+# Keep-alive client shared by every browser tool in the process
+_browser_api_client: Optional[httpx.AsyncClient] = None
+# Sandbox ID -> (preview URL of the browser API, preview token)
+_preview_links: Dict[str, Tuple[str, Optional[str]]] = {}
+
+
+def _get_browser_api_client() -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client, creating it on first use."""
+    global _browser_api_client
+    if _browser_api_client is None or _browser_api_client.is_closed:
+        _browser_api_client = httpx.AsyncClient(
+            timeout=BROWSER_API_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+        )
+    return _browser_api_client
+
 
 class SandboxBrowserTool(SandboxToolsBase):
     """Tool for executing tasks in a Daytona sandbox with browser-use capabilities."""
     
-    def __init__(self, project_id: str, thread_id: str, thread_manager: ThreadManager):
+    def __init__(self, project_id: str, thread_id: str, thread_manager: ThreadManager, model_name: Optional[str] = None):
         super().__init__(project_id, thread_manager)
         self.thread_id = thread_id
+        self.screenshot_tier = screenshot_tier_for_model(model_name)
+
+    def _session_headers(self) -> Dict[str, str]:
+        """Headers selecting this thread's browser session and screenshot tier in the browser API."""
+        return {"X-Browser-Session": self.thread_id, "X-Screenshot-Tier": self.screenshot_tier}
+
+    def _get_preview_link(self) -> Tuple[str, Optional[str]]:
+        """Get (and cache) the public URL and token of the sandbox's browser API port."""
+        if self.sandbox_id not in _preview_links:
+            link = self.sandbox.get_preview_link(BROWSER_API_PORT)
+            url = link.url if hasattr(link, 'url') else str(link)
+            _preview_links[self.sandbox_id] = (url.rstrip('/'), getattr(link, 'token', None))
+        return _preview_links[self.sandbox_id]
+
+    async def _request_via_preview(self, endpoint: str, params: Optional[dict], method: str,
+                                   preview_link: Tuple[str, Optional[str]]) -> dict:
+        """Call the browser API directly over the pooled client through the preview link."""
+        base_url, token = preview_link
+        headers = {"Content-Type": "application/json", **self._session_headers()}
+        if token:
+            headers["X-Daytona-Preview-Token"] = token
+        
+        url = f"{base_url}/api/automation/{endpoint}"
+        if method == "GET":
+            response = await _get_browser_api_client().get(url, params=params, headers=headers)
+        else:
+            response = await _get_browser_api_client().request(method, url, json=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
 
-    async def _execute_browser_action(self, endpoint: str, params: dict = None, method: str = "POST") -> ToolResult:
+    def _request_via_exec(self, endpoint: str, params: Optional[dict], method: str) -> dict:
+        """Call the browser API with curl inside the sandbox (fallback path)."""
+        url = f"http://localhost:{BROWSER_API_PORT}/api/automation/{endpoint}"
+        if method == "GET" and params:
+            url = f"{url}?{httpx.QueryParams(params)}"
+        
+        curl_cmd = f"curl -s -X {method} {shlex.quote(url)} -H 'Content-Type: application/json'"
+        for name, value in self._session_headers().items():
+            curl_cmd += f" -H {shlex.quote(f'{name}: {value}')}"
+        if method != "GET" and params:
+            curl_cmd += f" -d {shlex.quote(json.dumps(params))}"
+        
+        logger.debug("\033[95mExecuting curl command:\033[0m")
+        logger.debug(f"{curl_cmd}")
+        
+        response = self.sandbox.process.exec(curl_cmd, timeout=30)
+        if response.exit_code != 0:
+            raise RuntimeError(f"Browser automation request failed: {response}")
+        try:
+            return json.loads(response.result)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Failed to parse response JSON: {response.result} {e}")
+
+    async def _execute_browser_action(self, endpoint: str, params: dict = None, method: str = "POST",
+                                      record_state: bool = True) -> ToolResult:
         """Execute a browser automation action through the API
         
+        The API is called directly through the sandbox preview link over a
+        pooled keep-alive client. Only when the request cannot have reached the
+        API (no preview link, or no connection) is it sent again with curl
+        inside the sandbox; read timeouts and error responses are failures,
+        since the action may already have run.
+        
         Args:
             endpoint (str): The API endpoint to call
             params (dict, optional): Parameters to send. Defaults to None.
             method (str, optional): HTTP method to use. Defaults to "POST".
+            record_state (bool, optional): Store the result as the latest browser state.
+                Actions that do not capture the page state pass False. Defaults to True.
             
         Returns:
             ToolResult: Result of the execution
@@ -29,75 +140,80 @@ class SandboxBrowserTool(SandboxToolsBase):
             # Ensure sandbox is initialized
             await self._ensure_sandbox()
             
-            # Build the curl command
-            url = f"http://localhost:8002/api/automation/{endpoint}"
-            
-            if method == "GET" and params:
-                query_params = "&".join([f"{k}={v}" for k, v in params.items()])
-                url = f"{url}?{query_params}"
-                curl_cmd = f"curl -s -X {method} '{url}' -H 'Content-Type: application/json'"
+            try:
+                preview_link = self._get_preview_link()
+            except Exception as e:
+                logger.warning(f"Browser API preview link unavailable, falling back to exec: {e}")
+                preview_link = None
+
+            if preview_link is None:
+                result = self._request_via_exec(endpoint, params, method)
             else:
-                curl_cmd = f"curl -s -X {method} '{url}' -H 'Content-Type: application/json'"
-                if params:
-                    json_data = json.dumps(params)
-                    curl_cmd += f" -d '{json_data}'"
-            
-            logger.debug("\033[95mExecuting curl command:\033[0m")
-            logger.debug(f"{curl_cmd}")
-            
-            response = self.sandbox.process.exec(curl_cmd, timeout=30)
-            
-            if response.exit_code == 0:
                 try:
-                    result = json.loads(response.result)
-
-                    if not "content" in result:
-                        result["content"] = ""
-                    
-                    if not "role" in result:
-                        result["role"] = "assistant"
-
-                    logger.info("Browser automation request completed successfully")
-
-                    # Add full result to thread messages for state tracking
-                    added_message = await self.thread_manager.add_message(
-                        thread_id=self.thread_id,
-                        type="browser_state",
-                        content=result,
-                        is_llm_message=False
-                    )
-
-                    # Return tool-specific success response
-                    success_response = {
-                        "success": True,
-                        "message": result.get("message", "Browser action completed successfully")
-                    }
+                    result = await self._request_via_preview(endpoint, params, method, preview_link)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                    logger.warning(f"Could not connect to the browser API directly, falling back to exec: {e}")
+                    _preview_links.pop(self.sandbox_id, None)
+                    result = self._request_via_exec(endpoint, params, method)
 
-                    # Add message ID if available
-                    if added_message and 'message_id' in added_message:
-                        success_response['message_id'] = added_message['message_id']
-
-                    # Add relevant browser-specific info
-                    if result.get("url"):
-                        success_response["url"] = result["url"]
-                    if result.get("title"):
-                        success_response["title"] = result["title"]
-                    if result.get("element_count"):
-                        success_response["elements_found"] = result["element_count"]
-                    if result.get("pixels_below"):
-                        success_response["scrollable_content"] = result["pixels_below"] > 0
-                    # Add OCR text when available
-                    if result.get("ocr_text"):
-                        success_response["ocr_text"] = result["ocr_text"]
-
-                    return self.success_response(success_response)
-
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse response JSON: {response.result} {e}")
-                    return self.fail_response(f"Failed to parse response JSON: {response.result} {e}")
-            else:
-                logger.error(f"Browser automation request failed 2: {response}")
-                return self.fail_response(f"Browser automation request failed 2: {response}")
+            if not "content" in result:
+                result["content"] = ""
+            
+            if not "role" in result:
+                result["role"] = "assistant"
+
+            # Store the screenshot by reference: the browser API serves it under its
+            # content hash, so the message only needs the URL and hash
+            screenshot_hash = result.get("screenshot_hash")
+            preview_link = _preview_links.get(self.sandbox_id)
+            if screenshot_hash and preview_link:
+                result.pop("screenshot_base64", None)
+                extension = "webp" if result.get("screenshot_format") == "webp" else "jpg"
+                result["screenshot_url"] = f"{preview_link[0]}/api/screenshots/{screenshot_hash}.{extension}"
+
+            logger.info("Browser automation request completed successfully")
+
+            if not record_state:
+                if not result.get("success", True):
+                    return self.fail_response(result.get("error") or result.get("message", "Browser action failed"))
+                return self.success_response({
+                    key: result[key]
+                    for key in ("message", "url", "title", "content", "chunk_index", "chunk_count")
+                    if result.get(key) is not None
+                })
+
+            # Add full result to thread messages for state tracking
+            added_message = await self.thread_manager.add_message(
+                thread_id=self.thread_id,
+                type="browser_state",
+                content=result,
+                is_llm_message=False
+            )
+
+            # Return tool-specific success response
+            success_response = {
+                "success": True,
+                "message": result.get("message", "Browser action completed successfully")
+            }
+
+            # Add message ID if available
+            if added_message and 'message_id' in added_message:
+                success_response['message_id'] = added_message['message_id']
+
+            # Add relevant browser-specific info
+            if result.get("url"):
+                success_response["url"] = result["url"]
+            if result.get("title"):
+                success_response["title"] = result["title"]
+            if result.get("element_count"):
+                success_response["elements_found"] = result["element_count"]
+            if result.get("pixels_below"):
+                success_response["scrollable_content"] = result["pixels_below"] > 0
+            # Add OCR text when available
+            if result.get("ocr_text"):
+                success_response["ocr_text"] = result["ocr_text"]
+
+            return self.success_response(success_response)
 
         except Exception as e:
             logger.error(f"Error executing browser action: {e}")
@@ -495,64 +611,59 @@ class SandboxBrowserTool(SandboxToolsBase):
         logger.debug(f"\033[95mClosing tab: {page_id}\033[0m")
         return await self._execute_browser_action("close_tab", {"page_id": page_id})
 
-    # @openapi_schema({
-    #     "type": "function",
-    #     "function": {
-    #         "name": "browser_extract_content",
-    #         "description": "Extract content from the current page based on the provided goal",
-    #         "parameters": {
-    #             "type": "object",
-    #             "properties": {
-    #                 "goal": {
-    #                     "type": "string",
-    #                     "description": "The extraction goal (e.g., 'extract all links', 'find product information')"
-    #                 }
-    #             },
-    #             "required": ["goal"]
-    #         }
-    #     }
-    # })
-    # @xml_schema(
-    #     tag_name="browser-extract-content",
-    #     mappings=[
-    #         {"param_name": "goal", "node_type": "content", "path": "."}
-    #     ],
-    #     example='''
-    #     <browser-extract-content>
-    #     Extract all links on the page
-    #     </browser-extract-content>
-    #     '''
-    # )
-    # async def browser_extract_content(self, goal: str) -> ToolResult:
-    #     """Extract content from the current page based on the provided goal
-        
-    #     Args:
-    #         goal (str): The extraction goal
-            
-    #     Returns:
-    #         dict: Result of the execution
-    #     """
-    #     logger.debug(f"\033[95mExtracting content with goal: {goal}\033[0m")
-    #     result = await self._execute_browser_action("extract_content", {"goal": goal})
+    @openapi_schema({
+        "type": "function",
+        "function": {
+            "name": "browser_extract_content",
+            "description": "Extract the main readable content of the current page as Markdown (headings, paragraphs, lists, tables, code), without navigation, ads or repeated blocks. Long pages are split into numbered chunks; the result reports chunk_index and chunk_count, so request the next chunk until you have what you need. Does not take a screenshot.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "goal": {
+                        "type": "string",
+                        "description": "What you are looking for on the page (e.g., 'product specifications', 'pricing table')"
+                    },
+                    "chunk": {
+                        "type": "integer",
+                        "description": "Index of the chunk to return, starting at 0. Chunk 0 re-reads the page.",
+                        "default": 0
+                    }
+                },
+                "required": ["goal"]
+            }
+        }
+    })
+    @xml_schema(
+        tag_name="browser-extract-content",
+        mappings=[
+            {"param_name": "goal", "node_type": "content", "path": "."},
+            {"param_name": "chunk", "node_type": "attribute", "path": ".", "required": False}
+        ],
+        example='''
+        <browser-extract-content>
+        Find the product specifications
+        </browser-extract-content>
+
+        <!-- Next chunk of a long page -->
+        <browser-extract-content chunk="1">
+        Find the product specifications
+        </browser-extract-content>
+        '''
+    )
+    async def browser_extract_content(self, goal: str, chunk: int = 0) -> ToolResult:
+        """Extract the main content of the current page as Markdown, one chunk at a time
         
-    #     # Format content for better readability
-    #     if result.get("success"):
-    #         logger.debug(f"\033[92mContent extraction successful\033[0m")
-    #         content = result.data.get("content", "")
-    #         url = result.data.get("url", "")
-    #         title = result.data.get("title", "")
+        Args:
+            goal (str): What to look for on the page
+            chunk (int, optional): Index of the chunk to return. Defaults to 0.
             
-    #         if content:
-    #             content_preview = content[:200] + "..." if len(content) > 200 else content
-    #             logger.debug(f"\033[95mExtracted content from {title} ({url}):\033[0m")
-    #             logger.debug(f"\033[96m{content_preview}\033[0m")
-    #             logger.debug(f"\033[95mTotal content length: {len(content)} characters\033[0m")
-    #         else:
-    #             logger.debug(f"\033[93mNo content extracted from {url}\033[0m")
-    #     else:
-    #         logger.debug(f"\033[91mFailed to extract content: {result.data.get('error', 'Unknown error')}\033[0m")
-        
-    #     return result
+        Returns:
+            dict: Result of the execution with the content and its chunk position
+        """
+        logger.debug(f"\033[95mExtracting content (chunk {chunk}) with goal: {goal}\033[0m")
+        return await self._execute_browser_action(
+            "extract_content", {"goal": goal, "chunk": int(chunk)}, record_state=False
+        )
 
     @openapi_schema({
         "type": "function",
@@ -895,4 +1006,31 @@ class SandboxBrowserTool(SandboxToolsBase):
             dict: Result of the execution
         """
         logger.debug(f"\033[95mClicking at coordinates: ({x}, {y})\033[0m")
-        return await self._execute_browser_action("click_coordinates", {"x": x, "y": y})
\ No newline at end of file
+        return await self._execute_browser_action("click_coordinates", {"x": x, "y": y})
+
+    @openapi_schema({
+        "type": "function",
+        "function": {
+            "name": "browser_extract_screen_text",
+            "description": "Read the visible text of the current browser viewport using OCR. Use when the text you need is rendered in images, canvases or other content that is not in the element list.",
+            "parameters": {
+                "type": "object",
+                "properties": {}
+            }
+        }
+    })
+    @xml_schema(
+        tag_name="browser-extract-screen-text",
+        mappings=[],
+        example='''
+        <browser-extract-screen-text></browser-extract-screen-text>
+        '''
+    )
+    async def browser_extract_screen_text(self) -> ToolResult:
+        """Read the visible text of the current viewport using OCR
+        
+        Returns:
+            dict: Result of the execution with the OCR text
+        """
+        logger.debug(f"\033[95mExtracting screen text with OCR\033[0m")
+        return await self._execute_browser_action("extract_screen_text", {})
@@ -1,11 +1,61 @@
 from daytona_sdk.process import SessionExecuteRequest
-from typing import Optional
+from typing import Optional, List, Dict, Any, Union
 
 from agentpress.tool import ToolResult, openapi_schema, xml_schema
 from sandbox.sandbox import SandboxToolsBase, Sandbox
+from sandbox.file_cache import WorkspaceFileCache, get_file_cache, file_cache_key
+from sandbox.workspace_manifest import get_workspace_changes
 from utils.files_utils import EXCLUDED_FILES, EXCLUDED_DIRS, EXCLUDED_EXT, should_exclude_file, clean_path
 from agentpress.thread_manager import ThreadManager
+from utils.logger import logger
 import os
+import io
+import re
+import time
+import base64
+import shlex
+import json
+import tarfile
+from uuid import uuid4
+
+# Files at least this large are edited in place inside the sandbox instead of
+# being downloaded and re-uploaded in full
+LARGE_FILE_PATCH_THRESHOLD = 128 * 1024
+# Maximum number of files fetched per exec when reading workspace state
+WORKSPACE_STATE_READ_BATCH = 200
+# Largest encoded old/new payload that is passed inline to the in-sandbox patcher
+MAX_INLINE_PATCH_BYTES = 64 * 1024
+
+# Replaces a unique string in a file inside the sandbox. Exits with 3 and
+# reports the occurrence count when the string is missing or not unique.
+_PATCH_SCRIPT = """
+import base64, json, sys
+p = json.loads(base64.b64decode(sys.argv[1]))
+with open(p["path"], encoding="utf-8", newline="") as f:
+    c = f.read()
+n = c.count(p["old"])
+if n != 1:
+    print(json.dumps({"occurrences": n, "lines": [i + 1 for i, l in enumerate(c.split("\\n")) if p["old"] in l]}))
+    sys.exit(3)
+with open(p["path"], "w", encoding="utf-8", newline="") as f:
+    f.write(c.replace(p["old"], p["new"]))
+print(json.dumps({"occurrences": 1}))
+"""
+
+# Child elements of the batch XML tags, e.g. <file file_path="a.py">...</file>
+_BATCH_FILE_PATTERN = re.compile(r'<file\b([^>]*)>(.*?)</file>', re.DOTALL)
+_BATCH_EDIT_PATTERN = re.compile(r'<edit\b([^>]*)>(.*?)</edit>', re.DOTALL)
+_ATTRIBUTE_PATTERN = re.compile(r'([\w-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+def _parse_attributes(opening: str) -> Dict[str, str]:
+    """Parse the attributes of an XML opening tag into a dict."""
+    return {m.group(1): m.group(2) if m.group(2) is not None else m.group(3)
+            for m in _ATTRIBUTE_PATTERN.finditer(opening)}
+
+def _extract_child(content: str, tag: str) -> Optional[str]:
+    """Return the stripped text of the first <tag>...</tag> in content."""
+    match = re.search(rf'<{tag}>(.*?)</{tag}>', content, re.DOTALL)
+    return match.group(1).strip() if match else None
 
 class SandboxFilesTool(SandboxToolsBase):
     """Tool for executing file system operations in a Daytona sandbox. All operations are performed relative to the /workspace directory."""
@@ -25,45 +75,251 @@ class SandboxFilesTool(SandboxToolsBase):
 
     def _file_exists(self, path: str) -> bool:
         """Check if a file exists in the sandbox"""
+        return self._get_file_info(path) is not None
+
+    def _get_file_info(self, path: str):
+        """Get the sandbox FileInfo for a path, or None if it does not exist"""
         try:
-            self.sandbox.fs.get_file_info(path)
-            return True
+            return self.sandbox.fs.get_file_info(path)
         except Exception:
-            return False
+            return None
+
+    @property
+    def file_cache(self) -> WorkspaceFileCache:
+        """Content cache shared by every tool and request operating on this sandbox"""
+        return get_file_cache(self.sandbox_id)
 
-    async def get_workspace_state(self) -> dict:
-        """Get the current workspace state by reading all files"""
-        files_state = {}
+    def _remember_write(self, full_path: str, content: bytes) -> None:
+        """Cache content that was just written, keyed by the file's new metadata"""
+        file_info = self._get_file_info(full_path)
+        if file_info is None:
+            self.file_cache.invalidate(full_path)
+        else:
+            self.file_cache.put(full_path, file_cache_key(file_info), content)
+
+    def _patch_in_sandbox(self, full_path: str, old_str: str, new_str: str) -> Optional[Dict[str, Any]]:
+        """Replace old_str with new_str inside the sandbox without transferring the file.
+
+        Returns the patcher's report ({"occurrences": n, ...}), or None if the
+        payload is too large to inline or the patcher could not run, in which
+        case the caller should fall back to download and upload. A patcher that
+        exited 0 has written the file, so that counts as one replacement even
+        if its report cannot be parsed.
+        """
+        payload = base64.b64encode(json.dumps({"path": full_path, "old": old_str, "new": new_str}).encode()).decode()
+        if len(payload) > MAX_INLINE_PATCH_BYTES:
+            return None
+        command = f"python3 -c {shlex.quote(_PATCH_SCRIPT)} {payload}"
+        try:
+            response = self.sandbox.process.exec(command, timeout=60)
+        except Exception:
+            return None
+        if response.exit_code not in (0, 3):
+            return None
+        try:
+            return json.loads(response.result.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            if response.exit_code == 0:
+                return {"occurrences": 1}
+            return None
+
+    def _parse_batch_files(self, files: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Normalize the `files` argument of batch_create_files into a list of dicts.
+
+        Accepts either a list of {file_path, file_contents, permissions} dicts
+        (function calling) or the raw content of a <batch-create-files> tag.
+        """
+        if isinstance(files, str):
+            files = [
+                {**_parse_attributes(attrs), "file_contents": body.strip()}
+                for attrs, body in _BATCH_FILE_PATTERN.findall(files)
+            ]
+        parsed = []
+        for entry in files:
+            if not entry.get("file_path"):
+                raise ValueError("Every file needs a file_path")
+            parsed.append({
+                "file_path": self.clean_path(entry["file_path"]),
+                "file_contents": entry.get("file_contents", ""),
+                "permissions": str(entry.get("permissions") or "644"),
+            })
+        return parsed
+
+    def _parse_batch_edits(self, edits: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Normalize the `edits` argument of batch_str_replace into a list of dicts."""
+        if isinstance(edits, str):
+            edits = [
+                {**_parse_attributes(attrs),
+                 "old_str": _extract_child(body, "old_str"),
+                 "new_str": _extract_child(body, "new_str")}
+                for attrs, body in _BATCH_EDIT_PATTERN.findall(edits)
+            ]
+        parsed = []
+        for entry in edits:
+            if not entry.get("file_path") or entry.get("old_str") is None or entry.get("new_str") is None:
+                raise ValueError("Every edit needs file_path, old_str and new_str")
+            parsed.append({
+                "file_path": self.clean_path(entry["file_path"]),
+                "old_str": entry["old_str"].expandtabs(),
+                "new_str": entry["new_str"].expandtabs(),
+            })
+        return parsed
+
+    def _write_files_batch(self, files: List[Dict[str, Any]], must_not_exist: bool = False) -> None:
+        """Write many files with a single upload and a single exec.
+
+        The files are packed into an in-memory tarball (carrying their
+        permissions), uploaded once, and extracted into /workspace. When
+        must_not_exist is set the extraction is aborted if any target exists.
+        """
+        buffer = io.BytesIO()
+        now = time.time()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            for entry in files:
+                data = entry["file_contents"].encode()
+                info = tarfile.TarInfo(name=entry["file_path"])
+                info.size = len(data)
+                info.mode = int(entry.get("permissions", "644"), 8)
+                info.mtime = now
+                tar.addfile(info, io.BytesIO(data))
+
+        archive_path = f"/tmp/batch-{uuid4().hex}.tar"
+        self.sandbox.fs.upload_file(archive_path, buffer.getvalue())
+
+        script = f"cd {shlex.quote(self.workspace_path)} || exit 1;"
+        if must_not_exist:
+            paths = " ".join(shlex.quote(entry["file_path"]) for entry in files)
+            script += (f" for f in {paths}; do [ -e \"$f\" ] && echo \"EXISTS:$f\" && found=1; done;"
+                       f" if [ -n \"$found\" ]; then rm -f {archive_path}; exit 3; fi;")
+        script += f" tar -xpf {archive_path} && rm -f {archive_path}"
+
+        response = self.sandbox.process.exec(f"sh -c {shlex.quote(script)}", timeout=120)
+        for entry in files:
+            self.file_cache.invalidate(f"{self.workspace_path}/{entry['file_path']}")
+        if response.exit_code == 3:
+            existing = [line[len("EXISTS:"):] for line in response.result.splitlines() if line.startswith("EXISTS:")]
+            raise FileExistsError(f"Files already exist: {existing}. Use batch_str_replace or full_file_rewrite to modify existing files.")
+        if response.exit_code != 0:
+            raise RuntimeError(f"Extracting batch archive failed with exit code {response.exit_code}: {response.result}")
+
+    def _read_files_batch(self, paths: List[str], skip_binary: bool = False,
+                          skip_missing: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Read many text files with a single exec that streams a base64 tarball back.
+
+        Returns a dict mapping each path to its decoded content, permissions,
+        size and mtime. With skip_binary, files that are not valid UTF-8 are
+        returned as {"binary": True} instead of raising UnicodeDecodeError.
+        With skip_missing, files that do not exist (or vanish while being
+        archived) are left out instead of raising FileNotFoundError, and
+        symbolic links are read as the files they point to. Otherwise symbolic
+        links raise ValueError, as writing the content back through tar would
+        replace the link with a regular file.
+        """
+        quoted = " ".join(shlex.quote(path) for path in paths)
+        script = f"cd {shlex.quote(self.workspace_path)} || exit 1;"
+        if skip_missing:
+            script += (f" set --; for f in {quoted}; do [ -f \"$f\" ] && set -- \"$@\" \"$f\"; done;"
+                       f" [ $# -eq 0 ] && exit 0;")
+            tar_command = "tar --ignore-failed-read --dereference -cf \"$archive\" -- \"$@\" 2>/dev/null"
+        else:
+            script += (f" for f in {quoted}; do"
+                       f" if [ -L \"$f\" ]; then echo \"SYMLINK:$f\"; links=1;"
+                       f" elif [ ! -f \"$f\" ]; then echo \"MISSING:$f\"; missing=1; fi; done;"
+                       f" if [ -n \"$missing\" ]; then exit 3; fi; if [ -n \"$links\" ]; then exit 4; fi;")
+            tar_command = f"tar -cf \"$archive\" -- {quoted}"
+        # Archive to a file first so a failing tar is not hidden behind base64's exit status
+        script += (f" archive=$(mktemp) || exit 1;"
+                   f" {tar_command} && base64 -w0 \"$archive\"; status=$?;"
+                   f" rm -f \"$archive\"; exit $status")
+
+        response = self.sandbox.process.exec(f"sh -c {shlex.quote(script)}", timeout=120)
+        if response.exit_code == 3:
+            missing = [line[len("MISSING:"):] for line in response.result.splitlines() if line.startswith("MISSING:")]
+            raise FileNotFoundError(f"Files do not exist: {missing}")
+        if response.exit_code == 4:
+            links = [line[len("SYMLINK:"):] for line in response.result.splitlines() if line.startswith("SYMLINK:")]
+            raise ValueError(f"Files are symbolic links: {links}. Edit the files they point to instead.")
+        if response.exit_code != 0:
+            raise RuntimeError(f"Reading files failed with exit code {response.exit_code}: {response.result}")
+
+        contents = {}
+        if not response.result.strip():
+            return contents
+        with tarfile.open(fileobj=io.BytesIO(base64.b64decode(response.result.strip())), mode="r") as tar:
+            for member in tar.getmembers():
+                if member.isfile():
+                    try:
+                        content = tar.extractfile(member).read().decode()
+                    except UnicodeDecodeError:
+                        if not skip_binary:
+                            raise
+                        contents[member.name] = {"binary": True}
+                        continue
+                    contents[member.name] = {
+                        "content": content,
+                        "permissions": format(member.mode & 0o7777, "o"),
+                        "size": member.size,
+                        "mtime": member.mtime,
+                    }
+        return contents
+
+    async def get_workspace_state(self, since_version: Optional[str] = None) -> dict:
+        """Get the workspace state, reading only the files changed since a previous version.
+
+        A manifest of the whole workspace (recursive, honouring the exclusion
+        rules) is generated inside the sandbox with one exec, and only added or
+        modified text files are downloaded, in batches.
+
+        Args:
+            since_version: Manifest version returned by a previous call. If it is
+                unknown or omitted, every file is returned.
+
+        Returns:
+            Dict with 'version', 'full', 'deleted', 'files', mapping each
+            added or modified path to its content, size, modified time and hash,
+            and 'unread', the changed paths whose content could not be read
+            (deleted while reading, or a failed batch)
+        """
         try:
             # Ensure sandbox is initialized
             await self._ensure_sandbox()
-            
-            files = self.sandbox.fs.list_files(self.workspace_path)
-            for file_info in files:
-                rel_path = file_info.name
-                
-                # Skip excluded files and directories
-                if self._should_exclude_file(rel_path) or file_info.is_dir:
-                    continue
 
+            changes = get_workspace_changes(self.sandbox, self.sandbox_id, since_version, self.workspace_path)
+            changed = changes["added"] + changes["modified"]
+
+            files_state = {}
+            unread = []
+            for i in range(0, len(changed), WORKSPACE_STATE_READ_BATCH):
+                batch = changed[i:i + WORKSPACE_STATE_READ_BATCH]
                 try:
-                    full_path = f"{self.workspace_path}/{rel_path}"
-                    content = self.sandbox.fs.download_file(full_path).decode()
+                    contents = self._read_files_batch(batch, skip_binary=True, skip_missing=True)
+                except Exception as e:
+                    logger.warning(f"Error reading files {batch[0]}..{batch[-1]}: {e}")
+                    unread.extend(batch)
+                    continue
+                unread.extend(path for path in batch if path not in contents)
+                for rel_path, data in contents.items():
+                    if data.get("binary"):
+                        continue
+                    entry = changes["files"][rel_path]
                     files_state[rel_path] = {
-                        "content": content,
-                        "is_dir": file_info.is_dir,
-                        "size": file_info.size,
-                        "modified": file_info.mod_time
+                        "content": data["content"],
+                        "is_dir": False,
+                        "size": entry["size"],
+                        "modified": entry["mtime"],
+                        "hash": entry["hash"]
                     }
-                except Exception as e:
-                    print(f"Error reading file {rel_path}: {e}")
-                except UnicodeDecodeError:
-                    print(f"Skipping binary file: {rel_path}")
 
-            return files_state
-        
+            return {
+                "version": changes["version"],
+                "full": changes["full"],
+                "deleted": changes["deleted"],
+                "files": files_state,
+                "unread": unread
+            }
+
         except Exception as e:
-            print(f"Error getting workspace state: {str(e)}")
+            logger.error(f"Error getting workspace state: {str(e)}")
             return {}
 
     @openapi_schema({
@@ -122,6 +378,7 @@ class SandboxFilesTool(SandboxToolsBase):
             # Write the file content
             self.sandbox.fs.upload_file(full_path, file_contents.encode())
             self.sandbox.fs.set_file_permissions(full_path, permissions)
+            self._remember_write(full_path, file_contents.encode())
             
             return self.success_response(f"File '{file_path}' created successfully.")
         except Exception as e:
@@ -173,12 +430,29 @@ class SandboxFilesTool(SandboxToolsBase):
             
             file_path = self.clean_path(file_path)
             full_path = f"{self.workspace_path}/{file_path}"
-            if not self._file_exists(full_path):
+            file_info = self._get_file_info(full_path)
+            if file_info is None:
                 return self.fail_response(f"File '{file_path}' does not exist")
             
-            content = self.sandbox.fs.download_file(full_path).decode()
             old_str = old_str.expandtabs()
             new_str = new_str.expandtabs()
+            cached = self.file_cache.get(full_path, file_cache_key(file_info))
+
+            # Large files that are not cached are patched in place instead of round-tripping the whole file
+            if cached is None and file_info.size >= LARGE_FILE_PATCH_THRESHOLD:
+                report = self._patch_in_sandbox(full_path, old_str, new_str)
+                if report is not None:
+                    if report["occurrences"] == 0:
+                        return self.fail_response(f"String '{old_str}' not found in file")
+                    if report["occurrences"] > 1:
+                        return self.fail_response(f"Multiple occurrences found in lines {report['lines']}. Please ensure string is unique")
+                    self.file_cache.invalidate(full_path)
+                    return self.success_response(f"Replacement successful.")
+
+            if cached is None:
+                cached = self.sandbox.fs.download_file(full_path)
+                self.file_cache.put(full_path, file_cache_key(file_info), cached)
+            content = cached.decode()
             
             occurrences = content.count(old_str)
             if occurrences == 0:
@@ -190,6 +464,7 @@ class SandboxFilesTool(SandboxToolsBase):
             # Perform replacement
             new_content = content.replace(old_str, new_str)
             self.sandbox.fs.upload_file(full_path, new_content.encode())
+            self._remember_write(full_path, new_content.encode())
             
             # Show snippet around the edit
             replacement_line = content.split(old_str)[0].count('\n')
@@ -255,6 +530,7 @@ class SandboxFilesTool(SandboxToolsBase):
             
             self.sandbox.fs.upload_file(full_path, file_contents.encode())
             self.sandbox.fs.set_file_permissions(full_path, permissions)
+            self._remember_write(full_path, file_contents.encode())
             
             return self.success_response(f"File '{file_path}' completely rewritten successfully.")
         except Exception as e:
@@ -298,10 +574,177 @@ class SandboxFilesTool(SandboxToolsBase):
                 return self.fail_response(f"File '{file_path}' does not exist")
             
             self.sandbox.fs.delete_file(full_path)
+            self.file_cache.invalidate(full_path)
             return self.success_response(f"File '{file_path}' deleted successfully.")
         except Exception as e:
             return self.fail_response(f"Error deleting file: {str(e)}")
 
+    @openapi_schema({
+        "type": "function",
+        "function": {
+            "name": "batch_create_files",
+            "description": "Create several new files in one operation. Much faster than calling create_file repeatedly when scaffolding a project. Fails without writing anything if any of the files already exists. Paths must be relative to /workspace.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "files": {
+                        "type": "array",
+                        "description": "The files to create",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "file_path": {
+                                    "type": "string",
+                                    "description": "Path to the file to be created, relative to /workspace (e.g., 'src/main.py')"
+                                },
+                                "file_contents": {
+                                    "type": "string",
+                                    "description": "The content to write to the file"
+                                },
+                                "permissions": {
+                                    "type": "string",
+                                    "description": "File permissions in octal format (e.g., '644')",
+                                    "default": "644"
+                                }
+                            },
+                            "required": ["file_path", "file_contents"]
+                        }
+                    }
+                },
+                "required": ["files"]
+            }
+        }
+    })
+    @xml_schema(
+        tag_name="batch-create-files",
+        mappings=[
+            {"param_name": "files", "node_type": "content", "path": "."}
+        ],
+        example='''
+        <batch-create-files>
+        <file file_path="src/index.html">
+        HTML contents go here
+        </file>
+        <file file_path="src/style.css">
+        CSS contents go here
+        </file>
+        <file file_path="scripts/run.sh" permissions="755">
+        Script contents go here
+        </file>
+        </batch-create-files>
+        '''
+    )
+    async def batch_create_files(self, files: Union[str, List[Dict[str, Any]]]) -> ToolResult:
+        try:
+            # Ensure sandbox is initialized
+            await self._ensure_sandbox()
+
+            parsed = self._parse_batch_files(files)
+            if not parsed:
+                return self.fail_response("No files provided. Wrap each file in a <file file_path=\"...\"> element.")
+
+            paths = [entry["file_path"] for entry in parsed]
+            duplicates = sorted({path for path in paths if paths.count(path) > 1})
+            if duplicates:
+                return self.fail_response(f"Duplicate file paths in batch: {duplicates}")
+
+            self._write_files_batch(parsed, must_not_exist=True)
+            return self.success_response(f"{len(parsed)} files created successfully: {paths}")
+        except FileExistsError as e:
+            return self.fail_response(str(e))
+        except Exception as e:
+            return self.fail_response(f"Error creating files: {str(e)}")
+
+    @openapi_schema({
+        "type": "function",
+        "function": {
+            "name": "batch_str_replace",
+            "description": "Apply several str_replace edits across one or more files as a single transaction. Edits to the same file are applied in order. Every old_str must appear exactly once at the time it is applied; if any edit fails, no file is modified. Paths must be relative to /workspace.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "edits": {
+                        "type": "array",
+                        "description": "The edits to apply, in order",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "file_path": {
+                                    "type": "string",
+                                    "description": "Path to the target file, relative to /workspace (e.g., 'src/main.py')"
+                                },
+                                "old_str": {
+                                    "type": "string",
+                                    "description": "Text to be replaced (must appear exactly once)"
+                                },
+                                "new_str": {
+                                    "type": "string",
+                                    "description": "Replacement text"
+                                }
+                            },
+                            "required": ["file_path", "old_str", "new_str"]
+                        }
+                    }
+                },
+                "required": ["edits"]
+            }
+        }
+    })
+    @xml_schema(
+        tag_name="batch-str-replace",
+        mappings=[
+            {"param_name": "edits", "node_type": "content", "path": "."}
+        ],
+        example='''
+        <batch-str-replace>
+        <edit file_path="src/main.py">
+            <old_str>text to replace (must appear exactly once in the file)</old_str>
+            <new_str>replacement text that will be inserted instead</new_str>
+        </edit>
+        <edit file_path="src/utils.py">
+            <old_str>another unique string</old_str>
+            <new_str>its replacement</new_str>
+        </edit>
+        </batch-str-replace>
+        '''
+    )
+    async def batch_str_replace(self, edits: Union[str, List[Dict[str, Any]]]) -> ToolResult:
+        try:
+            # Ensure sandbox is initialized
+            await self._ensure_sandbox()
+
+            parsed = self._parse_batch_edits(edits)
+            if not parsed:
+                return self.fail_response("No edits provided. Wrap each edit in an <edit file_path=\"...\"> element.")
+
+            paths = list(dict.fromkeys(entry["file_path"] for entry in parsed))
+            files = self._read_files_batch(paths)
+            unread = [path for path in paths if files.get(path) is None]
+            if unread:
+                return self.fail_response(f"Could not read {unread} as regular files. No files were modified.")
+            contents = {path: files[path]["content"] for path in paths}
+
+            # Apply every edit in memory first so that nothing is written unless all succeed
+            for index, entry in enumerate(parsed, start=1):
+                content = contents[entry["file_path"]]
+                occurrences = content.count(entry["old_str"])
+                if occurrences == 0:
+                    return self.fail_response(f"Edit {index}: string '{entry['old_str']}' not found in '{entry['file_path']}'. No files were modified.")
+                if occurrences > 1:
+                    lines = [i+1 for i, line in enumerate(content.split('\n')) if entry["old_str"] in line]
+                    return self.fail_response(f"Edit {index}: multiple occurrences found in '{entry['file_path']}' lines {lines}. No files were modified.")
+                contents[entry["file_path"]] = content.replace(entry["old_str"], entry["new_str"])
+
+            self._write_files_batch([
+                {"file_path": path, "file_contents": contents[path], "permissions": files[path]["permissions"]}
+                for path in paths
+            ])
+            return self.success_response(f"{len(parsed)} replacements applied across {len(paths)} files.")
+        except (FileNotFoundError, ValueError) as e:
+            return self.fail_response(str(e))
+        except Exception as e:
+            return self.fail_response(f"Error applying replacements: {str(e)}")
+
     # @openapi_schema({
     #     "type": "function",
     #     "function": {
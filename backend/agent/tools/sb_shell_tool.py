@@ -1,39 +1,42 @@
-from typing import Optional, Dict, List
-from uuid import uuid4
+import asyncio
+from typing import Optional, List, Union
 from agentpress.tool import ToolResult, openapi_schema, xml_schema
 from sandbox.sandbox import SandboxToolsBase, Sandbox
+from sandbox.session_pool import get_session_pool
 from agentpress.thread_manager import ThreadManager
 
+# Characters kept from the start and end of a streamed command's output
+STREAM_SUMMARY_HEAD_CHARS = 2000
+STREAM_SUMMARY_TAIL_CHARS = 6000
+# Largest slice of output carried by a single progress event
+MAX_PROGRESS_CHUNK_CHARS = 4000
+# Directory (relative to /workspace) where full logs of streamed commands are written
+COMMAND_LOG_DIR = ".command_logs"
+
 class SandboxShellTool(SandboxToolsBase):
     """Tool for executing tasks in a Daytona sandbox with browser-use capabilities. 
-    Uses sessions for maintaining state between commands and provides comprehensive process management."""
+    Uses sessions for maintaining state between commands and provides comprehensive process management.
+    Sessions come from a per-sandbox pool, so named sessions persist across agent runs."""
 
     def __init__(self, project_id: str, thread_manager: ThreadManager):
         super().__init__(project_id, thread_manager)
-        self._sessions: Dict[str, str] = {}  # Maps session names to session IDs
         self.workspace_path = "/workspace"  # Ensure we're always operating in /workspace
 
     async def _ensure_session(self, session_name: str = "default") -> str:
         """Ensure a session exists and return its ID."""
-        if session_name not in self._sessions:
-            session_id = str(uuid4())
-            try:
-                await self._ensure_sandbox()  # Ensure sandbox is initialized
-                self.sandbox.process.create_session(session_id)
-                self._sessions[session_name] = session_id
-            except Exception as e:
-                raise RuntimeError(f"Failed to create session: {str(e)}")
-        return self._sessions[session_name]
+        try:
+            await self._ensure_sandbox()  # Ensure sandbox is initialized
+            return await get_session_pool(self.sandbox_id).acquire(self.sandbox, session_name)
+        except Exception as e:
+            raise RuntimeError(f"Failed to create session: {str(e)}")
 
     async def _cleanup_session(self, session_name: str):
         """Clean up a session if it exists."""
-        if session_name in self._sessions:
-            try:
-                await self._ensure_sandbox()  # Ensure sandbox is initialized
-                self.sandbox.process.delete_session(self._sessions[session_name])
-                del self._sessions[session_name]
-            except Exception as e:
-                print(f"Warning: Failed to cleanup session {session_name}: {str(e)}")
+        try:
+            await self._ensure_sandbox()  # Ensure sandbox is initialized
+            await get_session_pool(self.sandbox_id).discard(self.sandbox, session_name)
+        except Exception as e:
+            print(f"Warning: Failed to cleanup session {session_name}: {str(e)}")
 
     @openapi_schema({
         "type": "function",
@@ -60,6 +63,11 @@ class SandboxShellTool(SandboxToolsBase):
                         "type": "integer",
                         "description": "Optional timeout in seconds. Increase for long-running commands. Defaults to 60. For commands that might exceed this timeout, use background execution with & operator instead.",
                         "default": 60
+                    },
+                    "stream_output": {
+                        "type": "boolean",
+                        "description": "Optional. Stream output live to the user while the command runs and return only the beginning and end of the output, with the full log saved to a file in /workspace/.command_logs. Use for builds, installs and test suites that are slow or print a lot.",
+                        "default": False
                     }
                 },
                 "required": ["command"]
@@ -72,7 +80,8 @@ class SandboxShellTool(SandboxToolsBase):
             {"param_name": "command", "node_type": "content", "path": "."},
             {"param_name": "folder", "node_type": "attribute", "path": ".", "required": False},
             {"param_name": "session_name", "node_type": "attribute", "path": ".", "required": False},
-            {"param_name": "timeout", "node_type": "attribute", "path": ".", "required": False}
+            {"param_name": "timeout", "node_type": "attribute", "path": ".", "required": False},
+            {"param_name": "stream_output", "node_type": "attribute", "path": ".", "required": False}
         ],
         example='''
         <!-- IMPORTANT: By default, all commands are blocking and will wait for completion -->
@@ -102,29 +111,34 @@ class SandboxShellTool(SandboxToolsBase):
         pdftotext input.pdf -layout 2>&1 || echo "Error processing PDF" && ls -la output.txt
         </execute-command>
 
+        <!-- Example 6: Long build with live output; returns a head/tail summary and saves the full log -->
+        <execute-command stream_output="true" timeout="600">
+        npm install && npm run build
+        </execute-command>
+
         <!-- NON-BLOCKING COMMANDS: Use these for long-running operations to prevent timeouts -->
 
-        <!-- Example 6: Basic non-blocking command with & operator -->
+        <!-- Example 7: Basic non-blocking command with & operator -->
         <execute-command>
         python scraper.py --large-dataset > scraper_output.log 2>&1 &
         </execute-command>
 
-        <!-- Example 7: Run a process with nohup for immunity to hangups -->
+        <!-- Example 8: Run a process with nohup for immunity to hangups -->
         <execute-command>
         nohup python processor.py --heavy-computation > processor.log 2>&1 &
         </execute-command>
 
-        <!-- Example 8: Starting a background process and storing its PID -->
+        <!-- Example 9: Starting a background process and storing its PID -->
         <execute-command>
         python long_task.py & echo $! > task.pid
         </execute-command>
 
-        <!-- Example 9: Checking if a process is still running -->
+        <!-- Example 10: Checking if a process is still running -->
         <execute-command>
         ps -p $(cat task.pid)
         </execute-command>
 
-        <!-- Example 10: Killing a background process -->
+        <!-- Example 11: Killing a background process -->
         <execute-command>
         kill $(cat task.pid)
         </execute-command>
@@ -135,7 +149,8 @@ class SandboxShellTool(SandboxToolsBase):
         command: str, 
         folder: Optional[str] = None,
         session_name: str = "default",
-        timeout: int = 60
+        timeout: int = 60,
+        stream_output: Union[bool, str] = False
     ) -> ToolResult:
         try:
             # Ensure sandbox is initialized
@@ -153,6 +168,9 @@ class SandboxShellTool(SandboxToolsBase):
             # Ensure we're in the correct directory before executing the command
             command = f"cd {cwd} && {command}"
             
+            if str(stream_output).lower() == "true":
+                return await self._execute_streaming(session_id, session_name, command, cwd, int(timeout))
+            
             # Execute command in session
             from sandbox.sandbox import SessionExecuteRequest
             req = SessionExecuteRequest(
@@ -161,11 +179,23 @@ class SandboxShellTool(SandboxToolsBase):
                 cwd=cwd  # Still set the working directory for reference
             )
             
-            response = self.sandbox.process.execute_session_command(
-                session_id=session_id,
-                req=req,
-                timeout=timeout
-            )
+            try:
+                response = self.sandbox.process.execute_session_command(
+                    session_id=session_id,
+                    req=req,
+                    timeout=timeout
+                )
+            except Exception:
+                # A pooled session can disappear (e.g. sandbox restart); recreate it once
+                if get_session_pool(self.sandbox_id).is_healthy(self.sandbox, session_id):
+                    raise
+                await self._cleanup_session(session_name)
+                session_id = await self._ensure_session(session_name)
+                response = self.sandbox.process.execute_session_command(
+                    session_id=session_id,
+                    req=req,
+                    timeout=timeout
+                )
             
             # Get detailed logs
             logs = self.sandbox.process.get_session_command_logs(
@@ -188,7 +218,63 @@ class SandboxShellTool(SandboxToolsBase):
         except Exception as e:
             return self.fail_response(f"Error executing command: {str(e)}")
 
+    async def _execute_streaming(self, session_id: str, session_name: str, command: str, cwd: str, timeout: int) -> ToolResult:
+        """Run a command asynchronously, streaming its output as progress events.
+        
+        Returns a bounded head/tail summary of the output. When the output is
+        longer than the summary, the full log is written to COMMAND_LOG_DIR.
+        """
+        from sandbox.sandbox import SessionExecuteRequest
+        response = self.sandbox.process.execute_session_command(
+            session_id=session_id,
+            req=SessionExecuteRequest(command=command, var_async=True, cwd=cwd)
+        )
+        command_id = response.cmd_id
+        
+        chunks: List[str] = []
+        def on_logs(chunk: str):
+            chunks.append(chunk)
+            self.report_progress({"command_id": command_id, "output": chunk[-MAX_PROGRESS_CHUNK_CHARS:]})
+        
+        timed_out = False
+        try:
+            await asyncio.wait_for(
+                self.sandbox.process.get_session_command_logs_async(session_id, command_id, on_logs),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+        
+        logs = "".join(chunks)
+        exit_code = None
+        if not timed_out:
+            exit_code = self.sandbox.process.get_session_command(session_id, command_id).exit_code
+        
+        result = {
+            "output": logs,
+            "exit_code": exit_code,
+            "cwd": cwd
+        }
+        if len(logs) > STREAM_SUMMARY_HEAD_CHARS + STREAM_SUMMARY_TAIL_CHARS:
+            log_file = f"{COMMAND_LOG_DIR}/{command_id}.log"
+            self.sandbox.fs.create_folder(f"{self.workspace_path}/{COMMAND_LOG_DIR}", "755")
+            self.sandbox.fs.upload_file(f"{self.workspace_path}/{log_file}", logs.encode())
+            omitted = len(logs) - STREAM_SUMMARY_HEAD_CHARS - STREAM_SUMMARY_TAIL_CHARS
+            result["output"] = (
+                f"{logs[:STREAM_SUMMARY_HEAD_CHARS]}\n"
+                f"... [{omitted} characters omitted, full log in {log_file}] ...\n"
+                f"{logs[-STREAM_SUMMARY_TAIL_CHARS:]}"
+            )
+            result["log_file"] = log_file
+        
+        if timed_out:
+            result["message"] = f"Command still running after {timeout}s in session '{session_name}'. Output so far is shown; check on it later or use a longer timeout."
+            return self.success_response(result)
+        if exit_code == 0:
+            return self.success_response(result)
+        return self.fail_response(f"Command failed with exit code {exit_code}: {result['output']}")
+
     async def cleanup(self):
-        """Clean up all sessions."""
-        for session_name in list(self._sessions.keys()):
-            await self._cleanup_session(session_name)
+        """Clean up all sessions of the sandbox, including those kept for later runs."""
+        await self._ensure_sandbox()
+        await get_session_pool(self.sandbox_id).discard_all(self.sandbox)
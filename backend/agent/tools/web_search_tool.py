@@ -1,14 +1,167 @@
 from tavily import AsyncTavilyClient
 import httpx
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable, Set
+from collections import OrderedDict
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
 import os
+import re
+import time
+import asyncio
+import hashlib
 from dotenv import load_dotenv
 from agentpress.tool import Tool, ToolResult, openapi_schema, xml_schema
+from utils.logger import logger
 import json
 
 # TODO: add subpages, etc... in filters as sometimes its necessary 
 
+TAVILY_EXTRACT_URL = "https://api.tavily.com/extract"
+TAVILY_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Seconds a search or extract result is reused for an identical request
+WEB_SEARCH_CACHE_TTL = int(os.getenv("WEB_SEARCH_CACHE_TTL", "600"))
+WEB_EXTRACT_CACHE_TTL = int(os.getenv("WEB_EXTRACT_CACHE_TTL", "3600"))
+MAX_CACHED_WEB_RESULTS = 256
+# Characters of a Tavily response written to the debug log
+MAX_LOGGED_RESPONSE_CHARS = 500
+
+# Batched crawling: URLs per tool call, URLs per Tavily extract request (the
+# API limit) and extract requests sent at once
+MAX_BATCH_CRAWL_URLS = 50
+TAVILY_EXTRACT_BATCH_SIZE = 20
+TAVILY_MAX_CONCURRENT_EXTRACTS = 4
+DEFAULT_MAX_CHARS_PER_PAGE = 10000
+
+# Keep-alive client shared by every web search tool in the process
+_tavily_http_client: Optional[httpx.AsyncClient] = None
+# Cache key -> (expiry time, result)
+_web_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+# Cache key -> request in progress, so identical concurrent requests share one
+_in_flight: Dict[str, asyncio.Future] = {}
+# Running extract batches, referenced so they finish even if their caller is cancelled
+_extract_batches: Set[asyncio.Task] = set()
+
+
+def _get_tavily_http_client() -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client, creating it on first use."""
+    global _tavily_http_client
+    if _tavily_http_client is None or _tavily_http_client.is_closed:
+        _tavily_http_client = httpx.AsyncClient(
+            timeout=TAVILY_TIMEOUT,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10, keepalive_expiry=60)
+        )
+    return _tavily_http_client
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return " ".join(query.lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: lowercase scheme and host, no fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def _truncate_for_log(value: Any, limit: int = MAX_LOGGED_RESPONSE_CHARS) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more chars)"
+
+
+def _cache_get(key: str) -> Optional[Any]:
+    entry = _web_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+        del _web_cache[key]
+        return None
+    _web_cache.move_to_end(key)
+    logger.debug(f"Web cache hit for {key}")
+    return value
+
+
+def _cache_put(key: str, ttl: int, value: Any) -> None:
+    _web_cache[key] = (time.monotonic() + ttl, value)
+    _web_cache.move_to_end(key)
+    while len(_web_cache) > MAX_CACHED_WEB_RESULTS:
+        _web_cache.popitem(last=False)
+
+
+async def _cached(key: str, ttl: int, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Return the cached result for a key, or fetch it once for all concurrent callers.
+
+    Failed fetches are not cached, so the next call retries.
+    """
+    value = _cache_get(key)
+    if value is not None:
+        return value
+
+    task = _in_flight.get(key)
+    if task is None:
+        async def run():
+            try:
+                value = await fetch()
+                _cache_put(key, ttl, value)
+                return value
+            finally:
+                _in_flight.pop(key, None)
+
+        task = asyncio.create_task(run())
+        _in_flight[key] = task
+    else:
+        logger.debug(f"Joining in-flight web request for {key}")
+    # A cancelled caller must not cancel the request other callers are waiting on
+    return await asyncio.shield(task)
+
+
+def _extracted_items(data: Any) -> List[Dict[str, Any]]:
+    """Normalise Tavily extract output to a list of dicts."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if "results" in data and isinstance(data["results"], list):
+            return data["results"]
+        if "urls" in data and isinstance(data["urls"], dict):
+            return list(data["urls"].values())
+        return [data]
+    return []
+
+
+def _page_text(page: Dict[str, Any]) -> str:
+    return page.get("raw_content") or page.get("content") or page.get("text") or ""
+
+
+def _content_hash(text: str) -> str:
+    """Hash of a page's text that ignores case and whitespace, so mirrors match."""
+    return hashlib.sha256(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+def _parse_urls(urls: Any) -> List[str]:
+    """Accept a list of URLs, a JSON array, or a comma / whitespace separated string."""
+    if isinstance(urls, str):
+        urls = urls.strip()
+        if urls.startswith("["):
+            urls = json.loads(urls)
+        else:
+            urls = re.split(r"[\s,]+", urls)
+    if not isinstance(urls, list):
+        raise ValueError("urls must be a list of URLs")
+    return [url.strip() for url in urls if isinstance(url, str) and url.strip()]
+
+
+def _with_protocol(url: str) -> str:
+    if not (url.startswith('http://') or url.startswith('https://')):
+        return 'https://' + url
+    return url
+
+
 class WebSearchTool(Tool):
     """Tool for performing web searches using the Exa API."""
 
@@ -24,6 +177,96 @@ class WebSearchTool(Tool):
         # Tavily asynchronous search client
         self.tavily_client = AsyncTavilyClient(api_key=self.api_key)
 
+    async def _extract(self, urls) -> Any:
+        """Call the Tavily extract endpoint for one URL or a list of URLs."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "urls": urls,
+            "include_images": False,
+            "extract_depth": "basic",
+        }
+        response = await _get_tavily_http_client().post(TAVILY_EXTRACT_URL, json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        logger.debug(f"Tavily extract response for {urls}: {_truncate_for_log(data)}")
+        return data
+
+    async def _extract_pages(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract many pages, answering from the cache where possible.
+
+        Uncached URLs are sent to Tavily in batches of TAVILY_EXTRACT_BATCH_SIZE,
+        several batches at once. A URL already being fetched by another call is
+        awaited rather than requested again. Batches run as their own tasks, so
+        cancelling one caller does not strand other callers waiting on them.
+
+        Returns:
+            Dict mapping each requested URL to its Tavily result, or to a dict
+            with an 'error' key if it could not be extracted
+        """
+        pending: Dict[str, asyncio.Future] = {}
+        to_fetch: Dict[str, str] = {}  # cache key -> URL
+        pages: Dict[str, Dict[str, Any]] = {}
+        loop = asyncio.get_running_loop()
+        for url in urls:
+            key = f"extract:{normalize_url(url)}"
+            page = _cache_get(key)
+            if page is not None:
+                pages[url] = page
+                continue
+            if key not in _in_flight:
+                to_fetch[key] = url
+                _in_flight[key] = loop.create_future()
+            pending[url] = _in_flight[key]
+
+        semaphore = asyncio.Semaphore(TAVILY_MAX_CONCURRENT_EXTRACTS)
+
+        async def fetch_batch(keys: List[str]) -> None:
+            futures = {key: _in_flight[key] for key in keys}
+            try:
+                async with semaphore:
+                    data = await self._extract([to_fetch[key] for key in keys])
+                failures = {}
+                if isinstance(data, dict):
+                    for failed in data.get("failed_results") or []:
+                        failures[normalize_url(failed.get("url", ""))] = failed.get("error") or "Extraction failed"
+                for item in _extracted_items(data):
+                    key = f"extract:{normalize_url(item.get('url', ''))}"
+                    if key in futures and not futures[key].done() and _page_text(item):
+                        _cache_put(key, WEB_EXTRACT_CACHE_TTL, item)
+                        futures[key].set_result(item)
+                for key, future in futures.items():
+                    if not future.done():
+                        url = to_fetch[key]
+                        future.set_result({"url": url, "error": failures.get(normalize_url(url), "No content returned")})
+            except BaseException as e:
+                error = e if isinstance(e, Exception) else RuntimeError("Extract request was cancelled")
+                for future in futures.values():
+                    if not future.done():
+                        future.set_exception(error)
+                if not isinstance(e, Exception):
+                    raise
+            finally:
+                for key in keys:
+                    _in_flight.pop(key, None)
+
+        keys = list(to_fetch)
+        for start in range(0, len(keys), TAVILY_EXTRACT_BATCH_SIZE):
+            batch = asyncio.create_task(fetch_batch(keys[start:start + TAVILY_EXTRACT_BATCH_SIZE]))
+            _extract_batches.add(batch)
+            batch.add_done_callback(_extract_batches.discard)
+
+        # A cancelled caller must not cancel the batches other callers are waiting on
+        for url, future in pending.items():
+            try:
+                pages[url] = await asyncio.shield(future)
+            except Exception as e:
+                pages[url] = {"url": url, "error": str(e)}
+        return pages
+
     @openapi_schema({
         "type": "function",
         "function": {
@@ -112,12 +355,16 @@ class WebSearchTool(Tool):
             else:
                 num_results = 20
 
-            # Execute the search with Tavily
-            search_response = await self.tavily_client.search(
-                query=query,
-                max_results=num_results,
-                include_answer=False,
-                include_images=False,
+            # Execute the search with Tavily, reusing a recent identical search
+            search_response = await _cached(
+                f"search:{num_results}:{normalize_query(query)}",
+                WEB_SEARCH_CACHE_TTL,
+                lambda: self.tavily_client.search(
+                    query=query,
+                    max_results=num_results,
+                    include_answer=False,
+                    include_images=False,
+                )
             )
 
             # Normalize the response format
@@ -229,57 +476,141 @@ class WebSearchTool(Tool):
                 return self.fail_response("URL must be a string.")
                 
             # ---------- Tavily extract endpoint ----------
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                }
-                payload = {
-                    "urls": url,
-                    "include_images": False,
-                    "extract_depth": "basic",
-                }
-                response = await client.post(
-                    "https://api.tavily.com/extract",
-                    json=payload,
-                    headers=headers,
-                    timeout=60,
-                )
-                response.raise_for_status()
-                data = response.json()
-                print(f"--- Raw Tavily Response ---")
-                print(data)
-                print(f"--------------------------")
-
-            # Normalise Tavily extract output to a list of dicts
-            extracted = []
-            if isinstance(data, list):
-                extracted = data
-            elif isinstance(data, dict):
-                if "results" in data and isinstance(data["results"], list):
-                    extracted = data["results"]
-                elif "urls" in data and isinstance(data["urls"], dict):
-                    extracted = list(data["urls"].values())
-                else:
-                    extracted = [data]
+            item = (await self._extract_pages([url]))[url]
+            if item.get("error"):
+                raise RuntimeError(item["error"])
+
+            formatted_result = {
+                "Title": item.get("title"),
+                "URL": item.get("url") or url,
+                "Text": _page_text(item)
+            }
+            if item.get("published_date"):
+                formatted_result["Published Date"] = item["published_date"]
+            
+            return self.success_response([formatted_result])
+        
+        except Exception as e:
+            error_message = str(e)
+            # Truncate very long error messages
+            simplified_message = f"Error crawling webpage: {error_message[:200]}"
+            if len(error_message) > 200:
+                simplified_message += "..."
+            return self.fail_response(simplified_message)
+
+    @openapi_schema({
+        "type": "function",
+        "function": {
+            "name": "batch_crawl_webpages",
+            "description": "Retrieve the text content of several webpages in one call. The pages are fetched concurrently and returned in the order given, each capped at max_chars_per_page characters. Pages whose content duplicates an earlier page (mirrors, syndicated copies) are reported as duplicates instead of repeating the text. Prefer this over multiple crawl_webpage calls when you need to read more than one page.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "urls": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": f"The URLs of the webpages to crawl, including the protocol (http:// or https://). At most {MAX_BATCH_CRAWL_URLS} URLs per call."
+                    },
+                    "max_chars_per_page": {
+                        "type": "integer",
+                        "description": "Maximum number of characters of text returned for each page. Longer pages are truncated and marked as such.",
+                        "default": DEFAULT_MAX_CHARS_PER_PAGE
+                    }
+                },
+                "required": ["urls"]
+            }
+        }
+    })
+    @xml_schema(
+        tag_name="batch-crawl-webpages",
+        mappings=[
+            {"param_name": "urls", "node_type": "attribute", "path": "."},
+            {"param_name": "max_chars_per_page", "node_type": "attribute", "path": "."}
+        ],
+        example='''
+        <!-- 
+        The batch-crawl-webpages tool extracts the text content of several web pages at once.
+        Separate the URLs with commas. Each page's text is capped at max_chars_per_page.
+        -->
+        
+        <!-- Batch crawl example -->
+        <batch-crawl-webpages 
+            urls="https://example.com/article/one, https://example.org/report/two"
+            max_chars_per_page="10000">
+        </batch-crawl-webpages>
+        '''
+    )
+    async def batch_crawl_webpages(
+        self,
+        urls: List[str],
+        max_chars_per_page: int = DEFAULT_MAX_CHARS_PER_PAGE
+    ) -> ToolResult:
+        """
+        Retrieve the text content of several webpages concurrently.
+
+        Each result holds the URL and either the page's Title, Text (capped at
+        max_chars_per_page) and Published Date, an Error, or, for a page whose
+        text matches an earlier page in the batch, the URL it duplicates.
+
+        Parameters:
+        - urls: The URLs of the webpages to crawl
+        - max_chars_per_page: Maximum characters of text returned per page
+        """
+        try:
+            try:
+                urls = _parse_urls(urls)
+            except ValueError as e:
+                return self.fail_response(f"Invalid urls: {str(e)}")
+            if not urls:
+                return self.fail_response("At least one valid URL is required.")
+            if len(urls) > MAX_BATCH_CRAWL_URLS:
+                return self.fail_response(f"At most {MAX_BATCH_CRAWL_URLS} URLs can be crawled per call, got {len(urls)}.")
+
+            try:
+                max_chars_per_page = max(1, int(max_chars_per_page or DEFAULT_MAX_CHARS_PER_PAGE))
+            except (TypeError, ValueError):
+                max_chars_per_page = DEFAULT_MAX_CHARS_PER_PAGE
+
+            # The same page listed twice is fetched and returned once
+            unique_urls: Dict[str, str] = {}
+            for url in map(_with_protocol, urls):
+                unique_urls.setdefault(normalize_url(url), url)
+            urls = list(unique_urls.values())
+            pages = await self._extract_pages(urls)
 
             formatted_results = []
-            for item in extracted:
+            seen_content: Dict[str, str] = {}  # content hash -> first URL with that content
+            for url in urls:
+                item = pages[url]
+                if item.get("error"):
+                    formatted_results.append({"URL": url, "Error": item["error"]})
+                    continue
+
+                text = _page_text(item)
+                content_hash = _content_hash(text)
+                if content_hash in seen_content:
+                    formatted_results.append({"URL": url, "Duplicate Of": seen_content[content_hash]})
+                    continue
+                seen_content[content_hash] = url
+
                 formatted_result = {
                     "Title": item.get("title"),
                     "URL": item.get("url") or url,
-                    "Text":item.get("raw_content") or item.get("content") or item.get("text")
+                    "Text": text[:max_chars_per_page]
                 }
+                if len(text) > max_chars_per_page:
+                    formatted_result["Truncated"] = True
+                    formatted_result["Total Chars"] = len(text)
                 if item.get("published_date"):
                     formatted_result["Published Date"] = item["published_date"]
                 formatted_results.append(formatted_result)
-            
+
             return self.success_response(formatted_results)
-        
+
         except Exception as e:
             error_message = str(e)
             # Truncate very long error messages
-            simplified_message = f"Error crawling webpage: {error_message[:200]}"
+            simplified_message = f"Error crawling webpages: {error_message[:200]}"
             if len(error_message) > 200:
                 simplified_message += "..."
             return self.fail_response(simplified_message)
@@ -307,9 +638,22 @@ if __name__ == "__main__":
         )
         print(result)
     
+    async def test_batch_crawl_webpages():
+        """Test function for the batched webpage crawl tool"""
+        search_tool = WebSearchTool()
+        result = await search_tool.batch_crawl_webpages(
+            urls=[
+                "https://www.wired.com/story/anthropic-benevolent-artificial-intelligence/",
+                "https://en.wikipedia.org/wiki/Web_crawler",
+            ],
+            max_chars_per_page=2000,
+        )
+        print(result)
+    
     async def run_tests():
         """Run all test functions"""
         await test_web_search()
         await test_crawl_webpage()
+        await test_batch_crawl_webpages()
         
     asyncio.run(run_tests())
\ No newline at end of file
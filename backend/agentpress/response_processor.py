@@ -18,7 +18,7 @@ from datetime import datetime, timezone
 
 from litellm import completion_cost, token_counter
 
-from agentpress.tool import Tool, ToolResult
+from agentpress.tool import Tool, ToolResult, tool_progress_callback
 from agentpress.tool_registry import ToolRegistry
 from utils.logger import logger
 
@@ -28,6 +28,9 @@ XmlAddingStrategy = Literal["user_message", "assistant_message", "inline_edit"]
 # Type alias for tool execution strategy
 ToolExecutionStrategy = Literal["sequential", "parallel"]
 
+# How often (seconds) queued tool progress is flushed while waiting for tools
+TOOL_PROGRESS_POLL_INTERVAL = 0.5
+
 @dataclass
 class ToolExecutionContext:
     """Context for a tool execution including call details, result, and display info."""
@@ -123,6 +126,7 @@ class ResponseProcessor:
         finish_reason = None
         last_assistant_message_object = None # Store the final saved assistant message object
         tool_result_message_objects = {} # tool_index -> full saved message object
+        progress_queue = asyncio.Queue() # (context, payload) reported by running tools
 
         logger.info(f"Streaming Config: XML={config.xml_tool_calling}, Native={config.native_tool_calling}, "
                    f"Execute on stream={config.execute_on_stream}, Strategy={config.tool_execution_strategy}")
@@ -147,6 +151,10 @@ class ResponseProcessor:
             # --- End Start Events ---
 
             async for chunk in llm_response:
+                # Flush progress reported by tools started earlier in the stream
+                while not progress_queue.empty():
+                    yield self._format_tool_progress(*progress_queue.get_nowait(), thread_id, thread_run_id)
+
                 if hasattr(chunk, 'choices') and chunk.choices and hasattr(chunk.choices[0], 'finish_reason') and chunk.choices[0].finish_reason:
                     finish_reason = chunk.choices[0].finish_reason
                     logger.debug(f"Detected finish_reason: {finish_reason}")
@@ -200,7 +208,7 @@ class ResponseProcessor:
                                         if started_msg_obj: yield started_msg_obj
                                         yielded_tool_indices.add(tool_index) # Mark status as yielded
 
-                                        execution_task = asyncio.create_task(self._execute_tool(tool_call))
+                                        execution_task = self._create_tool_task(tool_call, context, progress_queue)
                                         pending_tool_executions.append({
                                             "task": execution_task, "tool_call": tool_call,
                                             "tool_index": tool_index, "context": context
@@ -270,7 +278,7 @@ class ResponseProcessor:
                                 if started_msg_obj: yield started_msg_obj
                                 yielded_tool_indices.add(tool_index) # Mark status as yielded
 
-                                execution_task = asyncio.create_task(self._execute_tool(tool_call_data))
+                                execution_task = self._create_tool_task(tool_call_data, context, progress_queue)
                                 pending_tool_executions.append({
                                     "task": execution_task, "tool_call": tool_call_data,
                                     "tool_index": tool_index, "context": context
@@ -288,8 +296,11 @@ class ResponseProcessor:
             if pending_tool_executions:
                 logger.info(f"Waiting for {len(pending_tool_executions)} pending streamed tool executions")
                 # ... (asyncio.wait logic) ...
-                pending_tasks = [execution["task"] for execution in pending_tool_executions]
-                done, _ = await asyncio.wait(pending_tasks)
+                pending_tasks = {execution["task"] for execution in pending_tool_executions}
+                while pending_tasks:
+                    _, pending_tasks = await asyncio.wait(pending_tasks, timeout=TOOL_PROGRESS_POLL_INTERVAL)
+                    while not progress_queue.empty():
+                        yield self._format_tool_progress(*progress_queue.get_nowait(), thread_id, thread_run_id)
 
                 for execution in pending_tool_executions:
                     tool_idx = execution.get("tool_index", -1)
@@ -1066,6 +1077,31 @@ class ResponseProcessor:
             logger.error(f"Error executing tool {tool_call['function_name']}: {str(e)}", exc_info=True)
             return ToolResult(success=False, output=f"Error executing tool: {str(e)}")
 
+    def _create_tool_task(self, tool_call: Dict[str, Any], context: ToolExecutionContext, progress_queue: asyncio.Queue) -> asyncio.Task:
+        """Start a tool call as a task whose progress reports are queued with its context."""
+        token = tool_progress_callback.set(lambda data: progress_queue.put_nowait((context, data)))
+        try:
+            # The task copies the current context, so the callback stays bound to this call
+            return asyncio.create_task(self._execute_tool(tool_call))
+        finally:
+            tool_progress_callback.reset(token)
+
+    def _format_tool_progress(self, context: ToolExecutionContext, data: Dict[str, Any], thread_id: str, thread_run_id: str) -> Dict[str, Any]:
+        """Format a transient (unsaved) tool progress status message."""
+        now = datetime.now(timezone.utc).isoformat()
+        content = {
+            "role": "assistant", "status_type": "tool_progress",
+            "function_name": context.function_name, "xml_tag_name": context.xml_tag_name,
+            "tool_index": context.tool_index, "tool_call_id": context.tool_call.get("id"),
+            "progress": data
+        }
+        return {
+            "message_id": None, "thread_id": thread_id, "type": "status", "is_llm_message": False,
+            "content": json.dumps(content),
+            "metadata": json.dumps({"thread_run_id": thread_run_id}),
+            "created_at": now, "updated_at": now
+        }
+
     async def _execute_tools(
         self, 
         tool_calls: List[Dict[str, Any]], 
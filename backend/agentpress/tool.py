@@ -7,14 +7,20 @@ This module defines the base classes and decorators for creating tools in AgentP
 - Result containers for standardized tool outputs
 """
 
-from typing import Dict, Any, Union, Optional, List, Type
+from typing import Dict, Any, Union, Optional, List, Type, Callable
 from dataclasses import dataclass, field
 from abc import ABC
+import contextvars
 import json
 import inspect
 from enum import Enum
 from utils.logger import logger
 
+# Set by the response processor around a tool call whose progress is streamed;
+# receives each payload passed to Tool.report_progress
+tool_progress_callback: contextvars.ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = \
+    contextvars.ContextVar("tool_progress_callback", default=None)
+
 class SchemaType(Enum):
     """Enumeration of supported schema types for tool definitions."""
     OPENAPI = "openapi"
@@ -106,6 +112,7 @@ class Tool(ABC):
         get_schemas: Get all registered tool schemas
         success_response: Create a successful result
         fail_response: Create a failed result
+        report_progress: Report intermediate progress of a running call
     """
     
     def __init__(self):
@@ -157,6 +164,20 @@ class Tool(ABC):
         logger.debug(f"Tool {self.__class__.__name__} returned failed result: {msg}")
         return ToolResult(success=False, output=msg)
 
+    def report_progress(self, data: Dict[str, Any]) -> None:
+        """Report intermediate progress of the tool call currently running.
+        
+        The payload is streamed to the client as a transient tool_progress
+        status. It is never saved or sent to the LLM, and is dropped when the
+        call is not executed on stream.
+        
+        Args:
+            data: JSON-serializable progress payload
+        """
+        callback = tool_progress_callback.get()
+        if callback is not None:
+            callback(data)
+
 def _add_schema(func, schema: ToolSchema):
     """Helper to add schema to a function."""
     if not hasattr(func, 'tool_schemas'):
@@ -8,6 +8,8 @@ from pydantic import BaseModel
 from utils.logger import logger
 from utils.auth_utils import get_current_user_id, get_user_id_from_stream_auth, get_optional_user_id
 from sandbox.sandbox import get_or_start_sandbox
+from sandbox.file_cache import get_file_cache, download_file_cached
+from sandbox.workspace_manifest import get_workspace_changes
 from services.supabase import DBConnection
 from agent.api import get_or_create_project_sandbox
 
@@ -134,6 +136,7 @@ async def create_file(
         
         # Create file using raw binary content
         sandbox.fs.upload_file(path, content)
+        get_file_cache(sandbox_id).invalidate(path)
         logger.info(f"File created at {path} in sandbox {sandbox_id}")
         
         return {"status": "success", "created": True, "path": path}
@@ -172,6 +175,7 @@ async def create_file_json(
         
         # Create file
         sandbox.fs.upload_file(path, content)
+        get_file_cache(sandbox_id).invalidate(path)
         logger.info(f"File created at {path} in sandbox {sandbox_id}")
         
         return {"status": "success", "created": True, "path": path}
@@ -236,8 +240,8 @@ async def read_file(
         # Get sandbox using the safer method
         sandbox = await get_sandbox_by_id_safely(client, sandbox_id)
         
-        # Read file
-        content = sandbox.fs.download_file(path)
+        # Read file, reusing cached content if it has not changed
+        content = download_file_cached(sandbox, sandbox_id, path)
         
         # Return a Response object with the content directly
         filename = os.path.basename(path)
@@ -250,6 +254,34 @@ async def read_file(
         logger.error(f"Error reading file in sandbox {sandbox_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/sandboxes/{sandbox_id}/files/manifest")
+async def get_files_manifest(
+    sandbox_id: str,
+    since: Optional[str] = None,
+    request: Request = None,
+    user_id: Optional[str] = Depends(get_optional_user_id)
+):
+    """
+    Get a content-addressed manifest of the sandbox workspace.
+    
+    Pass the version from a previous response as `since` to get only the paths
+    that were added, modified or deleted after it. Contents are not included;
+    fetch changed files with the content endpoint.
+    """
+    client = await db.client
+    
+    # Verify the user has access to this sandbox
+    await verify_sandbox_access(client, sandbox_id, user_id)
+    
+    try:
+        # Get sandbox using the safer method
+        sandbox = await get_sandbox_by_id_safely(client, sandbox_id)
+        
+        return get_workspace_changes(sandbox, sandbox_id, since)
+    except Exception as e:
+        logger.error(f"Error getting file manifest in sandbox {sandbox_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/project/{project_id}/sandbox/ensure-active")
 async def ensure_project_sandbox_active(
     project_id: str,
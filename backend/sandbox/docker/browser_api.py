@@ -1,7 +1,8 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Body
-from playwright.async_api import async_playwright, Browser, Page, ElementHandle
+from fastapi import FastAPI, APIRouter, HTTPException, Body, Request
+from fastapi.responses import FileResponse
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, ElementHandle
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Set
 import asyncio
 import json
 import logging
@@ -10,12 +11,17 @@ import base64
 from dataclasses import dataclass, field
 from datetime import datetime
 import os
+import time
 import random
-from functools import cached_property
 import traceback
 import pytesseract
 from PIL import Image
 import io
+import hashlib
+import weakref
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 #######################################################
 # Action model definitions
@@ -76,10 +82,25 @@ class DoneAction(BaseModel):
     success: bool = True
     text: str = ""
 
+class ExtractContentAction(BaseModel):
+    goal: str = ""
+    chunk: int = 0
+
 #######################################################
 # DOM Structure Models
 #######################################################
 
+# Budget for the element listing returned with each browser state
+ELEMENTS_TOKEN_BUDGET = int(os.getenv("BROWSER_ELEMENTS_TOKEN_BUDGET", "2000"))
+MAX_ELEMENT_TEXT_CHARS = 80
+MAX_ATTRIBUTE_CHARS = 100
+# The structured element list repeats the elements string; only sent when enabled
+INCLUDE_ELEMENT_LIST = os.getenv("BROWSER_INCLUDE_ELEMENT_LIST", "false").lower() == "true"
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Shorten text to max_chars, marking the cut with an ellipsis"""
+    return text if len(text) <= max_chars else text[:max_chars - 1] + '…'
+
 @dataclass
 class CoordinateSet:
     x: int = 0
@@ -101,12 +122,12 @@ class HashedDomElement:
     is_visible: bool
     page_coordinates: Optional[CoordinateSet] = None
 
-@dataclass
+@dataclass(slots=True)
 class DOMBaseNode:
     is_visible: bool
     parent: Optional['DOMElementNode'] = None
 
-@dataclass
+@dataclass(slots=True)
 class DOMTextNode(DOMBaseNode):
     text: str = field(default="")
     type: str = 'TEXT_NODE'
@@ -119,7 +140,7 @@ class DOMTextNode(DOMBaseNode):
             current = current.parent
         return False
 
-@dataclass
+@dataclass(slots=True)
 class DOMElementNode(DOMBaseNode):
     tag_name: str = field(default="")
     xpath: str = field(default="")
@@ -154,7 +175,7 @@ class DOMElementNode(DOMBaseNode):
             
         return tag_str
     
-    @cached_property
+    @property
     def hash(self) -> HashedDomElement:
         return HashedDomElement(
             tag_name=self.tag_name,
@@ -182,6 +203,41 @@ class DOMElementNode(DOMBaseNode):
         collect_text(self, 0)
         return '\n'.join(text_parts).strip()
     
+    def to_compact_string(self, include_attributes: list[str] | None = None,
+                          max_text_chars: int = MAX_ELEMENT_TEXT_CHARS) -> str:
+        """Format this element as one line: [index]<tag key attributes> text </>"""
+        text = ' '.join(self.get_all_text_till_next_clickable_element().split())
+        
+        # Process attributes for display
+        display_attributes = []
+        if include_attributes:
+            for key, value in self.attributes.items():
+                if key in include_attributes and value and value != self.tag_name:
+                    if text and value in text:
+                        continue  # Skip if attribute value is already in the text
+                    display_attributes.append(truncate_text(str(value), max_text_chars))
+        
+        attributes_str = ';'.join(display_attributes)
+        
+        # Build the element string
+        line = f'[{self.highlight_index}]<{self.tag_name}'
+        
+        # Add important attributes for identification
+        for attr_name in ['id', 'href', 'name', 'value', 'type']:
+            if attr_name in self.attributes and self.attributes[attr_name]:
+                line += f' {attr_name}="{truncate_text(self.attributes[attr_name], MAX_ATTRIBUTE_CHARS)}"'
+        
+        # Add the text content if available
+        if text:
+            line += f'> {truncate_text(text, max_text_chars)}'
+        elif attributes_str:
+            line += f'> {truncate_text(attributes_str, max_text_chars)}'
+        else:
+            # If no text and no attributes, use the tag name
+            line += f'> {self.tag_name.upper()}'
+        
+        return line + ' </>'
+    
     def clickable_elements_to_string(self, include_attributes: list[str] | None = None) -> str:
         """Convert the processed DOM content to HTML."""
         formatted_text = []
@@ -190,39 +246,7 @@ class DOMElementNode(DOMBaseNode):
             if isinstance(node, DOMElementNode):
                 # Add element with highlight_index
                 if node.highlight_index is not None:
-                    attributes_str = ''
-                    text = node.get_all_text_till_next_clickable_element()
-                    
-                    # Process attributes for display
-                    display_attributes = []
-                    if include_attributes:
-                        for key, value in node.attributes.items():
-                            if key in include_attributes and value and value != node.tag_name:
-                                if text and value in text:
-                                    continue  # Skip if attribute value is already in the text
-                                display_attributes.append(str(value))
-                    
-                    attributes_str = ';'.join(display_attributes)
-                    
-                    # Build the element string
-                    line = f'[{node.highlight_index}]<{node.tag_name}'
-                    
-                    # Add important attributes for identification
-                    for attr_name in ['id', 'href', 'name', 'value', 'type']:
-                        if attr_name in node.attributes and node.attributes[attr_name]:
-                            line += f' {attr_name}="{node.attributes[attr_name]}"'
-                    
-                    # Add the text content if available
-                    if text:
-                        line += f'> {text}'
-                    elif attributes_str:
-                        line += f'> {attributes_str}'
-                    else:
-                        # If no text and no attributes, use the tag name
-                        line += f'> {node.tag_name.upper()}'
-                    
-                    line += ' </>'
-                    formatted_text.append(line)
+                    formatted_text.append(node.to_compact_string(include_attributes))
                 
                 # Process children regardless
                 for child in node.children:
@@ -238,6 +262,53 @@ class DOMElementNode(DOMBaseNode):
         result = '\n'.join(formatted_text)
         return result if result.strip() else "No interactive elements found"
 
+def viewport_distance(element: DOMElementNode, viewport_height: int) -> float:
+    """Vertical distance in pixels between an element and the viewport (0 if it overlaps it)"""
+    coords = element.viewport_coordinates
+    if coords is None:
+        return float('inf')
+    if coords.y + coords.height < 0:
+        return -(coords.y + coords.height)
+    if viewport_height and coords.y > viewport_height:
+        return coords.y - viewport_height
+    return 0
+
+def serialize_elements(selector_map: Dict[int, DOMElementNode], viewport_height: int,
+                       include_attributes: list[str] | None = None,
+                       max_chars: int = ELEMENTS_TOKEN_BUDGET * 4) -> tuple:
+    """Compact listing of interactive elements that fits a size budget
+    Returns a tuple of (elements string, number of elements omitted)
+    
+    Elements are ranked by distance from the viewport, with unlabeled
+    elements ranked lower, and the best ranked ones that fit in max_chars
+    (roughly 4 characters per token) are listed in page order.
+    """
+    if not selector_map:
+        return "No interactive elements found", 0
+    
+    def rank(item):
+        index, element = item
+        distance = viewport_distance(element, viewport_height)
+        # Elements with nothing to identify them by are the least useful to the agent
+        if not element.children and not any(element.attributes.get(a) for a in ('aria-label', 'title', 'placeholder', 'name', 'value')):
+            distance += viewport_height or 1000
+        return (distance, index)
+    
+    lines = {}
+    used = 0
+    for index, element in sorted(selector_map.items(), key=rank):
+        line = element.to_compact_string(include_attributes)
+        if used + len(line) + 1 > max_chars:
+            continue
+        lines[index] = line
+        used += len(line) + 1
+    
+    omitted = len(selector_map) - len(lines)
+    result = '\n'.join(lines[index] for index in sorted(lines))
+    if omitted:
+        result += f"\n... {omitted} more elements further from the viewport omitted; scroll to see them"
+    return result, omitted
+
 @dataclass
 class DOMState:
     element_tree: DOMElementNode
@@ -246,6 +317,7 @@ class DOMState:
     title: str = ""
     pixels_above: int = 0
     pixels_below: int = 0
+    viewport: Optional[ViewportInfo] = None
 
 #######################################################
 # Browser Action Result Model
@@ -261,6 +333,8 @@ class BrowserActionResult(BaseModel):
     title: Optional[str] = None
     elements: Optional[str] = None  # Formatted string of clickable elements
     screenshot_base64: Optional[str] = None
+    screenshot_hash: Optional[str] = None  # Content hash; served at /api/screenshots/{hash}.{jpg|webp}
+    screenshot_format: Optional[str] = None  # "jpeg" or "webp"
     pixels_above: int = 0
     pixels_below: int = 0
     content: Optional[str] = None
@@ -268,13 +342,487 @@ class BrowserActionResult(BaseModel):
     
     # Additional metadata
     element_count: int = 0  # Number of interactive elements found
+    elements_omitted: int = 0  # Elements left out of `elements` to stay within the budget
     interactive_elements: Optional[List[Dict[str, Any]]] = None  # Simplified list of interactive elements
     viewport_width: Optional[int] = None
     viewport_height: Optional[int] = None
     
+    # Paging of extracted content
+    chunk_index: Optional[int] = None
+    chunk_count: Optional[int] = None
+    
     class Config:
         arbitrary_types_allowed = True
 
+#######################################################
+# Page Scripts
+#######################################################
+
+# Attribute that the page snapshot stamps on every indexed element, so actions
+# can resolve an element by its index without re-querying the page
+AGENT_INDEX_ATTRIBUTE = "data-agent-idx"
+
+def element_selector(index: int) -> str:
+    """CSS selector for the element with a given highlight index in the latest snapshot"""
+    return f'[{AGENT_INDEX_ATTRIBUTE}="{index}"]'
+
+# Returns interactive elements, scroll info, viewport, title and URL in one round trip
+PAGE_SNAPSHOT_JS = """
+() => {
+    const INDEX_ATTRIBUTE = '""" + AGENT_INDEX_ATTRIBUTE + """';
+    
+    // Helper function to get all attributes as an object
+    function getAttributes(el) {
+        const attributes = {};
+        for (const attr of el.attributes) {
+            if (attr.name !== INDEX_ATTRIBUTE) {
+                attributes[attr.name] = attr.value;
+            }
+        }
+        return attributes;
+    }
+    
+    // Find all potentially interactive elements
+    const interactiveElements = Array.from(document.querySelectorAll(
+        'a, button, input, select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'
+    ));
+    
+    // Filter for visible elements
+    const visibleElements = interactiveElements.filter(el => {
+        const style = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return style.display !== 'none' && 
+               style.visibility !== 'hidden' && 
+               style.opacity !== '0' &&
+               rect.width > 0 && 
+               rect.height > 0;
+    });
+    
+    // Tag each indexed element so actions can find it directly, and untag
+    // elements that are no longer indexed
+    const indexed = new Set(visibleElements);
+    for (const el of document.querySelectorAll('[' + INDEX_ATTRIBUTE + ']')) {
+        if (!indexed.has(el)) {
+            el.removeAttribute(INDEX_ATTRIBUTE);
+        }
+    }
+    visibleElements.forEach((el, index) => {
+        if (el.getAttribute(INDEX_ATTRIBUTE) !== String(index + 1)) {
+            el.setAttribute(INDEX_ATTRIBUTE, String(index + 1));
+        }
+    });
+    
+    // Map to our expected structure
+    const elements = visibleElements.map((el, index) => {
+        const rect = el.getBoundingClientRect();
+        const isInViewport = rect.top >= 0 && 
+                          rect.left >= 0 && 
+                          rect.bottom <= window.innerHeight &&
+                          rect.right <= window.innerWidth;
+        
+        return {
+            index: index + 1,
+            tagName: el.tagName.toLowerCase(),
+            text: el.innerText || el.value || '',
+            attributes: getAttributes(el),
+            isVisible: true,
+            isInteractive: true,
+            pageCoordinates: {
+                x: rect.left + window.scrollX,
+                y: rect.top + window.scrollY,
+                width: rect.width,
+                height: rect.height
+            },
+            viewportCoordinates: {
+                x: rect.left,
+                y: rect.top,
+                width: rect.width,
+                height: rect.height
+            },
+            isInViewport: isInViewport
+        };
+    });
+    
+    const body = document.body;
+    const html = document.documentElement;
+    const totalHeight = Math.max(
+        body ? body.scrollHeight : 0, body ? body.offsetHeight : 0,
+        html.clientHeight, html.scrollHeight, html.offsetHeight
+    );
+    const scrollY = window.scrollY || window.pageYOffset;
+    
+    return {
+        url: window.location.href,
+        title: document.title,
+        elements: elements,
+        scroll: {
+            scrollX: window.scrollX || window.pageXOffset,
+            pixelsAbove: scrollY,
+            pixelsBelow: Math.max(0, totalHeight - scrollY - window.innerHeight),
+            totalHeight: totalHeight
+        },
+        viewport: {
+            width: window.innerWidth,
+            height: window.innerHeight
+        }
+    };
+}
+"""
+
+# Settle detection: the page counts as settled once neither DOM mutations nor
+# finished network requests have been observed for quietMs (capped at timeoutMs)
+SETTLE_QUIET_MS = 300
+SETTLE_TIMEOUT_MS = 3000
+
+SETTLE_JS = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let lastActivity = start;
+    const markActivity = () => { lastActivity = performance.now(); };
+    
+    const mutationObserver = new MutationObserver(markActivity);
+    mutationObserver.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    let resourceObserver = null;
+    try {
+        resourceObserver = new PerformanceObserver(markActivity);
+        resourceObserver.observe({type: 'resource'});
+    } catch (e) {}
+    
+    const check = () => {
+        const now = performance.now();
+        const pendingLoad = document.readyState === 'loading';
+        if ((!pendingLoad && now - lastActivity >= quietMs) || now - start >= timeoutMs) {
+            mutationObserver.disconnect();
+            if (resourceObserver) resourceObserver.disconnect();
+            resolve(now - start);
+        } else {
+            setTimeout(check, 50);
+        }
+    };
+    setTimeout(check, 50);
+})
+"""
+
+# Main content is returned as Markdown split into chunks of about this size,
+# cut at block boundaries so chunk indexes stay stable for a given page
+CONTENT_CHUNK_CHARS = int(os.getenv("BROWSER_CONTENT_CHUNK_CHARS", "8000"))
+
+# Finds the main content (readability-style: the container with the most
+# paragraph text and the least link text) and converts it to Markdown blocks.
+# Only leaf blocks emit text, so nested containers are not repeated, and
+# identical blocks (repeated teasers, duplicated captions) are emitted once.
+EXTRACT_CONTENT_JS = r"""
+() => {
+    const SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'CANVAS', 'IFRAME',
+        'NAV', 'FOOTER', 'ASIDE', 'FORM', 'BUTTON', 'SELECT', 'INPUT', 'TEXTAREA', 'DIALOG']);
+    const BLOCK_TAGS = new Set(['P', 'DIV', 'SECTION', 'ARTICLE', 'MAIN', 'HEADER', 'H1', 'H2', 'H3',
+        'H4', 'H5', 'H6', 'UL', 'OL', 'LI', 'PRE', 'BLOCKQUOTE', 'TABLE', 'FIGURE', 'FIGCAPTION',
+        'DL', 'DT', 'DD', 'HR', 'DETAILS', 'SUMMARY']);
+    const UNLIKELY = /comment|footer|footnote|sidebar|sponsor|advert|promo|related|share|social|cookie|banner|popup|modal|newsletter|breadcrumb|menu|nav/i;
+
+    const isHidden = el => {
+        const style = window.getComputedStyle(el);
+        return style.display === 'none' || style.visibility === 'hidden';
+    };
+    const inlineText = el => (el.innerText || '').replace(/\s+/g, ' ').trim();
+    const hasBlockChild = el => Array.from(el.children).some(child => BLOCK_TAGS.has(child.tagName));
+
+    function findMainContent() {
+        const explicit = document.querySelector('article, main, [role="main"]');
+        if (explicit && inlineText(explicit).length > 500) return explicit;
+
+        // Score the parents of each paragraph by its text, halving per level up
+        const scores = new Map();
+        for (const paragraph of document.querySelectorAll('p, pre, td, li')) {
+            const text = inlineText(paragraph);
+            if (text.length < 25) continue;
+            const score = 1 + text.split(',').length + Math.min(3, Math.floor(text.length / 100));
+            let node = paragraph.parentElement;
+            for (let level = 0; node && level < 3; level++, node = node.parentElement) {
+                scores.set(node, (scores.get(node) || 0) + score / (level + 1));
+            }
+        }
+
+        let best = null;
+        let bestScore = 0;
+        for (const [node, score] of scores) {
+            const text = inlineText(node);
+            if (!text) continue;
+            let linkChars = 0;
+            for (const link of node.querySelectorAll('a')) linkChars += inlineText(link).length;
+            let adjusted = score * (1 - Math.min(1, linkChars / text.length));
+            const hint = (typeof node.className === 'string' ? node.className : '') + ' ' + (node.id || '');
+            if (UNLIKELY.test(hint)) adjusted *= 0.5;
+            if (adjusted > bestScore) {
+                best = node;
+                bestScore = adjusted;
+            }
+        }
+        return best || document.body;
+    }
+
+    function tableToMarkdown(table) {
+        const rows = Array.from(table.rows).map(row =>
+            Array.from(row.cells).map(cell => inlineText(cell).replace(/\|/g, '\\|')));
+        if (!rows.length) return '';
+        const width = Math.max(...rows.map(row => row.length));
+        const line = row => '| ' + Array.from({length: width}, (_, i) => row[i] || '').join(' | ') + ' |';
+        return [line(rows[0]), '|' + ' --- |'.repeat(width), ...rows.slice(1).map(line)].join('\n');
+    }
+
+    const blocks = [];
+    const seen = new Set();
+    const emit = text => {
+        if (!text || seen.has(text)) return;
+        seen.add(text);
+        blocks.push(text);
+    };
+
+    function walk(el) {
+        if (SKIP_TAGS.has(el.tagName) || isHidden(el)) return;
+        const tag = el.tagName;
+        if (/^H[1-6]$/.test(tag)) {
+            const text = inlineText(el);
+            if (text) emit('#'.repeat(Number(tag[1])) + ' ' + text);
+            return;
+        }
+        if (tag === 'PRE') {
+            const text = (el.innerText || '').trim();
+            if (text) emit('```\n' + text + '\n```');
+            return;
+        }
+        if (tag === 'TABLE') {
+            emit(tableToMarkdown(el));
+            return;
+        }
+        if (tag === 'HR') return;
+        if (!hasBlockChild(el)) {
+            const text = inlineText(el);
+            if (!text) return;
+            if (tag === 'LI') emit('- ' + text);
+            else if (tag === 'BLOCKQUOTE') emit('> ' + text);
+            else emit(text);
+            return;
+        }
+        // Mixed content: recurse into blocks, keep loose text between them
+        for (const child of el.childNodes) {
+            if (child.nodeType === Node.ELEMENT_NODE) {
+                walk(child);
+            } else if (child.nodeType === Node.TEXT_NODE) {
+                emit(child.textContent.replace(/\s+/g, ' ').trim());
+            }
+        }
+    }
+
+    const root = findMainContent();
+    walk(root);
+    return {url: window.location.href, title: document.title, blocks: blocks};
+}
+"""
+
+def chunk_blocks(blocks: List[str], max_chars: int) -> List[str]:
+    """Join Markdown blocks into chunks of at most max_chars, splitting only oversized blocks"""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in blocks:
+        pieces = [block[i:i + max_chars] for i in range(0, len(block), max_chars)] or [""]
+        for piece in pieces:
+            if current and size + 2 + len(piece) > max_chars:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            size += len(piece) + (2 if current else 0)
+            current.append(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks or [""]
+
+#######################################################
+# Screenshot Storage
+#######################################################
+
+# Screenshots are stored once under their content hash and served by URL, so
+# callers can keep a reference instead of the image itself
+MAX_STORED_SCREENSHOTS = 1000
+SCREENSHOT_FILENAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.(jpg|webp)$")
+
+# Encoding tiers, selected per request with the X-Screenshot-Tier header.
+# Image tokens grow with resolution, so callers pick the tier that suits the
+# model's vision cost. max_width=None keeps the viewport resolution.
+SCREENSHOT_TIERS = {
+    "high": {"format": "jpeg", "quality": 80, "max_width": None},
+    "standard": {"format": "jpeg", "quality": 60, "max_width": None},
+    "medium": {"format": "webp", "quality": 60, "max_width": 1280},
+    "low": {"format": "webp", "quality": 50, "max_width": 1024},
+}
+DEFAULT_SCREENSHOT_TIER = os.getenv("BROWSER_SCREENSHOT_TIER", "standard")
+
+# Screenshot tier of the request being handled
+screenshot_tier: contextvars.ContextVar[str] = contextvars.ContextVar("screenshot_tier", default=DEFAULT_SCREENSHOT_TIER)
+
+# Change detection: frames are compared as small grayscale thumbnails, and
+# count as unchanged when no thumbnail pixel moved by more than the tolerance
+FRAME_THUMBNAIL_SIZE = (96, 54)
+FRAME_PIXEL_TOLERANCE = 6
+
+def frame_thumbnail(image_bytes: bytes) -> bytes:
+    """Grayscale thumbnail of an encoded image, used to compare frames"""
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('L', (FRAME_THUMBNAIL_SIZE[0] * 4, FRAME_THUMBNAIL_SIZE[1] * 4))
+    return image.convert('L').resize(FRAME_THUMBNAIL_SIZE, Image.BILINEAR).tobytes()
+
+def frames_match(previous: bytes, current: bytes) -> bool:
+    """Whether two frame thumbnails look the same"""
+    return len(previous) == len(current) and all(
+        abs(a - b) <= FRAME_PIXEL_TOLERANCE for a, b in zip(previous, current)
+    )
+
+def encode_screenshot(image_bytes: bytes, tier: Dict[str, Any]) -> bytes:
+    """Re-encode a captured screenshot in the format and size of a tier"""
+    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    max_width = tier.get("max_width")
+    if max_width and image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format=tier["format"].upper(), quality=tier["quality"])
+    return output.getvalue()
+
+#######################################################
+# OCR Helpers
+#######################################################
+
+# OCR is slow, so it only runs after every action when explicitly enabled;
+# otherwise it is computed on demand via /automation/extract_screen_text
+OCR_ON_ACTIONS = os.getenv("BROWSER_OCR_ON_ACTIONS", "false").lower() == "true"
+OCR_WORKERS = int(os.getenv("BROWSER_OCR_WORKERS", "2"))
+OCR_CACHE_SIZE = 256
+
+def run_ocr(image_bytes: bytes) -> str:
+    """Extract text from an encoded image (runs in a worker process)"""
+    image = Image.open(io.BytesIO(image_bytes))
+    return pytesseract.image_to_string(image).strip()
+
+def perceptual_hash(image_bytes: bytes, hash_size: int = 16) -> str:
+    """Difference hash of an encoded image; visually identical screenshots share a hash"""
+    image = Image.open(io.BytesIO(image_bytes))
+    # Let the JPEG decoder downscale while decoding, which is much cheaper than a full decode
+    image.draft('L', (hash_size * 8, hash_size * 8))
+    image = image.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(image.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+def ocr_cache_key(image_bytes: bytes) -> str:
+    """OCR cache key of an encoded image: its perceptual hash plus a digest of its frame thumbnail
+
+    The perceptual hash alone averages blocks of over 100x60 px, so pages with
+    the same layout but different words (a scrolled article, the next page of
+    a table) share it; the exact thumbnail digest tells them apart.
+    """
+    thumbnail_digest = hashlib.sha256(frame_thumbnail(image_bytes)).hexdigest()
+    return f"{perceptual_hash(image_bytes)}:{thumbnail_digest}"
+
+#######################################################
+# Request Interception
+#######################################################
+
+# Routing profile applied to every browser context: blocks trackers, ads,
+# fonts and media, caps concurrent subresource fetches and serves static
+# assets from a local cache. Playwright disables the browser's own HTTP cache
+# once routing is enabled, so the profile brings its own.
+ROUTING_PROFILE_ENABLED = os.getenv("BROWSER_ROUTING_PROFILE", "true").lower() == "true"
+BLOCKED_RESOURCE_TYPES = {"font", "media"}
+BLOCKED_URL_PATTERNS = [
+    r"doubleclick\.net", r"googlesyndication\.com", r"googleadservices\.com", r"adservice\.google\.",
+    r"google-analytics\.com", r"googletagmanager\.com", r"googletagservices\.com",
+    r"connect\.facebook\.net", r"facebook\.com/tr", r"amazon-adsystem\.com", r"adnxs\.com",
+    r"criteo\.(com|net)", r"taboola\.com", r"outbrain\.com", r"scorecardresearch\.com",
+    r"quantserve\.com", r"hotjar\.(com|io)", r"segment\.(com|io)", r"mixpanel\.com",
+    r"fullstory\.com", r"clarity\.ms", r"newrelic\.com", r"nr-data\.net", r"moatads\.com",
+    r"pubmatic\.com", r"rubiconproject\.com", r"casalemedia\.com", r"adsrvr\.org",
+] + [p for p in os.getenv("BROWSER_BLOCKED_URL_PATTERNS", "").split(",") if p]
+BLOCKED_URL_REGEX = re.compile("|".join(BLOCKED_URL_PATTERNS))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("BROWSER_MAX_CONCURRENT_REQUESTS", "16"))
+CACHEABLE_RESOURCE_TYPES = {"script", "stylesheet", "image"}
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+HTTP_CACHE_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+# Fetched bodies are already decoded, so these headers no longer describe them
+STRIPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# "interactive" waits for DOMContentLoaded and then the mutation-quiet window
+# of the state capture; "networkidle" waits for the network to go idle
+WAIT_STRATEGY = os.getenv("BROWSER_WAIT_STRATEGY", "interactive")
+
+class HttpCache:
+    """In-memory LRU cache of static responses, honouring Cache-Control max-age"""
+    
+    def __init__(self, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.total_bytes = 0
+    
+    @staticmethod
+    def max_age(headers: Dict[str, str]) -> int:
+        """Seconds a response may be reused for, 0 if it must not be cached"""
+        cache_control = headers.get("cache-control", "").lower()
+        if any(directive in cache_control for directive in ("no-store", "no-cache", "private")):
+            return 0
+        match = re.search(r"(?:s-)?max-age=(\d+)", cache_control)
+        return int(match.group(1)) if match else 0
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        if entry["expires"] < time.monotonic():
+            self.remove(url)
+            return None
+        self.entries.move_to_end(url)
+        return entry
+    
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        max_age = self.max_age(headers)
+        if status != 200 or max_age <= 0 or len(body) > HTTP_CACHE_MAX_ENTRY_BYTES:
+            return
+        self.remove(url)
+        self.entries[url] = {"status": status, "headers": headers, "body": body, "expires": time.monotonic() + max_age}
+        self.total_bytes += len(body)
+        while self.total_bytes > self.max_bytes and self.entries:
+            self.remove(next(iter(self.entries)))
+    
+    def remove(self, url: str) -> None:
+        entry = self.entries.pop(url, None)
+        if entry is not None:
+            self.total_bytes -= len(entry["body"])
+
+#######################################################
+# Browser Sessions
+#######################################################
+
+# Callers pick their session with the X-Browser-Session header. Each session
+# is an isolated browser context, so sessions don't share tabs, cookies or
+# storage, and requests for different sessions run concurrently.
+DEFAULT_BROWSER_SESSION = "default"
+MAX_BROWSER_SESSIONS = int(os.getenv("BROWSER_MAX_SESSIONS", "8"))
+# Contexts created ahead of time so a new session starts without waiting
+WARM_BROWSER_SESSIONS = int(os.getenv("BROWSER_WARM_SESSIONS", "1"))
+
+# Browser session of the request being handled
+browser_session_id: contextvars.ContextVar[str] = contextvars.ContextVar("browser_session_id", default=DEFAULT_BROWSER_SESSION)
+
+@dataclass
+class BrowserSession:
+    """An isolated browser context with its own tabs, driven by one request at a time"""
+    context: BrowserContext
+    pages: List[Page] = field(default_factory=list)
+    current_page_index: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+
 #######################################################
 # Browser Automation Implementation 
 #######################################################
@@ -283,13 +831,31 @@ class BrowserAutomation:
     def __init__(self):
         self.router = APIRouter()
         self.browser: Browser = None
-        self.pages: List[Page] = []
-        self.current_page_index: int = 0
+        self.sessions: Dict[str, BrowserSession] = {}
+        self.warm_sessions: List[BrowserSession] = []
+        self.sessions_lock = asyncio.Lock()
+        self.filling_warm_sessions = False
+        # Running background tasks, referenced so they are not garbage collected mid-run
+        self.background_tasks: Set[asyncio.Task] = set()
+        # Shared by the routing profile of every context
+        self.http_cache = HttpCache()
         self.logger = logging.getLogger("browser_automation")
         self.include_attributes = ["id", "href", "src", "alt", "aria-label", "placeholder", "name", "role", "title", "value"]
         self.screenshot_dir = os.path.join(os.getcwd(), "screenshots")
         os.makedirs(self.screenshot_dir, exist_ok=True)
         
+        # Content-addressed screenshots on disk, oldest first
+        self.stored_screenshots: OrderedDict[str, str] = OrderedDict()
+        # Last frame taken of each page, to reuse its screenshot when nothing changed
+        self.last_frames: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Chunked Markdown of the last extraction from each page, so further chunks
+        # are served without walking the page again
+        self.extracted_content: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        
+        # OCR runs in worker processes; results are cached by screenshot perceptual hash
+        self.ocr_pool: Optional[ProcessPoolExecutor] = None
+        self.ocr_cache: OrderedDict[str, str] = OrderedDict()
+        
         # Register routes
         self.router.on_startup.append(self.startup)
         self.router.on_shutdown.append(self.shutdown)
@@ -314,6 +880,10 @@ class BrowserAutomation:
         # Content actions
         self.router.post("/automation/extract_content")(self.extract_content)
         self.router.post("/automation/save_pdf")(self.save_pdf)
+        self.router.post("/automation/extract_screen_text")(self.extract_screen_text)
+        
+        # Stored screenshots
+        self.router.get("/screenshots/{filename}")(self.get_screenshot)
         
         # Scroll actions
         self.router.post("/automation/scroll_down")(self.scroll_down)
@@ -351,21 +921,11 @@ class BrowserAutomation:
                 self.browser = await playwright.chromium.launch(**launch_options)
                 print("Browser launched with minimal options")
 
-            try:
-                await self.get_current_page()
-                print("Found existing page, using it")
-                self.current_page_index = 0
-            except Exception as page_error:
-                print(f"Error finding existing page, creating new one. ( {page_error})")
-                page = await self.browser.new_page()
-                print("New page created successfully")
-                self.pages.append(page)
-                self.current_page_index = 0
-                # Navigate to about:blank to ensure page is ready
-                # await page.goto("google.com", timeout=30000)
-                print("Navigated to google.com")
-                
-                print("Browser initialization completed successfully")
+            self.sessions[DEFAULT_BROWSER_SESSION] = await self.new_session()
+            print("Default browser session created successfully")
+            await self.fill_warm_sessions()
+            
+            print("Browser initialization completed successfully")
         except Exception as e:
             print(f"Browser startup error: {str(e)}")
             traceback.print_exc()
@@ -373,8 +933,140 @@ class BrowserAutomation:
             
     async def shutdown(self):
         """Clean up browser instance on shutdown"""
+        for session in list(self.sessions.values()) + self.warm_sessions:
+            try:
+                await session.context.close()
+            except Exception:
+                pass
+        self.sessions.clear()
+        self.warm_sessions.clear()
         if self.browser:
             await self.browser.close()
+        if self.ocr_pool:
+            self.ocr_pool.shutdown(wait=False, cancel_futures=True)
+            self.ocr_pool = None
+    
+    async def apply_routing_profile(self, context: BrowserContext):
+        """Install the request interception profile on a browser context"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        
+        async def handle_route(route):
+            request = route.request
+            try:
+                if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_REGEX.search(request.url):
+                    await route.abort("blockedbyclient")
+                    return
+                
+                # Documents, XHR and the like go straight through; static assets are
+                # fetched here so they can be cached and their concurrency capped
+                if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+                    await route.continue_()
+                    return
+                
+                cached = self.http_cache.get(request.url)
+                if cached is not None:
+                    await route.fulfill(status=cached["status"], headers=cached["headers"], body=cached["body"])
+                    return
+                
+                async with semaphore:
+                    response = await route.fetch()
+                    body = await response.body()
+                headers = {name: value for name, value in response.headers.items()
+                           if name.lower() not in STRIPPED_RESPONSE_HEADERS}
+                self.http_cache.put(request.url, response.status, headers, body)
+                await route.fulfill(status=response.status, headers=headers, body=body)
+            except Exception as e:
+                # The page may have navigated away or closed while the request was pending
+                try:
+                    await route.continue_()
+                except Exception:
+                    print(f"Error routing request {request.url[:200]}: {e}")
+        
+        await context.route("**/*", handle_route)
+    
+    async def wait_until_ready(self, page: Page, timeout_ms: int = 10000):
+        """Wait for the page to be usable after an action that may load a new document
+        
+        With the "interactive" strategy this waits for DOMContentLoaded; the
+        mutation-quiet window follows in get_updated_browser_state. Timeouts are
+        not errors, the state is captured either way.
+        """
+        state = "networkidle" if WAIT_STRATEGY == "networkidle" else "domcontentloaded"
+        try:
+            await page.wait_for_load_state(state, timeout=timeout_ms)
+        except Exception as e:
+            print(f"Timeout or error waiting for {state}: {e}")
+    
+    async def new_session(self) -> BrowserSession:
+        """Create a browser context with one blank page"""
+        context = await self.browser.new_context()
+        if ROUTING_PROFILE_ENABLED:
+            await self.apply_routing_profile(context)
+        page = await context.new_page()
+        return BrowserSession(context=context, pages=[page])
+    
+    async def fill_warm_sessions(self):
+        """Pre-create contexts until WARM_BROWSER_SESSIONS are waiting to be used"""
+        if self.filling_warm_sessions:
+            return
+        self.filling_warm_sessions = True
+        try:
+            while len(self.warm_sessions) < WARM_BROWSER_SESSIONS:
+                self.warm_sessions.append(await self.new_session())
+        except Exception as e:
+            print(f"Error pre-creating browser session: {e}")
+        finally:
+            self.filling_warm_sessions = False
+    
+    async def get_session(self, session_id: str) -> BrowserSession:
+        """Get the browser session for an ID, starting it from a warm context if needed"""
+        async with self.sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.warm_sessions.pop() if self.warm_sessions else await self.new_session()
+                self.sessions[session_id] = session
+                print(f"Started browser session {session_id} ({len(self.sessions)} active)")
+                task = asyncio.create_task(self.fill_warm_sessions())
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
+            session.last_used = time.monotonic()
+            await self.evict_sessions()
+            return session
+    
+    async def evict_sessions(self):
+        """Close the least recently used idle sessions while over MAX_BROWSER_SESSIONS"""
+        while len(self.sessions) > MAX_BROWSER_SESSIONS:
+            idle = [sid for sid, session in self.sessions.items()
+                    if sid != DEFAULT_BROWSER_SESSION and not session.lock.locked()]
+            if not idle:
+                break
+            session_id = min(idle, key=lambda sid: self.sessions[sid].last_used)
+            session = self.sessions.pop(session_id)
+            print(f"Closing least recently used browser session {session_id}")
+            try:
+                await session.context.close()
+            except Exception as e:
+                print(f"Error closing browser session {session_id}: {e}")
+    
+    def current_session(self) -> BrowserSession:
+        """Get the browser session of the request being handled"""
+        session = self.sessions.get(browser_session_id.get())
+        if session is None:
+            raise HTTPException(status_code=500, detail="No browser session available")
+        return session
+    
+    @property
+    def pages(self) -> List[Page]:
+        """Tabs of the current session"""
+        return self.current_session().pages
+    
+    @property
+    def current_page_index(self) -> int:
+        return self.current_session().current_page_index
+    
+    @current_page_index.setter
+    def current_page_index(self, index: int):
+        self.current_session().current_page_index = index
     
     async def get_current_page(self) -> Page:
         """Get the current active page"""
@@ -382,155 +1074,102 @@ class BrowserAutomation:
             raise HTTPException(status_code=500, detail="No browser pages available")
         return self.pages[self.current_page_index]
     
-    async def get_selector_map(self) -> Dict[int, DOMElementNode]:
-        """Get a map of selectable elements on the page"""
+    async def get_page_snapshot(self) -> Dict[str, Any]:
+        """Capture interactive elements, scroll info, viewport, title and URL in a single evaluate"""
         page = await self.get_current_page()
-        
-        # Create a selector map for interactive elements
+        return await page.evaluate(PAGE_SNAPSHOT_JS)
+    
+    def build_selector_map(self, elements: List[Dict[str, Any]]) -> Dict[int, DOMElementNode]:
+        """Build element nodes, keyed by highlight index, from the elements of a page snapshot"""
         selector_map = {}
         
-        try:
-            # More comprehensive JavaScript to find interactive elements
-            elements_js = """
-            (() => {
-                // Helper function to get all attributes as an object
-                function getAttributes(el) {
-                    const attributes = {};
-                    for (const attr of el.attributes) {
-                        attributes[attr.name] = attr.value;
-                    }
-                    return attributes;
-                }
-                
-                // Find all potentially interactive elements
-                const interactiveElements = Array.from(document.querySelectorAll(
-                    'a, button, input, select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'
-                ));
-                
-                // Filter for visible elements
-                const visibleElements = interactiveElements.filter(el => {
-                    const style = window.getComputedStyle(el);
-                    const rect = el.getBoundingClientRect();
-                    return style.display !== 'none' && 
-                           style.visibility !== 'hidden' && 
-                           style.opacity !== '0' &&
-                           rect.width > 0 && 
-                           rect.height > 0;
-                });
-                
-                // Map to our expected structure
-                return visibleElements.map((el, index) => {
-                    const rect = el.getBoundingClientRect();
-                    const isInViewport = rect.top >= 0 && 
-                                      rect.left >= 0 && 
-                                      rect.bottom <= window.innerHeight &&
-                                      rect.right <= window.innerWidth;
-                    
-                    return {
-                        index: index + 1,
-                        tagName: el.tagName.toLowerCase(),
-                        text: el.innerText || el.value || '',
-                        attributes: getAttributes(el),
-                        isVisible: true,
-                        isInteractive: true,
-                        pageCoordinates: {
-                            x: rect.left + window.scrollX,
-                            y: rect.top + window.scrollY,
-                            width: rect.width,
-                            height: rect.height
-                        },
-                        viewportCoordinates: {
-                            x: rect.left,
-                            y: rect.top,
-                            width: rect.width,
-                            height: rect.height
-                        },
-                        isInViewport: isInViewport
-                    };
-                });
-            })();
-            """
-            
-            elements = await page.evaluate(elements_js)
-            print(f"Found {len(elements)} interactive elements in selector map")
-            
-            # Create a root element for the tree
-            root = DOMElementNode(
-                is_visible=True,
-                tag_name="body",
-                is_interactive=False,
-                is_top_element=True
-            )
+        for idx, el in enumerate(elements):
+            # Create coordinate sets
+            page_coordinates = None
+            viewport_coordinates = None
+            
+            if 'pageCoordinates' in el:
+                coords = el['pageCoordinates']
+                page_coordinates = CoordinateSet(
+                    x=coords.get('x', 0),
+                    y=coords.get('y', 0),
+                    width=coords.get('width', 0),
+                    height=coords.get('height', 0)
+                )
             
-            # Create element nodes for each element
-            for idx, el in enumerate(elements):
-                # Create coordinate sets
-                page_coordinates = None
-                viewport_coordinates = None
-                
-                if 'pageCoordinates' in el:
-                    coords = el['pageCoordinates']
-                    page_coordinates = CoordinateSet(
-                        x=coords.get('x', 0),
-                        y=coords.get('y', 0),
-                        width=coords.get('width', 0),
-                        height=coords.get('height', 0)
-                    )
-                
-                if 'viewportCoordinates' in el:
-                    coords = el['viewportCoordinates']
-                    viewport_coordinates = CoordinateSet(
-                        x=coords.get('x', 0),
-                        y=coords.get('y', 0),
-                        width=coords.get('width', 0),
-                        height=coords.get('height', 0)
-                    )
-                
-                # Create the element node
-                element_node = DOMElementNode(
-                    is_visible=el.get('isVisible', True),
-                    tag_name=el.get('tagName', 'div'),
-                    attributes=el.get('attributes', {}),
-                    is_interactive=el.get('isInteractive', True),
-                    is_in_viewport=el.get('isInViewport', False),
-                    highlight_index=el.get('index', idx + 1),
-                    page_coordinates=page_coordinates,
-                    viewport_coordinates=viewport_coordinates
+            if 'viewportCoordinates' in el:
+                coords = el['viewportCoordinates']
+                viewport_coordinates = CoordinateSet(
+                    x=coords.get('x', 0),
+                    y=coords.get('y', 0),
+                    width=coords.get('width', 0),
+                    height=coords.get('height', 0)
                 )
-                
-                # Add a text node if there's text content
-                if el.get('text'):
-                    text_node = DOMTextNode(is_visible=True, text=el.get('text', ''))
-                    text_node.parent = element_node
-                    element_node.children.append(text_node)
-                
-                selector_map[el.get('index', idx + 1)] = element_node
-                root.children.append(element_node)
-                element_node.parent = root
-                
+            
+            # Create the element node
+            element_node = DOMElementNode(
+                is_visible=el.get('isVisible', True),
+                tag_name=el.get('tagName', 'div'),
+                attributes=el.get('attributes', {}),
+                is_interactive=el.get('isInteractive', True),
+                is_in_viewport=el.get('isInViewport', False),
+                highlight_index=el.get('index', idx + 1),
+                page_coordinates=page_coordinates,
+                viewport_coordinates=viewport_coordinates
+            )
+            
+            # Add a text node if there's text content
+            if el.get('text'):
+                text_node = DOMTextNode(is_visible=True, text=el.get('text', ''))
+                text_node.parent = element_node
+                element_node.children.append(text_node)
+            
+            selector_map[el.get('index', idx + 1)] = element_node
+        
+        return selector_map
+    
+    def dummy_selector_map(self) -> Dict[int, DOMElementNode]:
+        """Selector map with a single placeholder element, used when the page can't be inspected"""
+        dummy = DOMElementNode(
+            is_visible=True,
+            tag_name="a",
+            attributes={'href': '#'},
+            is_interactive=True,
+            highlight_index=1
+        )
+        dummy_text = DOMTextNode(is_visible=True, text="Dummy Element")
+        dummy_text.parent = dummy
+        dummy.children.append(dummy_text)
+        return {1: dummy}
+    
+    async def get_selector_map(self) -> Dict[int, DOMElementNode]:
+        """Get a map of selectable elements on the page"""
+        try:
+            snapshot = await self.get_page_snapshot()
+            selector_map = self.build_selector_map(snapshot.get('elements', []))
+            print(f"Found {len(selector_map)} interactive elements in selector map")
+            return selector_map
         except Exception as e:
             print(f"Error getting selector map: {e}")
             traceback.print_exc()
             # Create a dummy element to avoid breaking tests
-            dummy = DOMElementNode(
-                is_visible=True,
-                tag_name="a",
-                attributes={'href': '#'},
-                is_interactive=True,
-                highlight_index=1
-            )
-            dummy_text = DOMTextNode(is_visible=True, text="Dummy Element")
-            dummy_text.parent = dummy
-            dummy.children.append(dummy_text)
-            selector_map[1] = dummy
-        
-        return selector_map
+            return self.dummy_selector_map()
     
     async def get_current_dom_state(self) -> DOMState:
-        """Get the current DOM state including element tree and selector map"""
+        """Get the current DOM state including element tree and selector map
+        
+        Everything comes from one page snapshot, i.e. a single round trip to the browser.
+        """
         try:
             page = await self.get_current_page()
-            selector_map = await self.get_selector_map()
+            try:
+                snapshot = await self.get_page_snapshot()
+                selector_map = self.build_selector_map(snapshot.get('elements', []))
+            except Exception as e:
+                print(f"Error getting page snapshot: {e}")
+                traceback.print_exc()
+                snapshot = {}
+                selector_map = self.dummy_selector_map()
             
             # Create a root element
             root = DOMElementNode(
@@ -542,52 +1181,25 @@ class BrowserAutomation:
             
             # Add all elements from selector map as children of root
             for element in selector_map.values():
-                if element.parent is None:
-                    element.parent = root
-                    root.children.append(element)
-            
-            # Get basic page info
-            url = page.url
-            try:
-                title = await page.title()
-            except:
-                title = "Unknown Title"
+                element.parent = root
+                root.children.append(element)
             
-            # Get more accurate scroll information - fix JavaScript syntax
-            try:
-                scroll_info = await page.evaluate("""
-                () => {
-                    const body = document.body;
-                    const html = document.documentElement;
-                    const totalHeight = Math.max(
-                        body.scrollHeight, body.offsetHeight,
-                        html.clientHeight, html.scrollHeight, html.offsetHeight
-                    );
-                    const scrollY = window.scrollY || window.pageYOffset;
-                    const windowHeight = window.innerHeight;
-                    
-                    return {
-                        pixelsAbove: scrollY,
-                        pixelsBelow: Math.max(0, totalHeight - scrollY - windowHeight),
-                        totalHeight: totalHeight,
-                        viewportHeight: windowHeight
-                    };
-                }
-                """)
-                pixels_above = scroll_info.get('pixelsAbove', 0)
-                pixels_below = scroll_info.get('pixelsBelow', 0)
-            except Exception as e:
-                print(f"Error getting scroll info: {e}")
-                pixels_above = 0
-                pixels_below = 0
+            scroll_info = snapshot.get('scroll', {})
+            viewport = snapshot.get('viewport', {})
             
             return DOMState(
                 element_tree=root,
                 selector_map=selector_map,
-                url=url,
-                title=title,
-                pixels_above=pixels_above,
-                pixels_below=pixels_below
+                url=snapshot.get('url') or page.url,
+                title=snapshot.get('title', "Unknown Title"),
+                pixels_above=scroll_info.get('pixelsAbove', 0),
+                pixels_below=scroll_info.get('pixelsBelow', 0),
+                viewport=ViewportInfo(
+                    width=viewport.get('width', 0),
+                    height=viewport.get('height', 0),
+                    scroll_x=scroll_info.get('scrollX', 0),
+                    scroll_y=scroll_info.get('pixelsAbove', 0)
+                )
             )
         except Exception as e:
             print(f"Error getting DOM state: {e}")
@@ -609,17 +1221,109 @@ class BrowserAutomation:
                 pixels_below=0
             )
     
+    async def get_element_handle(self, page: Page, index: int) -> Optional[ElementHandle]:
+        """Resolve an element by the highlight index it was given in the latest snapshot
+        
+        Elements keep their index attribute until the next snapshot, so this is a
+        single attribute lookup instead of re-running the element search.
+        """
+        handle = await page.query_selector(element_selector(index))
+        if handle is None and await page.query_selector(f"[{AGENT_INDEX_ATTRIBUTE}]") is None:
+            # Nothing in this document has been indexed yet (e.g. the API restarted)
+            await self.get_page_snapshot()
+            handle = await page.query_selector(element_selector(index))
+        return handle
+    
+    async def wait_for_settle(self, page: Page, quiet_ms: int = SETTLE_QUIET_MS, timeout_ms: int = SETTLE_TIMEOUT_MS) -> None:
+        """Wait until the DOM and network have been quiet for quiet_ms (at most timeout_ms)"""
+        try:
+            await page.evaluate(SETTLE_JS, [quiet_ms, timeout_ms])
+        except Exception as e:
+            # The page navigated while we were watching it; wait for the new document instead
+            print(f"Settle detection interrupted ({e}), waiting for DOM content to load")
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+            except Exception:
+                pass
+    
     async def take_screenshot(self) -> str:
-        """Take a screenshot and return as base64 encoded string"""
+        """Take a screenshot and return as base64 encoded string
+        
+        The screenshot is encoded according to the request's screenshot tier.
+        When the page looks the same as in the previous frame, the previous
+        screenshot is returned unchanged so it keeps the same content hash.
+        """
         try:
             page = await self.get_current_page()
-            screenshot_bytes = await page.screenshot(type='jpeg', quality=60, full_page=False)
-            return base64.b64encode(screenshot_bytes).decode('utf-8')
+            tier_name = screenshot_tier.get()
+            if tier_name not in SCREENSHOT_TIERS:
+                tier_name = "standard"
+            tier = SCREENSHOT_TIERS[tier_name]
+            
+            # Playwright only encodes JPEG/PNG; other tiers are captured at high
+            # quality and re-encoded
+            needs_encoding = tier["format"] != "jpeg" or tier["max_width"] is not None
+            capture_quality = 90 if needs_encoding else tier["quality"]
+            screenshot_bytes = await page.screenshot(type='jpeg', quality=capture_quality, full_page=False)
+            
+            loop = asyncio.get_running_loop()
+            thumbnail = await loop.run_in_executor(None, frame_thumbnail, screenshot_bytes)
+            previous = self.last_frames.get(page)
+            if previous and previous["tier"] == tier_name and frames_match(previous["thumbnail"], thumbnail):
+                return previous["screenshot"]
+            
+            if needs_encoding:
+                screenshot_bytes = await loop.run_in_executor(None, encode_screenshot, screenshot_bytes, tier)
+            screenshot = base64.b64encode(screenshot_bytes).decode('utf-8')
+            self.last_frames[page] = {"tier": tier_name, "thumbnail": thumbnail, "screenshot": screenshot}
+            return screenshot
         except Exception as e:
             print(f"Error taking screenshot: {e}")
             # Return an empty string rather than failing
             return ""
     
+    def store_screenshot(self, screenshot_base64: str) -> tuple:
+        """Store a screenshot under its content hash
+        Returns a tuple of (hash, format), or (None, None) if nothing was stored
+        
+        Identical screenshots are written once. Only the most recent
+        MAX_STORED_SCREENSHOTS are kept on disk.
+        """
+        if not screenshot_base64:
+            return None, None
+        try:
+            screenshot_bytes = base64.b64decode(screenshot_base64)
+            screenshot_format = "webp" if screenshot_bytes[8:12] == b"WEBP" else "jpeg"
+            screenshot_hash = hashlib.sha256(screenshot_bytes).hexdigest()
+            if screenshot_hash in self.stored_screenshots:
+                self.stored_screenshots.move_to_end(screenshot_hash)
+                return screenshot_hash, screenshot_format
+            
+            extension = "webp" if screenshot_format == "webp" else "jpg"
+            filepath = os.path.join(self.screenshot_dir, f"{screenshot_hash}.{extension}")
+            with open(filepath, "wb") as f:
+                f.write(screenshot_bytes)
+            self.stored_screenshots[screenshot_hash] = filepath
+            
+            while len(self.stored_screenshots) > MAX_STORED_SCREENSHOTS:
+                _, old_path = self.stored_screenshots.popitem(last=False)
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+            return screenshot_hash, screenshot_format
+        except Exception as e:
+            print(f"Error storing screenshot: {e}")
+            return None, None
+    
+    async def get_screenshot(self, filename: str):
+        """Serve a stored screenshot by its content-addressed filename"""
+        filepath = os.path.join(self.screenshot_dir, filename)
+        if not SCREENSHOT_FILENAME_PATTERN.match(filename) or not os.path.isfile(filepath):
+            raise HTTPException(status_code=404, detail="Screenshot not found")
+        # Content-addressed, so the file behind a name never changes
+        return FileResponse(filepath, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+    
     async def save_screenshot_to_file(self) -> str:
         """Take a screenshot and save to file, returning the path"""
         try:
@@ -636,20 +1340,32 @@ class BrowserAutomation:
             return ""
     
     async def extract_ocr_text_from_screenshot(self, screenshot_base64: str) -> str:
-        """Extract text from screenshot using OCR"""
+        """Extract text from screenshot using OCR
+        
+        Tesseract runs in a process pool so it never blocks the event loop, and
+        results are cached by ocr_cache_key so an unchanged viewport is only
+        processed once.
+        """
         if not screenshot_base64:
             return ""
             
         try:
-            # Decode base64 to image
+            loop = asyncio.get_running_loop()
             image_bytes = base64.b64decode(screenshot_base64)
-            image = Image.open(io.BytesIO(image_bytes))
+            cache_key = await loop.run_in_executor(None, ocr_cache_key, image_bytes)
             
-            # Extract text using pytesseract
-            ocr_text = pytesseract.image_to_string(image)
+            cached = self.ocr_cache.get(cache_key)
+            if cached is not None:
+                self.ocr_cache.move_to_end(cache_key)
+                return cached
             
-            # Clean up the text
-            ocr_text = ocr_text.strip()
+            if self.ocr_pool is None:
+                self.ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+            ocr_text = await loop.run_in_executor(self.ocr_pool, run_ocr, image_bytes)
+            
+            self.ocr_cache[cache_key] = ocr_text
+            while len(self.ocr_cache) > OCR_CACHE_SIZE:
+                self.ocr_cache.popitem(last=False)
             
             return ocr_text
         except Exception as e:
@@ -657,69 +1373,68 @@ class BrowserAutomation:
             traceback.print_exc()
             return ""
     
-    async def get_updated_browser_state(self, action_name: str) -> tuple:
+    async def get_updated_browser_state(self, action_name: str, include_ocr: Optional[bool] = None) -> tuple:
         """Helper method to get updated browser state after any action
         Returns a tuple of (dom_state, screenshot, elements, metadata)
+        
+        OCR text is only included when include_ocr is set, or when
+        BROWSER_OCR_ON_ACTIONS is enabled and include_ocr is not given.
         """
+        if include_ocr is None:
+            include_ocr = OCR_ON_ACTIONS
         try:
-            # Wait a moment for any potential async processes to settle
-            await asyncio.sleep(0.5)
+            # Wait for DOM mutations and network activity to quiet down
+            page = await self.get_current_page()
+            await self.wait_for_settle(page)
             
-            # Get updated state
-            dom_state = await self.get_current_dom_state()
-            screenshot = await self.take_screenshot()
+            # Capture the DOM snapshot and the screenshot in parallel
+            dom_state, screenshot = await asyncio.gather(
+                self.get_current_dom_state(),
+                self.take_screenshot()
+            )
             
-            # Format elements for output
-            elements = dom_state.element_tree.clickable_elements_to_string(
+            # Format elements for output, nearest to the viewport first, within the budget
+            viewport_height = dom_state.viewport.height if dom_state.viewport else 0
+            elements, elements_omitted = serialize_elements(
+                dom_state.selector_map,
+                viewport_height,
                 include_attributes=self.include_attributes
             )
             
             # Collect additional metadata
-            page = await self.get_current_page()
             metadata = {}
             
             # Get element count
             metadata['element_count'] = len(dom_state.selector_map)
-            
-            # Create simplified interactive elements list
-            interactive_elements = []
-            for idx, element in dom_state.selector_map.items():
-                element_info = {
-                    'index': idx,
-                    'tag_name': element.tag_name,
-                    'text': element.get_all_text_till_next_clickable_element(),
-                    'is_in_viewport': element.is_in_viewport
-                }
-                
-                # Add key attributes
-                for attr_name in ['id', 'href', 'src', 'alt', 'placeholder', 'name', 'role', 'title', 'type']:
-                    if attr_name in element.attributes:
-                        element_info[attr_name] = element.attributes[attr_name]
+            metadata['elements_omitted'] = elements_omitted
+            
+            # Create simplified interactive elements list (same elements as above)
+            if INCLUDE_ELEMENT_LIST:
+                interactive_elements = []
+                for idx, element in dom_state.selector_map.items():
+                    element_info = {
+                        'index': idx,
+                        'tag_name': element.tag_name,
+                        'text': truncate_text(element.get_all_text_till_next_clickable_element(), MAX_ELEMENT_TEXT_CHARS),
+                        'is_in_viewport': element.is_in_viewport
+                    }
+                    
+                    # Add key attributes
+                    for attr_name in ['id', 'href', 'src', 'alt', 'placeholder', 'name', 'role', 'title', 'type']:
+                        if attr_name in element.attributes:
+                            element_info[attr_name] = element.attributes[attr_name]
+                    
+                    interactive_elements.append(element_info)
                 
-                interactive_elements.append(element_info)
+                metadata['interactive_elements'] = interactive_elements
             
-            metadata['interactive_elements'] = interactive_elements
-            
-            # Get viewport dimensions - Fix syntax error in JavaScript
-            try:
-                viewport = await page.evaluate("""
-                () => {
-                    return {
-                        width: window.innerWidth,
-                        height: window.innerHeight
-                    };
-                }
-                """)
-                metadata['viewport_width'] = viewport.get('width', 0)
-                metadata['viewport_height'] = viewport.get('height', 0)
-            except Exception as e:
-                print(f"Error getting viewport dimensions: {e}")
-                metadata['viewport_width'] = 0
-                metadata['viewport_height'] = 0
+            # Viewport dimensions come with the DOM snapshot
+            metadata['viewport_width'] = dom_state.viewport.width if dom_state.viewport else 0
+            metadata['viewport_height'] = dom_state.viewport.height if dom_state.viewport else 0
             
-            # Extract OCR text from screenshot if available
+            # Extract OCR text from screenshot if requested
             ocr_text = ""
-            if screenshot:
+            if include_ocr and screenshot:
                 ocr_text = await self.extract_ocr_text_from_screenshot(screenshot)
                 metadata['ocr_text'] = ocr_text
             
@@ -738,6 +1453,8 @@ class BrowserAutomation:
         # Ensure elements is never None to avoid display issues
         if elements is None:
             elements = ""
+        
+        screenshot_hash, screenshot_format = self.store_screenshot(screenshot)
             
         return BrowserActionResult(
             success=success,
@@ -747,12 +1464,15 @@ class BrowserAutomation:
             title=dom_state.title if dom_state else "",
             elements=elements,
             screenshot_base64=screenshot,
+            screenshot_hash=screenshot_hash,
+            screenshot_format=screenshot_format,
             pixels_above=dom_state.pixels_above if dom_state else 0,
             pixels_below=dom_state.pixels_below if dom_state else 0,
             content=content,
             ocr_text=metadata.get('ocr_text', ""),
             element_count=metadata.get('element_count', 0),
-            interactive_elements=metadata.get('interactive_elements', []),
+            elements_omitted=metadata.get('elements_omitted', 0),
+            interactive_elements=metadata.get('interactive_elements'),
             viewport_width=metadata.get('viewport_width', 0),
             viewport_height=metadata.get('viewport_height', 0)
         )
@@ -764,7 +1484,7 @@ class BrowserAutomation:
         try:
             page = await self.get_current_page()
             await page.goto(action.url, wait_until="domcontentloaded")
-            await page.wait_for_load_state("networkidle", timeout=10000)
+            await self.wait_until_ready(page, timeout_ms=10000)
             
             # Get updated state after action
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"navigate_to({action.url})")
@@ -932,7 +1652,7 @@ class BrowserAutomation:
             await page.mouse.click(action.x, action.y)
             
             # Give time for any navigation or DOM updates to occur
-            await page.wait_for_load_state("networkidle", timeout=5000)
+            await self.wait_until_ready(page, timeout_ms=5000)
             
             # Get updated state after action
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"click_coordinates({action.x}, {action.y})")
@@ -981,11 +1701,10 @@ class BrowserAutomation:
         try:
             page = await self.get_current_page()
             
-            # Get the current state and selector map *before* the click
-            initial_dom_state = await self.get_current_dom_state()
-            selector_map = initial_dom_state.selector_map
+            # Resolve the element tagged with this index by the latest snapshot
+            target_element_handle = await self.get_element_handle(page, action.index)
             
-            if action.index not in selector_map:
+            if target_element_handle is None:
                 # Get updated state even if element not found initially
                 dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"click_element_error (index {action.index} not found)")
                 return self.build_action_result(
@@ -998,61 +1717,24 @@ class BrowserAutomation:
                     error=f"Element with index {action.index} not found"
                 )
 
-            element_to_click = selector_map[action.index]
-            print(f"Attempting to click element: {element_to_click}")
-
-            # Construct a more reliable selector using JavaScript evaluation
-            # Find the element based on its properties captured in selector_map
-            js_selector_script = """
-            (targetElementInfo) => {
-                const interactiveElements = Array.from(document.querySelectorAll(
-                    'a, button, input, select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'
-                ));
-                
-                const visibleElements = interactiveElements.filter(el => {
-                    const style = window.getComputedStyle(el);
-                    const rect = el.getBoundingClientRect();
-                    return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0' && rect.width > 0 && rect.height > 0;
-                });
-
-                if (targetElementInfo.index > 0 && targetElementInfo.index <= visibleElements.length) {
-                    // Return the element at the specified index (1-based)
-                    return visibleElements[targetElementInfo.index - 1];
-                }
-                return null; // Element not found at the expected index
-            }
-            """
-            
-            element_info = {'index': action.index} # Pass the target index to the script
-            
-            target_element_handle = await page.evaluate_handle(js_selector_script, element_info)
-
             click_success = False
             error_message = ""
 
-            if await target_element_handle.evaluate("node => node !== null"):
-                try:
-                    # Use Playwright's recommended way: click the handle
-                    # Add timeout and wait for element to be stable
-                    await target_element_handle.click(timeout=5000) 
-                    click_success = True
-                    print(f"Successfully clicked element handle for index {action.index}")
-                except Exception as click_error:
-                    error_message = f"Error clicking element handle: {click_error}"
-                    print(error_message)
-                    # Optional: Add fallback methods here if needed
-                    # e.g., target_element_handle.dispatch_event('click')
-            else:
-                 error_message = f"Could not locate the target element handle for index {action.index} using JS script."
-                 print(error_message)
+            try:
+                # Use Playwright's recommended way: click the handle
+                # Add timeout and wait for element to be stable
+                await target_element_handle.click(timeout=5000) 
+                click_success = True
+                print(f"Successfully clicked element handle for index {action.index}")
+            except Exception as click_error:
+                error_message = f"Error clicking element handle: {click_error}"
+                print(error_message)
+                # Optional: Add fallback methods here if needed
+                # e.g., target_element_handle.dispatch_event('click')
 
 
             # Wait for potential page changes/network activity
-            try:
-                await page.wait_for_load_state("networkidle", timeout=5000)
-            except Exception as wait_error:
-                print(f"Timeout or error waiting for network idle after click: {wait_error}")
-                await asyncio.sleep(1) # Fallback wait
+            await self.wait_until_ready(page, timeout_ms=5000)
 
             # Get updated state after action
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"click_element({action.index})")
@@ -1107,9 +1789,9 @@ class BrowserAutomation:
         """Input text into an element"""
         try:
             page = await self.get_current_page()
-            selector_map = await self.get_selector_map()
+            element = await self.get_element_handle(page, action.index)
             
-            if action.index not in selector_map:
+            if element is None:
                 return self.build_action_result(
                     False,
                     f"Element with index {action.index} not found",
@@ -1120,22 +1802,7 @@ class BrowserAutomation:
                     error=f"Element with index {action.index} not found"
                 )
             
-            # In a real implementation, we would use the selector map to get the element's
-            # properties and use them to find and type into the element
-            element = selector_map[action.index]
-            
-            # Use CSS selector or XPath to locate and type into the element
-            await page.wait_for_timeout(500)  # Small delay before typing
-            
-            # Demo implementation - would use proper selectors in production
-            if element.attributes.get("id"):
-                await page.fill(f"#{element.attributes['id']}", action.text)
-            elif element.attributes.get("class"):
-                class_selector = f".{element.attributes['class'].replace(' ', '.')}"
-                await page.fill(class_selector, action.text)
-            else:
-                # Fallback to xpath
-                await page.fill(f"//{element.tag_name}[{action.index}]", action.text)
+            await element.fill(action.text)
             
             # Get updated state after action
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"input_text({action.index}, '{action.text}')")
@@ -1242,13 +1909,13 @@ class BrowserAutomation:
         """Open a new tab with the specified URL"""
         try:
             print(f"Attempting to open new tab with URL: {action.url}")
-            # Create new page in same browser instance
-            new_page = await self.browser.new_page()
+            # Create new page in the session's browser context
+            new_page = await self.current_session().context.new_page()
             print(f"New page created successfully")
             
             # Navigate to the URL
             await new_page.goto(action.url, wait_until="domcontentloaded")
-            await new_page.wait_for_load_state("networkidle", timeout=10000)
+            await self.wait_until_ready(new_page, timeout_ms=10000)
             print(f"Navigated to URL in new tab: {action.url}")
             
             # Add to page list and make it current
@@ -1338,40 +2005,70 @@ class BrowserAutomation:
     
     # Content Actions
     
-    async def extract_content(self, goal: str = Body(...)):
-        """Extract content from the current page based on the provided goal"""
+    async def extract_content(self, action: ExtractContentAction = Body(...)):
+        """Extract the main content of the current page as Markdown, one chunk at a time
+        
+        Chunk 0 walks the page again; later chunks come from the last extraction
+        of the same URL. No screenshot or DOM state is captured.
+        """
+        try:
+            page = await self.get_current_page()
+            extraction = self.extracted_content.get(page)
+            if action.chunk == 0 or extraction is None or extraction["url"] != page.url:
+                await self.wait_for_settle(page)
+                raw = await page.evaluate(EXTRACT_CONTENT_JS)
+                extraction = {
+                    "url": page.url,
+                    "title": raw.get("title", ""),
+                    "chunks": chunk_blocks(raw.get("blocks", []), CONTENT_CHUNK_CHARS),
+                }
+                self.extracted_content[page] = extraction
+            
+            chunks = extraction["chunks"]
+            if not 0 <= action.chunk < len(chunks):
+                message = f"Chunk {action.chunk} is out of range, the page has {len(chunks)} chunk(s)"
+                return BrowserActionResult(success=False, message=message, error=message,
+                                           url=extraction["url"], title=extraction["title"],
+                                           chunk_count=len(chunks))
+            
+            message = f"Extracted chunk {action.chunk + 1} of {len(chunks)}"
+            if action.goal:
+                message += f" for goal: {action.goal}"
+            return BrowserActionResult(
+                success=True,
+                message=message,
+                url=extraction["url"],
+                title=extraction["title"],
+                content=chunks[action.chunk],
+                chunk_index=action.chunk,
+                chunk_count=len(chunks)
+            )
+        except Exception as e:
+            return BrowserActionResult(success=False, message=str(e), error=str(e))
+    
+    async def save_pdf(self):
+        """Save the current page as a PDF"""
         try:
             page = await self.get_current_page()
-            content = await page.content()
-            
-            # In a full implementation, we would use an LLM to extract specific content
-            # based on the goal. For this example, we'll extract visible text.
-            extracted_text = await page.evaluate("""
-            Array.from(document.querySelectorAll('p, h1, h2, h3, h4, h5, h6, li, span, div'))
-                .filter(el => {
-                    const style = window.getComputedStyle(el);
-                    return style.display !== 'none' && 
-                           style.visibility !== 'hidden' && 
-                           style.opacity !== '0' &&
-                           el.innerText && 
-                           el.innerText.trim().length > 0;
-                })
-                .map(el => el.innerText.trim())
-                .join('\\n\\n');
-            """)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            random_id = random.randint(1000, 9999)
+            filename = f"page_{timestamp}_{random_id}.pdf"
+            filepath = os.path.join(self.screenshot_dir, filename)
+            
+            await page.pdf(path=filepath)
             
             # Get updated state
-            dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"extract_content({goal})")
+            dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("save_pdf")
             
             return self.build_action_result(
                 True,
-                f"Content extracted based on goal: {goal}",
+                f"Saved page as PDF: {filepath}",
                 dom_state,
                 screenshot,
                 elements,
                 metadata,
                 error="",
-                content=extracted_text
+                content=None
             )
         except Exception as e:
             return self.build_action_result(
@@ -1385,23 +2082,14 @@ class BrowserAutomation:
                 content=None
             )
     
-    async def save_pdf(self):
-        """Save the current page as a PDF"""
+    async def extract_screen_text(self, _: NoParamsAction = Body(...)):
+        """Extract the visible text of the current viewport using OCR"""
         try:
-            page = await self.get_current_page()
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            random_id = random.randint(1000, 9999)
-            filename = f"page_{timestamp}_{random_id}.pdf"
-            filepath = os.path.join(self.screenshot_dir, filename)
-            
-            await page.pdf(path=filepath)
-            
-            # Get updated state
-            dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("save_pdf")
+            dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("extract_screen_text", include_ocr=True)
             
             return self.build_action_result(
                 True,
-                f"Saved page as PDF: {filepath}",
+                "Extracted text from the current screenshot" if metadata.get('ocr_text') else "No text found in the current screenshot",
                 dom_state,
                 screenshot,
                 elements,
@@ -1553,9 +2241,9 @@ class BrowserAutomation:
         """Get all options from a dropdown"""
         try:
             page = await self.get_current_page()
-            selector_map = await self.get_selector_map()
+            element = await self.get_element_handle(page, index)
             
-            if index not in selector_map:
+            if element is None:
                 return self.build_action_result(
                     False,
                     f"Element with index {index} not found",
@@ -1566,26 +2254,22 @@ class BrowserAutomation:
                     error=f"Element with index {index} not found"
                 )
             
-            element = selector_map[index]
             options = []
             
-            # Try to get the options - in a real implementation, we would use appropriate selectors
             try:
-                if element.tag_name.lower() == 'select':
-                    # For <select> elements, get options using JavaScript
-                    options_js = f"""
-                    Array.from(document.querySelectorAll('select')[{index-1}].options)
-                        .map((option, index) => ({
-                            index: index,
-                            text: option.text,
-                            value: option.value
-                        }));
-                    """
-                    options = await page.evaluate(options_js)
+                tag_name = await element.evaluate("el => el.tagName.toLowerCase()")
+                if tag_name == 'select':
+                    # For <select> elements, read the options of the element itself
+                    options = await element.evaluate("""
+                    el => Array.from(el.options).map((option, index) => ({
+                        index: index,
+                        text: option.text,
+                        value: option.value
+                    }))
+                    """)
                 else:
-                    # For other dropdown types, try to get options using a more generic approach
-                    # Example for custom dropdowns - would need refinement in real implementation
-                    await page.click(f"#{element.attributes.get('id')}") if element.attributes.get('id') else None
+                    # For other dropdown types, open the dropdown and collect visible options
+                    await element.click()
                     await page.wait_for_timeout(500)
                     
                     options_js = """
@@ -1642,9 +2326,9 @@ class BrowserAutomation:
         """Select an option from a dropdown by text"""
         try:
             page = await self.get_current_page()
-            selector_map = await self.get_selector_map()
+            element = await self.get_element_handle(page, index)
             
-            if index not in selector_map:
+            if element is None:
                 return self.build_action_result(
                     False,
                     f"Element with index {index} not found",
@@ -1655,23 +2339,15 @@ class BrowserAutomation:
                     error=f"Element with index {index} not found"
                 )
             
-            element = selector_map[index]
-            
             # Try to select the option - implementation varies by dropdown type
-            if element.tag_name.lower() == 'select':
+            tag_name = await element.evaluate("el => el.tagName.toLowerCase()")
+            if tag_name == 'select':
                 # For standard <select> elements
-                selector = f"select option:has-text('{option_text}')"
-                await page.select_option(
-                    f"#{element.attributes.get('id')}" if element.attributes.get('id') else f"//select[{index}]", 
-                    label=option_text
-                )
+                await element.select_option(label=option_text)
             else:
                 # For custom dropdowns
                 # First click to open the dropdown
-                if element.attributes.get('id'):
-                    await page.click(f"#{element.attributes.get('id')}")
-                else:
-                    await page.click(f"//{element.tag_name}[{index}]")
+                await element.click()
                 
                 await page.wait_for_timeout(500)
                 
@@ -1797,6 +2473,29 @@ automation_service = BrowserAutomation()
 # Create API app
 api_app = FastAPI()
 
+@api_app.middleware("http")
+async def browser_session_middleware(request: Request, call_next):
+    """Run automation requests in the caller's browser session, one request per session at a time"""
+    if not request.url.path.startswith("/api/automation/"):
+        return await call_next(request)
+    session_id = request.headers.get("X-Browser-Session") or DEFAULT_BROWSER_SESSION
+    session = await automation_service.get_session(session_id)
+    token = browser_session_id.set(session_id)
+    try:
+        async with session.lock:
+            return await call_next(request)
+    finally:
+        browser_session_id.reset(token)
+
+@api_app.middleware("http")
+async def screenshot_tier_middleware(request: Request, call_next):
+    """Make the requested screenshot tier available to the action being handled"""
+    token = screenshot_tier.set(request.headers.get("X-Screenshot-Tier", DEFAULT_SCREENSHOT_TIER))
+    try:
+        return await call_next(request)
+    finally:
+        screenshot_tier.reset(token)
+
 @api_app.get("/api")
 async def health_check():
     return {"status": "ok", "message": "API server is running"}
@@ -1843,6 +2542,7 @@ async def test_browser_api():
         
         # Test OCR extraction from screenshot
         print("\n--- Testing OCR Text Extraction ---")
+        result = await automation_service.extract_screen_text(NoParamsAction())
         if result.ocr_text:
             print("OCR text extracted from screenshot:")
             print("=== OCR TEXT START ===")
@@ -1866,6 +2566,7 @@ async def test_browser_api():
             print(f"Page title: {result.title}")
             
             # Test OCR extraction from search results
+            result = await automation_service.extract_screen_text(NoParamsAction())
             if result.ocr_text:
                 print("\nOCR text from search results:")
                 print("=== OCR TEXT START ===")
@@ -1909,7 +2610,7 @@ async def test_browser_api():
 
         # Test extracting content
         print("\n--- Testing Content Extraction ---")
-        content_result = await automation_service.extract_content("test goal")
+        content_result = await automation_service.extract_content(ExtractContentAction(goal="test goal"))
         print(f"Content extraction status: {'✅ Success' if content_result.success else '❌ Failed'}")
         if content_result.content:
             content_preview = content_result.content[:100] + "..." if len(content_result.content) > 100 else content_result.content
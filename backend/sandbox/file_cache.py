@@ -0,0 +1,111 @@
+"""
+Per-sandbox cache of workspace file contents.
+
+Entries are keyed by path and validated against the file's (mod_time, size) as
+reported by the sandbox file API, so a cheap get_file_info or list_files call
+is enough to decide whether a previously downloaded or written file can be
+reused instead of downloading it again.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple, Any
+
+from utils.logger import logger
+
+# Limits for a single sandbox's cache
+MAX_CACHE_BYTES = 32 * 1024 * 1024  # 32MB of file contents per sandbox
+MAX_CACHED_FILE_BYTES = 4 * 1024 * 1024  # Files larger than 4MB are never cached
+
+# Maximum number of sandboxes that keep a cache in this process
+MAX_CACHED_SANDBOXES = 64
+
+CacheKey = Tuple[str, int]
+
+
+def file_cache_key(file_info: Any) -> CacheKey:
+    """Build the validation key for a file from a sandbox FileInfo object."""
+    return (str(file_info.mod_time), int(file_info.size))
+
+
+class WorkspaceFileCache:
+    """LRU cache of file contents for a single sandbox, bounded by total size."""
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[CacheKey, bytes]]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, key: CacheKey) -> Optional[bytes]:
+        """Return the cached content of path if it is still valid for key."""
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(path)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, path: str, key: CacheKey, content: bytes) -> None:
+        """Store the content of path, evicting least recently used entries."""
+        self.invalidate(path)
+        if len(content) > MAX_CACHED_FILE_BYTES:
+            return
+        self._entries[path] = (key, content)
+        self._total_bytes += len(content)
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._total_bytes -= len(evicted)
+
+    def invalidate(self, path: str) -> None:
+        """Drop the cached content of path, if any."""
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= len(entry[1])
+
+    def clear(self) -> None:
+        """Drop every cached file."""
+        self._entries.clear()
+        self._total_bytes = 0
+
+
+_caches: "OrderedDict[str, WorkspaceFileCache]" = OrderedDict()
+
+
+def get_file_cache(sandbox_id: str) -> WorkspaceFileCache:
+    """Get the file cache for a sandbox, creating it if needed."""
+    cache = _caches.get(sandbox_id)
+    if cache is None:
+        cache = WorkspaceFileCache()
+        _caches[sandbox_id] = cache
+        if len(_caches) > MAX_CACHED_SANDBOXES:
+            evicted_id, _ = _caches.popitem(last=False)
+            logger.debug(f"Evicted file cache for sandbox {evicted_id}")
+    else:
+        _caches.move_to_end(sandbox_id)
+    return cache
+
+
+def download_file_cached(sandbox, sandbox_id: str, path: str, file_info: Any = None) -> bytes:
+    """Download a file from the sandbox, reusing cached content when it is unchanged.
+
+    Args:
+        sandbox: The sandbox to read from
+        sandbox_id: ID of the sandbox, used to select the cache
+        path: Absolute path of the file in the sandbox
+        file_info: Optional FileInfo already fetched for the file (saves a call)
+
+    Returns:
+        The raw file content
+    """
+    cache = get_file_cache(sandbox_id)
+    if file_info is None:
+        file_info = sandbox.fs.get_file_info(path)
+    key = file_cache_key(file_info)
+
+    content = cache.get(path, key)
+    if content is None:
+        content = sandbox.fs.download_file(path)
+        cache.put(path, key, content)
+    return content
@@ -0,0 +1,173 @@
+"""
+Pool of named shell sessions per sandbox that outlives individual agent runs.
+
+Every run builds fresh tool instances, so sessions owned by a tool instance
+were recreated (and leaked) on each run. The pool keeps one Daytona session
+per (sandbox, session name), records it in Redis so other runs and instances
+can reuse it, caps the number of sessions per sandbox and evicts the least
+recently used or long-idle ones.
+"""
+
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from uuid import uuid4
+
+from services import redis
+from utils.logger import logger
+
+# Maximum number of pooled sessions kept alive in one sandbox
+MAX_SESSIONS_PER_SANDBOX = 8
+# Sessions unused for this long (seconds) are deleted
+SESSION_IDLE_TIMEOUT = 3600
+# Sessions unused for this long (seconds) are verified before being reused
+HEALTH_CHECK_INTERVAL = 300
+# Pools kept in memory; older ones are dropped and rebuilt from Redis on use
+MAX_CACHED_POOLS = 256
+
+REDIS_KEY_PREFIX = "shell_sessions"
+
+_pools: "OrderedDict[str, ShellSessionPool]" = OrderedDict()
+
+
+class ShellSessionPool:
+    """Named shell sessions of a single sandbox, persisted in Redis.
+
+    Sessions are stored as one field per session name in a Redis hash, so
+    API workers sharing a sandbox add, update and remove their own sessions
+    without overwriting each other's.
+    """
+
+    def __init__(self, sandbox_id: str):
+        self.sandbox_id = sandbox_id
+        # session name -> {"session_id": str, "last_used": float}
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def _redis_key(self) -> str:
+        return f"{REDIS_KEY_PREFIX}:{self.sandbox_id}"
+
+    async def _load(self) -> None:
+        """Refresh the sessions from Redis, including those other workers created."""
+        try:
+            stored = await redis.hgetall(self._redis_key)
+        except Exception as e:
+            logger.warning(f"Failed to load shell sessions for sandbox {self.sandbox_id}: {str(e)}")
+            return
+        self._sessions = {name: json.loads(entry) for name, entry in (stored or {}).items()}
+
+    async def _save(self, session_name: str, create: bool = False) -> Optional[Dict[str, Any]]:
+        """Record one session so later runs and other workers can reuse it.
+
+        With create, the session is only recorded if no other worker recorded
+        one under the same name first; that worker's entry is returned instead.
+        """
+        entry = json.dumps(self._sessions[session_name])
+        try:
+            if create and not await redis.hsetnx(self._redis_key, session_name, entry):
+                existing = await redis.hget(self._redis_key, session_name)
+                if existing:
+                    return json.loads(existing)
+            await redis.hset(self._redis_key, session_name, entry)
+            await redis.expire(self._redis_key, redis.REDIS_KEY_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to save shell sessions for sandbox {self.sandbox_id}: {str(e)}")
+        return None
+
+    async def _delete_session(self, sandbox, session_name: str) -> None:
+        """Delete a session from the sandbox and forget it."""
+        entry = self._sessions.pop(session_name, None)
+        try:
+            await redis.hdel(self._redis_key, session_name)
+        except Exception as e:
+            logger.warning(f"Failed to remove shell session {session_name} of sandbox {self.sandbox_id}: {str(e)}")
+        if entry is None:
+            return
+        try:
+            sandbox.process.delete_session(entry["session_id"])
+        except Exception as e:
+            logger.debug(f"Failed to delete shell session {session_name} in sandbox {self.sandbox_id}: {str(e)}")
+
+    async def _evict(self, sandbox) -> None:
+        """Delete idle sessions, then the least recently used ones over the cap."""
+        now = time.time()
+        for name, entry in list(self._sessions.items()):
+            if now - entry["last_used"] > SESSION_IDLE_TIMEOUT:
+                logger.debug(f"Evicting idle shell session {name} in sandbox {self.sandbox_id}")
+                await self._delete_session(sandbox, name)
+        while len(self._sessions) >= MAX_SESSIONS_PER_SANDBOX:
+            name = min(self._sessions, key=lambda n: self._sessions[n]["last_used"])
+            logger.debug(f"Evicting least recently used shell session {name} in sandbox {self.sandbox_id}")
+            await self._delete_session(sandbox, name)
+
+    def is_healthy(self, sandbox, session_id: str) -> bool:
+        """Check that a session still exists in the sandbox (e.g. after a restart)."""
+        try:
+            sandbox.process.get_session(session_id)
+            return True
+        except Exception:
+            return False
+
+    async def acquire(self, sandbox, session_name: str = "default") -> str:
+        """Return the session ID for a name, reusing a pooled session when possible."""
+        async with self._lock:
+            await self._load()
+            now = time.time()
+            entry = self._sessions.get(session_name)
+
+            if entry and now - entry["last_used"] > HEALTH_CHECK_INTERVAL and not self.is_healthy(sandbox, entry["session_id"]):
+                logger.debug(f"Shell session {session_name} in sandbox {self.sandbox_id} is gone, recreating")
+                await self._delete_session(sandbox, session_name)
+                entry = None
+
+            if entry is None:
+                await self._evict(sandbox)
+                session_id = str(uuid4())
+                sandbox.process.create_session(session_id)
+                self._sessions[session_name] = {"session_id": session_id, "last_used": now}
+                existing = await self._save(session_name, create=True)
+                if existing is None:
+                    return session_id
+                # Another worker created this session at the same time; use theirs
+                try:
+                    sandbox.process.delete_session(session_id)
+                except Exception as e:
+                    logger.debug(f"Failed to delete duplicate shell session {session_name} in sandbox {self.sandbox_id}: {str(e)}")
+                entry = existing
+                self._sessions[session_name] = entry
+
+            entry["last_used"] = now
+            await self._save(session_name)
+            return entry["session_id"]
+
+    async def discard(self, sandbox, session_name: str) -> None:
+        """Delete a session, e.g. one that turned out to be unusable."""
+        async with self._lock:
+            await self._load()
+            await self._delete_session(sandbox, session_name)
+
+    async def discard_all(self, sandbox) -> None:
+        """Delete every pooled session of the sandbox."""
+        async with self._lock:
+            await self._load()
+            for name in list(self._sessions):
+                await self._delete_session(sandbox, name)
+        # Nothing is left to pool for this sandbox
+        _pools.pop(self.sandbox_id, None)
+
+
+def get_session_pool(sandbox_id: str) -> ShellSessionPool:
+    """Get the session pool of a sandbox, creating it if needed."""
+    pool = _pools.get(sandbox_id)
+    if pool is None:
+        pool = ShellSessionPool(sandbox_id)
+        _pools[sandbox_id] = pool
+        # Sessions live in Redis, so a dropped pool loses nothing
+        while len(_pools) > MAX_CACHED_POOLS:
+            _pools.popitem(last=False)
+    else:
+        _pools.move_to_end(sandbox_id)
+    return pool
@@ -0,0 +1,163 @@
+"""
+Content-addressed manifests of a sandbox workspace.
+
+A manifest maps every non-excluded file under the workspace to its size, mtime
+and sha256 hash. It is produced inside the sandbox by a single exec that walks
+the tree recursively using the exclusion rules from utils.files_utils, so no
+file content has to leave the sandbox to find out what changed.
+
+Each manifest has a version derived from its contents. Recent manifests are
+kept per sandbox so callers can ask for only the files that changed since a
+version they already have.
+"""
+
+import json
+import shlex
+import inspect
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List
+
+from utils.files_utils import EXCLUDED_FILES, EXCLUDED_DIRS, EXCLUDED_EXT, should_exclude_file
+from utils.logger import logger
+
+# Number of manifest versions remembered per sandbox for diffing
+MAX_MANIFEST_VERSIONS = 8
+
+# Maximum number of sandboxes whose manifests are kept in this process
+MAX_MANIFEST_SANDBOXES = 64
+
+# Prints one JSON object per file: {"p": path, "s": size, "m": mtime, "h": sha256}
+_WALK_SCRIPT_TEMPLATE = """
+import hashlib, json, os, sys
+EXCLUDED_FILES = {excluded_files}
+EXCLUDED_DIRS = {excluded_dirs}
+EXCLUDED_EXT = {excluded_ext}
+{should_exclude_file}
+root = sys.argv[1]
+for current, dirs, names in os.walk(root):
+    rel_dir = os.path.relpath(current, root)
+    rel_dir = "" if rel_dir == "." else rel_dir
+    dirs[:] = [d for d in dirs if not any(e in os.path.join(rel_dir, d) for e in EXCLUDED_DIRS)]
+    for name in names:
+        rel_path = os.path.join(rel_dir, name)
+        full_path = os.path.join(current, name)
+        if should_exclude_file(rel_path) or not os.path.isfile(full_path) or os.path.islink(full_path):
+            continue
+        try:
+            st = os.stat(full_path)
+            digest = hashlib.sha256()
+            with open(full_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            continue
+        print(json.dumps({{"p": rel_path, "s": st.st_size, "m": st.st_mtime, "h": digest.hexdigest()}}))
+"""
+
+_manifests: "OrderedDict[str, OrderedDict[str, Dict[str, Any]]]" = OrderedDict()
+
+
+def build_manifest_command(root: str = "/workspace") -> str:
+    """Build the shell command that prints the manifest of root as JSON lines."""
+    script = _WALK_SCRIPT_TEMPLATE.format(
+        excluded_files=repr(sorted(EXCLUDED_FILES)),
+        excluded_dirs=repr(sorted(EXCLUDED_DIRS)),
+        excluded_ext=repr(sorted(EXCLUDED_EXT)),
+        should_exclude_file=inspect.getsource(should_exclude_file),
+    )
+    return f"python3 -c {shlex.quote(script)} {shlex.quote(root)}"
+
+
+def _manifest_version(files: Dict[str, Dict[str, Any]]) -> str:
+    """Derive a stable version id from the paths and hashes of a manifest."""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(f"{path}\0{files[path]['hash']}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def _remember_manifest(sandbox_id: str, manifest: Dict[str, Any]) -> None:
+    """Store a manifest so later calls can diff against its version."""
+    versions = _manifests.get(sandbox_id)
+    if versions is None:
+        versions = OrderedDict()
+        _manifests[sandbox_id] = versions
+        if len(_manifests) > MAX_MANIFEST_SANDBOXES:
+            _manifests.popitem(last=False)
+    else:
+        _manifests.move_to_end(sandbox_id)
+    versions[manifest["version"]] = manifest
+    versions.move_to_end(manifest["version"])
+    while len(versions) > MAX_MANIFEST_VERSIONS:
+        versions.popitem(last=False)
+
+
+def get_stored_manifest(sandbox_id: str, version: str) -> Optional[Dict[str, Any]]:
+    """Return a previously generated manifest of a sandbox, if still remembered."""
+    return _manifests.get(sandbox_id, {}).get(version)
+
+
+def get_workspace_manifest(sandbox, sandbox_id: str, root: str = "/workspace") -> Dict[str, Any]:
+    """Generate the manifest of a sandbox workspace with a single exec.
+
+    Returns:
+        Dict with 'version' and 'files', mapping each relative path to its
+        'size', 'mtime' and 'hash'
+    """
+    response = sandbox.process.exec(build_manifest_command(root), timeout=120)
+    if response.exit_code != 0:
+        raise RuntimeError(f"Generating workspace manifest failed with exit code {response.exit_code}: {response.result}")
+
+    files = {}
+    for line in response.result.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            logger.warning(f"Skipping unparseable manifest line: {line[:200]}")
+            continue
+        files[entry["p"]] = {"size": entry["s"], "mtime": entry["m"], "hash": entry["h"]}
+
+    manifest = {"version": _manifest_version(files), "files": files}
+    _remember_manifest(sandbox_id, manifest)
+    return manifest
+
+
+def diff_manifests(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Compare two manifests by content hash.
+
+    When old is None every file in new is reported as added.
+
+    Returns:
+        Dict with sorted 'added', 'modified' and 'deleted' path lists
+    """
+    old_files = old["files"] if old else {}
+    new_files = new["files"]
+    return {
+        "added": sorted(path for path in new_files if path not in old_files),
+        "modified": sorted(path for path in new_files
+                           if path in old_files and old_files[path]["hash"] != new_files[path]["hash"]),
+        "deleted": sorted(path for path in old_files if path not in new_files),
+    }
+
+
+def get_workspace_changes(sandbox, sandbox_id: str, since_version: Optional[str] = None,
+                          root: str = "/workspace") -> Dict[str, Any]:
+    """Generate a fresh manifest and report what changed since a previous version.
+
+    If since_version is unknown (or not given) the result is a full listing,
+    flagged with 'full': True, and every file is reported as added.
+
+    Returns:
+        Dict with 'version', 'since_version', 'full', 'added', 'modified',
+        'deleted' and 'files' (the entries of the fresh manifest)
+    """
+    previous = get_stored_manifest(sandbox_id, since_version) if since_version else None
+    manifest = get_workspace_manifest(sandbox, sandbox_id, root)
+    return {
+        "version": manifest["version"],
+        "since_version": since_version if previous else None,
+        "full": previous is None,
+        **diff_manifests(previous, manifest),
+        "files": manifest["files"],
+    }
@@ -176,6 +176,36 @@ async def delete(key):
     redis_client = await get_client()
     return await with_retry(redis_client.delete, key)
 
+async def hget(key, field):
+    """Get a field of a Redis hash with automatic retry."""
+    redis_client = await get_client()
+    return await with_retry(redis_client.hget, key, field)
+
+async def hgetall(key):
+    """Get all fields of a Redis hash with automatic retry."""
+    redis_client = await get_client()
+    return await with_retry(redis_client.hgetall, key)
+
+async def hset(key, field, value):
+    """Set a field of a Redis hash with automatic retry."""
+    redis_client = await get_client()
+    return await with_retry(redis_client.hset, key, field, value)
+
+async def hsetnx(key, field, value):
+    """Set a field of a Redis hash only if it does not exist, with automatic retry."""
+    redis_client = await get_client()
+    return await with_retry(redis_client.hsetnx, key, field, value)
+
+async def hdel(key, *fields):
+    """Delete fields of a Redis hash with automatic retry."""
+    redis_client = await get_client()
+    return await with_retry(redis_client.hdel, key, *fields)
+
+async def expire(key, seconds):
+    """Set the expiration of a Redis key with automatic retry."""
+    redis_client = await get_client()
+    return await with_retry(redis_client.expire, key, seconds)
+
 async def publish(channel, message):
     """Publish a message to a Redis channel with automatic retry."""
     redis_client = await get_client()
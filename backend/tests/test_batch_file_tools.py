@@ -0,0 +1,137 @@
+"""
+Tests for the batch_create_files and batch_str_replace file tools.
+
+The batch archive transfer is replaced with mocks, so these tests cover
+argument parsing and the all-or-nothing rule of batch_str_replace: no file
+is written unless every edit matches exactly once.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agent.tools.sb_files_tool import SandboxFilesTool
+
+
+@pytest.fixture
+def tool():
+    tool = SandboxFilesTool("project-id", MagicMock())
+    # Skip the project lookup; the batch helpers are mocked per test
+    tool._sandbox = MagicMock()
+    tool._sandbox_id = "sandbox-id"
+    return tool
+
+
+def read_result(files):
+    """_read_files_batch result for a dict of path -> content."""
+    return {path: {"content": content, "permissions": "644", "size": len(content), "mtime": 0}
+            for path, content in files.items()}
+
+
+def test_parse_batch_files_from_xml(tool):
+    parsed = tool._parse_batch_files('''
+        <file file_path="/workspace/src/index.html">
+        <h1>Hello</h1>
+        </file>
+        <file file_path='scripts/run.sh' permissions="755">echo hi</file>
+    ''')
+
+    assert parsed == [
+        {"file_path": "src/index.html", "file_contents": "<h1>Hello</h1>", "permissions": "644"},
+        {"file_path": "scripts/run.sh", "file_contents": "echo hi", "permissions": "755"},
+    ]
+
+
+def test_parse_batch_files_from_list(tool):
+    parsed = tool._parse_batch_files([
+        {"file_path": "a.txt", "file_contents": "a"},
+        {"file_path": "b.sh", "permissions": 755},
+    ])
+
+    assert parsed == [
+        {"file_path": "a.txt", "file_contents": "a", "permissions": "644"},
+        {"file_path": "b.sh", "file_contents": "", "permissions": "755"},
+    ]
+    with pytest.raises(ValueError):
+        tool._parse_batch_files([{"file_contents": "no path"}])
+
+
+def test_parse_batch_edits_from_xml(tool):
+    parsed = tool._parse_batch_edits('''
+        <edit file_path="src/main.py">
+            <old_str>print("a")</old_str>
+            <new_str>print("b")</new_str>
+        </edit>
+        <edit file_path="src/utils.py"><old_str>x	= 1</old_str><new_str></new_str></edit>
+    ''')
+
+    assert parsed == [
+        {"file_path": "src/main.py", "old_str": 'print("a")', "new_str": 'print("b")'},
+        {"file_path": "src/utils.py", "old_str": "x       = 1", "new_str": ""},
+    ]
+
+
+def test_parse_batch_edits_from_list(tool):
+    parsed = tool._parse_batch_edits([{"file_path": "/workspace/a.py", "old_str": "a", "new_str": "b"}])
+
+    assert parsed == [{"file_path": "a.py", "old_str": "a", "new_str": "b"}]
+    with pytest.raises(ValueError):
+        tool._parse_batch_edits('<edit file_path="a.py"><old_str>a</old_str></edit>')
+    with pytest.raises(ValueError):
+        tool._parse_batch_edits([{"file_path": "a.py", "old_str": "a"}])
+
+
+@pytest.mark.asyncio
+async def test_batch_str_replace_writes_all_files_once(tool):
+    files = read_result({"a.py": "x = 1\ny = 2\n", "b.py": "z = 3\n"})
+
+    with patch.object(tool, "_read_files_batch", return_value=files) as read, \
+            patch.object(tool, "_write_files_batch") as write:
+        result = await tool.batch_str_replace([
+            {"file_path": "a.py", "old_str": "x = 1", "new_str": "x = 10"},
+            {"file_path": "b.py", "old_str": "z = 3", "new_str": "z = 30"},
+            # Edits to the same file apply in order
+            {"file_path": "a.py", "old_str": "x = 10", "new_str": "x = 100"},
+        ])
+
+    assert result.success
+    read.assert_called_once_with(["a.py", "b.py"])
+    write.assert_called_once_with([
+        {"file_path": "a.py", "file_contents": "x = 100\ny = 2\n", "permissions": "644"},
+        {"file_path": "b.py", "file_contents": "z = 30\n", "permissions": "644"},
+    ])
+
+
+@pytest.mark.parametrize("old_str, message", [
+    ("missing", "not found"),
+    ("value", "multiple occurrences"),
+])
+@pytest.mark.asyncio
+async def test_batch_str_replace_writes_nothing_when_an_edit_fails(tool, old_str, message):
+    files = read_result({"a.py": "x = 1\n", "b.py": "value = 1\nvalue = 2\n"})
+
+    with patch.object(tool, "_read_files_batch", return_value=files), \
+            patch.object(tool, "_write_files_batch") as write:
+        result = await tool.batch_str_replace([
+            {"file_path": "a.py", "old_str": "x = 1", "new_str": "x = 2"},
+            {"file_path": "b.py", "old_str": old_str, "new_str": "other"},
+        ])
+
+    assert not result.success
+    assert "Edit 2" in result.output and message in result.output
+    assert "No files were modified" in result.output
+    write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_str_replace_writes_nothing_when_a_file_is_unreadable(tool):
+    with patch.object(tool, "_read_files_batch", return_value=read_result({"a.py": "x = 1\n"})), \
+            patch.object(tool, "_write_files_batch") as write:
+        result = await tool.batch_str_replace([
+            {"file_path": "a.py", "old_str": "x = 1", "new_str": "x = 2"},
+            {"file_path": "link.py", "old_str": "y", "new_str": "z"},
+        ])
+
+    assert not result.success
+    assert "link.py" in result.output
+    write.assert_not_called()
@@ -0,0 +1,136 @@
+"""
+Tests for the concurrent Creator IQ paginator.
+
+The provider's call_endpoint is replaced with a fake API whose later pages
+answer faster than earlier ones, to check that pages are still yielded in
+order and that stopping early cancels the pages still in flight.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from agent.tools.data_providers.CreatorIQProvider import CreatorIQProvider, _list_name
+
+TOTAL_PAGES = 6
+
+
+def make_fake_api(total_pages: int = TOTAL_PAGES, delay=lambda page: 0.01 * (TOTAL_PAGES - page)):
+    """Fake call_endpoint returning two lists per page, by default later pages fastest."""
+    requested = []
+    completed = []
+
+    async def call_endpoint(route, payload=None):
+        page = payload["page"]
+        requested.append(page)
+        await asyncio.sleep(delay(page))
+        completed.append(page)
+        return {
+            "total": total_pages * 2,
+            "total_pages": total_pages,
+            "ListsCollection": [
+                {"List": {"Id": f"{page}-{i}", "Name": f"List {page}-{i}" if page != 3 else f"Summer {i}"}}
+                for i in range(2)
+            ],
+        }
+
+    return call_endpoint, requested, completed
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_yields_pages_in_order():
+    provider = CreatorIQProvider()
+    call_endpoint, requested, _ = make_fake_api()
+
+    with patch.object(provider, "call_endpoint", side_effect=call_endpoint):
+        pages = [page async for page, _ in provider.iter_pages("lists")]
+
+    assert pages == list(range(1, TOTAL_PAGES + 1))
+    assert sorted(requested) == pages
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_respects_first_page_and_max_pages():
+    provider = CreatorIQProvider()
+    call_endpoint, requested, _ = make_fake_api()
+
+    with patch.object(provider, "call_endpoint", side_effect=call_endpoint):
+        pages = [page async for page, _ in provider.iter_pages("lists", max_pages=3, first_page=2)]
+
+    assert pages == [2, 3, 4]
+    assert sorted(requested) == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_drops_paginator_params():
+    provider = CreatorIQProvider()
+    call_endpoint, _, _ = make_fake_api(total_pages=1)
+    payloads = []
+
+    async def recording_call_endpoint(route, payload=None):
+        payloads.append(payload)
+        return await call_endpoint(route, payload)
+
+    with patch.object(provider, "call_endpoint", side_effect=recording_call_endpoint):
+        async for _ in provider.iter_pages("lists", {"search": "summer", "max_results": 5, "status": "active"}):
+            pass
+
+    assert payloads == [{"status": "active", "limit": 20, "page": 1, "include_publisher_counts": False}]
+
+
+@pytest.mark.asyncio
+async def test_collect_pages_merges_items_in_page_order():
+    provider = CreatorIQProvider()
+    call_endpoint, _, _ = make_fake_api()
+
+    with patch.object(provider, "call_endpoint", side_effect=call_endpoint):
+        result = await provider.collect_pages("lists", "ListsCollection")
+
+    assert [item["List"]["Id"] for item in result["ListsCollection"]] == [
+        f"{page}-{i}" for page in range(1, TOTAL_PAGES + 1) for i in range(2)
+    ]
+    assert result["pages_searched"] == TOTAL_PAGES
+    assert result["searched_all_pages"] is True
+    assert result["items_found"] == TOTAL_PAGES * 2
+
+
+@pytest.mark.asyncio
+async def test_collect_pages_stops_early_and_cancels_remaining_pages():
+    provider = CreatorIQProvider()
+    call_endpoint, requested, completed = make_fake_api(delay=lambda page: 0 if page <= 2 else 0.05)
+
+    with patch.object(provider, "call_endpoint", side_effect=call_endpoint):
+        result = await provider.collect_pages(
+            "lists", "ListsCollection", stop_when=lambda items: len(items) >= 4
+        )
+        # Give the cancelled page requests the time they would have needed to finish
+        await asyncio.sleep(0.1)
+
+    assert result["pages_searched"] == 2
+    assert result["searched_all_pages"] is False
+    assert result["items_found"] == 4
+    # Every page was requested concurrently, but the ones after the stop were cancelled
+    assert sorted(requested) == list(range(1, TOTAL_PAGES + 1))
+    assert sorted(completed) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_search_filters_match_and_stop():
+    provider = CreatorIQProvider()
+    call_endpoint, _, _ = make_fake_api()
+    match, stop_when = provider._search_filters({"search": "SUMMER", "max_results": "1"}, _list_name)
+
+    with patch.object(provider, "call_endpoint", side_effect=call_endpoint):
+        result = await provider.collect_pages("lists", "ListsCollection", match=match, stop_when=stop_when)
+
+    # The page that reaches max_results is kept whole; no page after it is searched
+    assert [item["List"]["Name"] for item in result["ListsCollection"]] == ["Summer 0", "Summer 1"]
+    assert result["pages_searched"] == 3
+    assert result["searched_all_pages"] is False
+
+
+def test_search_filters_default_to_no_filtering():
+    provider = CreatorIQProvider()
+
+    assert provider._search_filters({}, _list_name) == (None, None)
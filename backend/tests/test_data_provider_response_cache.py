@@ -0,0 +1,129 @@
+"""
+Tests for the data provider response cache.
+
+The cache is used in memory only (use_redis=False) and time.time is patched,
+so entries can be aged past their TTL and stale window without waiting.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from agent.tools.data_providers import response_cache
+from agent.tools.data_providers.response_cache import ResponseCache, cache_key, normalize_payload
+
+
+class Clock:
+    """Stand-in for time.time that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_fetch(result=None):
+    """Fetch function counting its calls, returning a new response each call by default."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return result if result is not None else {"data": len(calls)}
+
+    return fetch, calls
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch.object(response_cache.time, "time", clock):
+        yield clock
+
+
+def test_equivalent_payloads_share_a_key():
+    assert normalize_payload({"page": 1, "q": " tesla ", "cursor": None}) == normalize_payload({"q": "tesla", "page": "1"})
+    assert cache_key("twitter", "search", {"a": 1}) != cache_key("twitter", "timeline", {"a": 1})
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_returned_without_fetching(clock):
+    cache = ResponseCache(use_redis=False)
+    fetch, calls = make_fetch()
+
+    first = await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+    clock.now += 59
+    second = await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+
+    assert first == second == {"data": 1}
+    assert len(calls) == 1
+    assert cache.get_metrics()["twitter"] == {"miss": 1, "hit": 1}
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_returned_while_refreshing(clock):
+    cache = ResponseCache(use_redis=False)
+    fetch, calls = make_fetch()
+
+    await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+    clock.now += 61
+    stale = await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+    # Let the background refresh run
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    refreshed = await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+
+    assert stale == {"data": 1}
+    assert refreshed == {"data": 2}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_entry_past_stale_window_is_fetched_again(clock):
+    cache = ResponseCache(use_redis=False)
+    fetch, calls = make_fetch()
+
+    await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+    # Default stale window equals the TTL
+    clock.now += 121
+    result = await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch)
+
+    assert result == {"data": 2}
+    assert len(calls) == 2
+    assert cache.get_metrics()["twitter"]["miss"] == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(use_redis=False)
+    fetch, calls = make_fetch({"data": "x"})
+
+    with patch.object(response_cache, "MAX_MEMORY_CACHE_ENTRIES", 2):
+        await cache.get_or_fetch("twitter", "search", {"q": "a"}, 60, fetch)
+        await cache.get_or_fetch("twitter", "search", {"q": "b"}, 60, fetch)
+        # Using "a" makes "b" the least recently used entry
+        await cache.get_or_fetch("twitter", "search", {"q": "a"}, 60, fetch)
+        await cache.get_or_fetch("twitter", "search", {"q": "c"}, 60, fetch)
+        assert len(calls) == 3
+
+        await cache.get_or_fetch("twitter", "search", {"q": "a"}, 60, fetch)
+        assert len(calls) == 3
+        await cache.get_or_fetch("twitter", "search", {"q": "b"}, 60, fetch)
+        assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_error_responses_and_zero_ttl_are_not_cached(clock):
+    cache = ResponseCache(use_redis=False)
+    fetch_error, error_calls = make_fetch({"error": "rate limited"})
+    fetch, calls = make_fetch()
+
+    await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch_error)
+    await cache.get_or_fetch("twitter", "search", {"q": "x"}, 60, fetch_error)
+    await cache.get_or_fetch("twitter", "timeline", {}, 0, fetch)
+    await cache.get_or_fetch("twitter", "timeline", {}, 0, fetch)
+
+    assert len(error_calls) == 2
+    assert len(calls) == 2
+    assert cache.get_metrics()["twitter"]["bypass"] == 2
@@ -0,0 +1,95 @@
+"""
+Tests for how large data provider results are saved and summarized.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent.tools.data_providers_tool import (
+    DataProvidersTool, MAX_INLINE_RESULT_CHARS, MAX_SCHEMA_KEYS, PREVIEW_RECORDS,
+    find_records, summarize_schema
+)
+
+
+@pytest.fixture
+def tool():
+    tool = DataProvidersTool("project-id", MagicMock())
+    # Skip the project lookup; uploads go to a mock sandbox
+    tool._sandbox = MagicMock()
+    tool._sandbox_id = "sandbox-id"
+    return tool
+
+
+def test_find_records_picks_the_largest_list():
+    assert find_records([1, 2]) == (".", [1, 2])
+    assert find_records({"tags": ["a"], "PublisherCollection": [1, 2, 3]}) == (".PublisherCollection", [1, 2, 3])
+    assert find_records({"data": {"items": [1, 2], "cursor": "x"}, "errors": [1]}) == (".data.items", [1, 2])
+    assert find_records({"total": 3}) == (None, None)
+    assert find_records("text") == (None, None)
+
+
+def test_summarize_schema_describes_types():
+    value = {"id": 1, "name": "a", "score": 0.5, "active": True, "parent": None, "tags": [], "items": [{"id": 2}]}
+
+    assert summarize_schema(value) == {
+        "id": "int", "name": "str", "score": "float", "active": "bool",
+        "parent": "null", "tags": "array", "items": [{"id": "int"}],
+    }
+
+
+def test_summarize_schema_caps_depth_and_keys():
+    assert summarize_schema({"a": {"b": {"c": {"d": {"e": 1}}}}}) == {"a": {"b": {"c": {"d": "object"}}}}
+
+    summary = summarize_schema({f"key{i}": i for i in range(MAX_SCHEMA_KEYS + 5)})
+    assert len(summary) == MAX_SCHEMA_KEYS + 1
+    assert summary["..."] == "5 more keys"
+
+
+@pytest.mark.asyncio
+async def test_save_result_previews_the_first_records(tool):
+    result = {"total": 100, "items": [{"id": i, "name": f"item {i}"} for i in range(100)]}
+    serialized = json.dumps(result)
+
+    summary = await tool._save_result("twitter", "search", result, serialized)
+
+    assert summary["result_file"].startswith(".data_provider_results/twitter_search_")
+    assert summary["records_path"] == ".items"
+    assert summary["record_count"] == 100
+    assert summary["preview"] == result["items"][:PREVIEW_RECORDS]
+    assert summary["fields"] == {"total": 100}
+    tool._sandbox.fs.upload_file.assert_called_once_with(
+        f"/workspace/{summary['result_file']}", serialized.encode()
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_result_summary_stays_within_the_inline_limit(tool):
+    big_text = "x" * MAX_INLINE_RESULT_CHARS
+    result = {
+        "description": big_text,
+        "items": [{"id": i, "body": big_text, "comments": [big_text[:400]] * 10} for i in range(20)],
+    }
+    serialized = json.dumps(result)
+
+    summary = await tool._save_result("twitter", "search", result, serialized)
+
+    assert len(json.dumps(summary)) <= MAX_INLINE_RESULT_CHARS
+    assert summary["record_count"] == 20
+    assert len(summary["fields"]["description"]) < 1000
+    # Long strings in records are cut short, and only as many records as fit are kept
+    assert 0 < len(summary["preview"]) < PREVIEW_RECORDS
+    assert summary["preview"][0]["id"] == 0
+    assert summary["preview"][0]["body"].endswith("more chars)")
+
+
+@pytest.mark.asyncio
+async def test_save_result_drops_sections_that_cannot_fit(tool):
+    result = {f"field{i}": "x" * 400 for i in range(100)}
+
+    summary = await tool._save_result("twitter", "search", result, json.dumps(result))
+
+    assert len(json.dumps(summary)) <= MAX_INLINE_RESULT_CHARS
+    assert "fields" not in summary
+    assert "result_file" in summary
@@ -0,0 +1,95 @@
+"""
+Tests for the data provider endpoint catalog.
+"""
+
+import pytest
+
+from agent.tools.data_providers.endpoint_catalog import EndpointCatalog
+
+
+class FakeProvider:
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+
+    def get_endpoints(self):
+        return self.endpoints
+
+
+PROVIDERS = {
+    "twitter": FakeProvider({
+        "search": {
+            "route": "/search.php",
+            "method": "GET",
+            "name": "Search Tweets",
+            "description": "Search for tweets by keyword. Returns the latest matches first.",
+            "payload": {"query": "Search query", "cursor": "Pagination cursor"},
+            "cache_ttl": 300,
+        },
+        "timeline": {
+            "route": "/timeline.php",
+            "method": "GET",
+            "name": "User Timeline",
+            "description": "Get the tweets posted by a user",
+            "payload": {"screenname": "Twitter handle"},
+        },
+    }),
+    "zillow": FakeProvider({
+        "search": {
+            "route": "/search",
+            "method": "GET",
+            "name": "Zillow Property Search",
+            "description": "Search for properties by neighborhood, city, or ZIP code.",
+            "payload": {"location": "Location to search"},
+        },
+    }),
+}
+
+
+@pytest.fixture
+def catalog():
+    return EndpointCatalog(PROVIDERS)
+
+
+def test_summary_has_one_line_per_endpoint(catalog):
+    assert catalog.summary("twitter") == (
+        "## twitter\n"
+        "search [GET]: Search for tweets by keyword. (params: query, cursor)\n"
+        "timeline [GET]: Get the tweets posted by a user (params: screenname)"
+    )
+    assert catalog.summary().count("## ") == 2
+
+
+def test_search_ranks_name_matches_above_description_matches(catalog):
+    results = catalog.search("tweets")
+
+    # "tweets" is in the name of search and only in the description of timeline
+    assert [(r["service_name"], r["route"]) for r in results] == [("twitter", "search"), ("twitter", "timeline")]
+
+
+def test_search_matches_word_prefixes_and_ignores_stop_words(catalog):
+    results = catalog.search("get the propert")
+
+    assert [(r["service_name"], r["route"]) for r in results] == [("zillow", "search")]
+
+
+def test_search_can_be_limited_to_a_service(catalog):
+    results = catalog.search("search", service="zillow")
+
+    assert [(r["service_name"], r["route"]) for r in results] == [("zillow", "search")]
+    assert len(catalog.search("search", limit=1)) == 1
+    assert catalog.search("weather") == []
+
+
+def test_schema_hides_internal_keys(catalog):
+    schema = catalog.schema("twitter", "search")
+
+    assert schema["service_name"] == "twitter"
+    assert schema["route"] == "search"
+    assert "cache_ttl" not in schema
+
+
+def test_get_schemas_rejects_unknown_routes(catalog):
+    assert [schema["route"] for schema in catalog.get_schemas("twitter", ["timeline", "search"])] == ["timeline", "search"]
+
+    with pytest.raises(KeyError):
+        catalog.get_schemas("twitter", ["search", "trending"])
@@ -0,0 +1,157 @@
+"""
+Tests for the Google Drive data provider's listing, paging and ranged downloads.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from agent.tools.data_providers import GoogleDriveProvider as drive
+from agent.tools.data_providers.GoogleDriveProvider import (
+    DEFAULT_FILE_FIELDS, GoogleDriveProvider, _list_fields_mask, _range_header
+)
+
+
+def make_fake_list_api(pages: int = 3, files_per_page: int = 4):
+    """Fake _get_json serving files.list pages linked by nextPageToken."""
+    requests = []
+
+    async def get_json(url, params, access_token):
+        requests.append(params)
+        page = int(params.get("pageToken") or 0)
+        response = {"files": [{"id": f"{page}-{i}"} for i in range(files_per_page)]}
+        if page + 1 < pages:
+            response["nextPageToken"] = str(page + 1)
+        return response
+
+    return get_json, requests
+
+
+class FakeStreamResponse:
+    is_error = False
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    async def aiter_bytes(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class FakeStreamClient:
+    """Fake httpx client recording its stream requests."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.requests = []
+
+    def stream(self, method, url, params=None, headers=None):
+        self.requests.append({"method": method, "url": url, "params": params, "headers": headers})
+        client = self
+
+        class Stream:
+            async def __aenter__(self):
+                return FakeStreamResponse(client.body)
+
+            async def __aexit__(self, *exc_info):
+                pass
+
+        return Stream()
+
+
+@pytest.mark.parametrize("fields, expected", [
+    (None, f"nextPageToken,files({DEFAULT_FILE_FIELDS})"),
+    ("id,name", "nextPageToken,files(id,name)"),
+    ("files(id)", "nextPageToken,files(id)"),
+    ("nextPageToken,files(id,size)", "nextPageToken,files(id,size)"),
+])
+def test_list_fields_mask(fields, expected):
+    assert _list_fields_mask(fields) == expected
+
+
+def test_range_header():
+    assert _range_header(None, None) is None
+    assert _range_header("", "") is None
+    assert _range_header(100, None) == "bytes=100-"
+    assert _range_header(None, "99") == "bytes=0-99"
+    assert _range_header("10", "19") == "bytes=10-19"
+    with pytest.raises(ValueError):
+        _range_header(20, 10)
+    with pytest.raises(ValueError):
+        _range_header(-1, None)
+
+
+@pytest.mark.asyncio
+async def test_all_pages_follows_page_tokens():
+    provider = GoogleDriveProvider()
+    get_json, requests = make_fake_list_api()
+
+    with patch.object(provider, "_get_json", side_effect=get_json):
+        result = await provider.call_endpoint("files", {"access_token": "token", "all_pages": "true"})
+
+    assert [file["id"] for file in result["files"]] == [f"{page}-{i}" for page in range(3) for i in range(4)]
+    assert result["truncated"] is False
+    assert [params.get("pageToken") for params in requests] == [None, "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_all_pages_stops_at_max_files():
+    provider = GoogleDriveProvider()
+    get_json, requests = make_fake_list_api()
+
+    with patch.object(provider, "_get_json", side_effect=get_json):
+        result = await provider.call_endpoint(
+            "files", {"access_token": "token", "all_pages": True, "max_files": "6", "fields": "id"}
+        )
+
+    assert [file["id"] for file in result["files"]] == ["0-0", "0-1", "0-2", "0-3", "1-0", "1-1"]
+    assert result["truncated"] is True
+    # The third page is never requested
+    assert len(requests) == 2
+    assert requests[0]["fields"] == "nextPageToken,files(id)"
+
+
+@pytest.mark.asyncio
+async def test_file_content_must_be_streamed():
+    provider = GoogleDriveProvider()
+
+    with pytest.raises(ValueError, match="stream_endpoint"):
+        await provider.call_endpoint("file_content", {"access_token": "token", "file_id": "doc", "mimeType": "text/plain"})
+
+
+@pytest.mark.asyncio
+async def test_file_download_sends_the_range():
+    provider = GoogleDriveProvider()
+    client = FakeStreamClient(b"0123456789")
+
+    with patch.object(drive, "get_provider_client", return_value=client):
+        chunks = [chunk async for chunk in provider.stream_endpoint(
+            "file_download", {"access_token": "token", "file_id": "abc", "range_start": 0, "range_end": 9}
+        )]
+
+    assert b"".join(chunks) == b"0123456789"
+    assert client.requests == [{
+        "method": "GET",
+        "url": "https://www.googleapis.com/drive/v3/files/abc",
+        "params": {"alt": "media"},
+        "headers": {"Authorization": "Bearer token", "Range": "bytes=0-9"},
+    }]
+
+
+@pytest.mark.asyncio
+async def test_file_content_export_has_no_range():
+    provider = GoogleDriveProvider()
+    client = FakeStreamClient(b"a,b\n1,2\n")
+
+    with patch.object(drive, "get_provider_client", return_value=client):
+        chunks = [chunk async for chunk in provider.stream_endpoint(
+            "file_content", {"access_token": "token", "file_id": "sheet", "mimeType": "text/csv"}
+        )]
+
+    assert b"".join(chunks) == b"a,b\n1,2\n"
+    assert client.requests[0]["url"].endswith("/files/sheet/export")
+    assert client.requests[0]["params"] == {"mimeType": "text/csv"}
+    assert "Range" not in client.requests[0]["headers"]
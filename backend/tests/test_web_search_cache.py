@@ -0,0 +1,171 @@
+"""
+Tests for the request cache, URL normalization and batch crawling of the web search tool.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from agent.tools import web_search_tool
+from agent.tools.web_search_tool import WebSearchTool, _cached, normalize_url
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    web_search_tool._web_cache.clear()
+    web_search_tool._in_flight.clear()
+    yield
+    web_search_tool._web_cache.clear()
+    web_search_tool._in_flight.clear()
+
+
+def make_fetch(result="result", error=None, delay=0.01):
+    """Fetch function counting its calls, failing with error when given."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return fetch, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_fetch():
+    fetch, calls = make_fetch()
+
+    results = await asyncio.gather(*(_cached("search:x", 60, fetch) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert not web_search_tool._in_flight
+
+
+@pytest.mark.asyncio
+async def test_result_is_reused_until_it_expires():
+    fetch, calls = make_fetch()
+
+    await _cached("search:x", 60, fetch)
+    await _cached("search:x", 60, fetch)
+    assert len(calls) == 1
+
+    await _cached("search:y", 0, fetch)
+    await _cached("search:y", 0, fetch)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_but_not_cached():
+    failing_fetch, failing_calls = make_fetch(error=RuntimeError("Tavily unavailable"))
+
+    results = await asyncio.gather(
+        *(_cached("search:x", 60, failing_fetch) for _ in range(3)), return_exceptions=True
+    )
+    assert len(failing_calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    fetch, calls = make_fetch()
+    assert await _cached("search:x", 60, fetch) == "result"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch():
+    fetch, calls = make_fetch(delay=0.05)
+
+    cancelled = asyncio.create_task(_cached("search:x", 60, fetch))
+    waiting = asyncio.create_task(_cached("search:x", 60, fetch))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+
+    assert await waiting == "result"
+    assert cancelled.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://Example.COM/a/", "https://example.com/a"),
+    ("https://example.com/a#section", "https://example.com/a"),
+    ("  https://example.com  ", "https://example.com/"),
+    ("HTTPS://example.com/", "https://example.com/"),
+    ("https://example.com/A/?q=Tesla", "https://example.com/A?q=Tesla"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def make_fake_extract(pages):
+    """Fake Tavily extract answering from a dict of URL -> text; other URLs fail."""
+    requests = []
+
+    async def extract(urls):
+        requests.append(list(urls))
+        return {
+            "results": [{"url": url, "title": f"Title of {url}", "raw_content": pages[url]}
+                        for url in urls if url in pages],
+            "failed_results": [{"url": url, "error": "Access denied"} for url in urls if url not in pages],
+        }
+
+    return extract, requests
+
+
+async def crawl(pages, urls, **kwargs):
+    tool = WebSearchTool(api_key="test-key")
+    extract, requests = make_fake_extract(pages)
+    with patch.object(tool, "_extract", side_effect=extract):
+        result = await tool.batch_crawl_webpages(urls, **kwargs)
+    assert result.success, result.output
+    return json.loads(result.output), requests
+
+
+@pytest.mark.asyncio
+async def test_batch_crawl_collapses_duplicate_urls():
+    results, requests = await crawl(
+        {"https://example.com/a": "Page A"},
+        ["example.com/a", "https://EXAMPLE.com/a/", "https://example.com/a#intro"],
+    )
+
+    assert requests == [["https://example.com/a"]]
+    assert results == [{"Title": "Title of https://example.com/a", "URL": "https://example.com/a", "Text": "Page A"}]
+
+
+@pytest.mark.asyncio
+async def test_batch_crawl_marks_pages_with_the_same_content():
+    results, _ = await crawl(
+        {"https://example.com/a": "Same  text", "https://mirror.example.com/a": "same text", "https://example.com/b": "Other"},
+        ["https://example.com/a", "https://mirror.example.com/a", "https://example.com/b"],
+    )
+
+    assert results[1] == {"URL": "https://mirror.example.com/a", "Duplicate Of": "https://example.com/a"}
+    assert [result.get("Text") for result in results] == ["Same  text", None, "Other"]
+
+
+@pytest.mark.asyncio
+async def test_batch_crawl_truncates_long_pages():
+    results, _ = await crawl(
+        {"https://example.com/long": "x" * 250, "https://example.com/short": "y" * 100},
+        ["https://example.com/long", "https://example.com/short"],
+        max_chars_per_page=100,
+    )
+
+    assert results[0]["Text"] == "x" * 100
+    assert results[0]["Truncated"] is True
+    assert results[0]["Total Chars"] == 250
+    assert results[1]["Text"] == "y" * 100
+    assert "Truncated" not in results[1]
+
+
+@pytest.mark.asyncio
+async def test_batch_crawl_reports_partial_failures():
+    results, _ = await crawl(
+        {"https://example.com/ok": "Fine"},
+        ["https://example.com/ok", "https://example.com/blocked"],
+    )
+
+    assert results[0]["Text"] == "Fine"
+    assert results[1] == {"URL": "https://example.com/blocked", "Error": "Access denied"}
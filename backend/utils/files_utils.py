@@ -20,7 +20,9 @@ EXCLUDED_DIRS = {
     ".next",
     "dist",
     "build",
-    ".git"
+    ".git",
+    ".command_logs",
+    ".data_provider_results"
 }
 
 # File extensions to exclude from operations
@@ -0,0 +1,62 @@
+
+-- Local searchable index of Creator IQ lists, campaigns and publishers.
+-- Rows are synced from the Creator IQ API by the backend, alongside the
+-- per-user query state kept in creator_iq_state.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS public.creator_iq_index (
+  entity_type TEXT NOT NULL CHECK (entity_type IN ('list', 'campaign', 'publisher')),
+  entity_id TEXT NOT NULL,
+  name TEXT NOT NULL DEFAULT '',
+  data JSONB NOT NULL DEFAULT '{}'::jsonb,
+  synced_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  PRIMARY KEY (entity_type, entity_id)
+);
+
+-- Prefix matches
+CREATE INDEX IF NOT EXISTS creator_iq_index_name_prefix_idx
+  ON public.creator_iq_index (entity_type, lower(name) text_pattern_ops);
+-- Substring and similarity matches
+CREATE INDEX IF NOT EXISTS creator_iq_index_name_trgm_idx
+  ON public.creator_iq_index USING gin (lower(name) gin_trgm_ops);
+-- Freshness lookups and removal of entities missing from the latest sync
+CREATE INDEX IF NOT EXISTS creator_iq_index_synced_at_idx
+  ON public.creator_iq_index (entity_type, synced_at);
+
+-- The index is shared account data written by the backend with the service
+-- role; no policies are defined, so other roles cannot read or write it
+ALTER TABLE public.creator_iq_index ENABLE ROW LEVEL SECURITY;
+
+-- Search one entity type by name: prefix matches first, then substring
+-- matches, then names that are only similar, each ranked by similarity
+CREATE OR REPLACE FUNCTION public.search_creator_iq_index(p_entity_type text, query text, limit_count integer DEFAULT 20)
+RETURNS TABLE(entity_id text, name text, data jsonb, synced_at timestamp with time zone, match_type text, score real)
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $function$
+  WITH q AS (
+    SELECT lower(query) AS term,
+           replace(replace(replace(lower(query), '\', '\\'), '%', '\%'), '_', '\_') AS pattern
+  ), matches AS (
+    SELECT i.entity_id,
+           i.name,
+           i.data,
+           i.synced_at,
+           CASE
+             WHEN lower(i.name) LIKE q.pattern || '%' THEN 'prefix'
+             WHEN lower(i.name) LIKE '%' || q.pattern || '%' THEN 'substring'
+             ELSE 'trigram'
+           END AS match_type,
+           similarity(lower(i.name), q.term) AS score
+    FROM public.creator_iq_index i, q
+    WHERE i.entity_type = p_entity_type
+      AND (lower(i.name) LIKE '%' || q.pattern || '%' OR lower(i.name) % q.term)
+  )
+  SELECT m.entity_id, m.name, m.data, m.synced_at, m.match_type, m.score
+  FROM matches m
+  ORDER BY CASE m.match_type WHEN 'prefix' THEN 0 WHEN 'substring' THEN 1 ELSE 2 END,
+           m.score DESC,
+           m.name
+  LIMIT limit_count;
+$function$;
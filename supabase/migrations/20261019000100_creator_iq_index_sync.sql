@@ -0,0 +1,40 @@
+
+-- Shared sync state of the Creator IQ index, so API workers take turns
+-- refreshing it instead of each crawling the API on its own.
+-- A sync pass walks the pages of an entity type in bounded chunks; next_page
+-- is the cursor of the pass in progress (1 when none is).
+CREATE TABLE IF NOT EXISTS public.creator_iq_index_sync (
+  entity_type TEXT PRIMARY KEY CHECK (entity_type IN ('list', 'campaign', 'publisher')),
+  next_page INTEGER NOT NULL DEFAULT 1,
+  pass_started_at TIMESTAMP WITH TIME ZONE,
+  last_complete_at TIMESTAMP WITH TIME ZONE,
+  refreshed_at TIMESTAMP WITH TIME ZONE,
+  lease_until TIMESTAMP WITH TIME ZONE
+);
+
+-- Written by the backend with the service role only, like creator_iq_index
+ALTER TABLE public.creator_iq_index_sync ENABLE ROW LEVEL SECURITY;
+
+-- Claim the next chunk of a sync pass for lease_seconds. A chunk is due when
+-- a pass is in progress or the last complete pass is older than
+-- max_age_seconds. Returns the claimed state, or no row if another worker
+-- holds the lease or nothing is due.
+CREATE OR REPLACE FUNCTION public.claim_creator_iq_index_sync(p_entity_type text, lease_seconds integer, max_age_seconds integer)
+RETURNS SETOF public.creator_iq_index_sync
+LANGUAGE sql
+VOLATILE
+SET search_path = public
+AS $function$
+  INSERT INTO public.creator_iq_index_sync (entity_type)
+  VALUES (p_entity_type)
+  ON CONFLICT (entity_type) DO NOTHING;
+
+  UPDATE public.creator_iq_index_sync s
+  SET lease_until = now() + make_interval(secs => lease_seconds)
+  WHERE s.entity_type = p_entity_type
+    AND (s.lease_until IS NULL OR s.lease_until < now())
+    AND (s.next_page > 1
+         OR s.last_complete_at IS NULL
+         OR s.last_complete_at < now() - make_interval(secs => max_age_seconds))
+  RETURNING s.*;
+$function$;